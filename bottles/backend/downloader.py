@@ -56,6 +56,7 @@ class Downloader:
         self.file = file
         self.update_func = update_func
         self.cancel_event = cancel_event
+        self.__last_percent = -1
 
     def download(self) -> Result:
         """Start the download."""
@@ -116,6 +117,9 @@ class Downloader:
     def __progress(self, received_size, total_size):
         """Update the progress bar."""
         percent = int(received_size * 100 / total_size)
+        if percent == self.__last_percent:
+            return
+        self.__last_percent = percent
         done_str = FileUtils.get_human_size(received_size)
         total_str = FileUtils.get_human_size(total_size)
         speed_str = FileUtils.get_human_size(
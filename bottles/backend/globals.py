@@ -86,6 +86,8 @@ class Paths:
     templates = f"{base}/templates"
     library = f"{base}/library.yml"
     process_metrics = f"{base}/process_metrics.sqlite"
+    journal = f"{base}/journal.sqlite"
+    dedup = f"{base}/dedup"
 
     @staticmethod
     def is_vkbasalt_available():
@@ -162,6 +164,7 @@ lsfg_vk_available = bool(lsfg_vk_version)
 mangohud_available = check_flatpak_extension("mangohud", "/usr/lib/extensions/vulkan/MangoHud/bin/mangohud")
 obs_vkc_available = check_flatpak_extension("obs-vkcapture", "/usr/lib/extensions/vulkan/OBSVkCapture/bin/obs-vkcapture")
 vmtouch_available = shutil.which("vmtouch") or False
+zstd_available = shutil.which("zstd") or False
 base_version = ""
 if os.path.isfile("/app/manifest.json"):
     with open("/app/manifest.json", mode="r", encoding="utf-8") as file:
@@ -60,6 +60,8 @@ class HealthChecker:
         self.wayland = self.check_wayland()
         self.xwayland = self.x11 and self.wayland
         self.desktop = self.check_desktop()
+        # a report, so a GPU plugged since the last probe must show up
+        GPUUtils.refresh()
         self.gpus = GPUUtils().get_gpu()
         self.vulkan = VulkanUtils.check_support()
         self.glibc_min = is_glibc_min_available()
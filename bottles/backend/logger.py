@@ -14,9 +14,14 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
+import atexit
 import logging
 import os
+import queue
 import re
+import threading
+from logging.handlers import QueueHandler
+from typing import ClassVar, Optional
 
 from bottles.backend.globals import Paths
 from bottles.backend.managers.journal import JournalManager, JournalSeverity
@@ -25,12 +30,163 @@ from bottles.backend.managers.journal import JournalManager, JournalSeverity
 logging.basicConfig(level=logging.DEBUG)
 
 
+class AsyncLogWriter:
+    """
+    A single background thread emitting log records and writing journal
+    events, so logging from GTK callbacks or progress loops never waits
+    for the terminal or the disk. The queue is bounded: when it is full
+    new messages are dropped and their number is reported later. A record
+    identical to the previous one within coalesce_window seconds is only
+    counted, the count is reported once a different record arrives.
+    While the thread is not running, e.g. after shutdown, items are
+    written by the caller.
+    """
+
+    coalesce_window = 1.0
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.handler: logging.Handler = logging.StreamHandler()
+        self.__reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.__reset)
+
+    def __reset(self):
+        # a forked child gets neither the thread nor a usable lock
+        self.queue: queue.Queue = queue.Queue(self.maxsize)
+        self.dropped = 0
+        self.__lock = threading.Lock()
+        self.__thread: Optional[threading.Thread] = None
+        self.__last: Optional[logging.LogRecord] = None
+        self.__repeats = 0
+
+    @property
+    def running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def start(self):
+        with self.__lock:
+            if self.running:
+                return
+            self.__thread = threading.Thread(
+                target=self.__run, name="LogWriter", daemon=True
+            )
+            self.__thread.start()
+
+    def __put(self, item):
+        if not self.running:
+            self.__write(item)
+            return
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            with self.__lock:
+                self.dropped += 1
+
+    def put_nowait(self, record: logging.LogRecord):
+        """Queue a record, this is what QueueHandler calls."""
+        with self.__lock:
+            last = self.__last
+            if (
+                last is not None
+                and last.levelno == record.levelno
+                and last.msg == record.msg
+                and record.created - last.created < self.coalesce_window
+            ):
+                self.__repeats += 1
+                return
+            repeated = self.__pop_repeated()
+            self.__last = record
+        if repeated is not None:
+            self.__put(repeated)
+        self.__put(record)
+
+    def __pop_repeated(self) -> Optional[logging.LogRecord]:
+        """A record reporting the repeats of the last one, call with the lock."""
+        if not self.__repeats:
+            return None
+        record = logging.makeLogRecord(self.__last.__dict__)
+        record.msg = f"Last message repeated {self.__repeats} more times"
+        self.__repeats = 0
+        return record
+
+    def journal(self, severity: str, message: str):
+        self.__put((severity, message))
+
+    def flush(self, timeout: Optional[float] = 5) -> bool:
+        """Wait for everything queued so far to be written."""
+        with self.__lock:
+            repeated = self.__pop_repeated()
+            self.__last = None
+        if repeated is not None:
+            self.__put(repeated)
+        if not self.running:
+            return True
+
+        done = threading.Event()
+        try:
+            self.queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = 5):
+        """Flush and stop the thread, it starts again on the next Logger."""
+        if not self.running:
+            return
+        self.flush(timeout)
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self.__thread.join(timeout)
+
+    def __write(self, item):
+        if isinstance(item, threading.Event):
+            item.set()
+        elif isinstance(item, tuple):
+            JournalManager.write(*item)
+        elif not getattr(getattr(self.handler, "stream", None), "closed", False):
+            # at exit the stream may already be gone, e.g. under pytest
+            self.handler.handle(item)
+
+    def __run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            try:
+                self.__write(item)
+                self.__report_dropped()
+            except Exception:  # the writer must survive any handler error
+                pass
+
+    def __report_dropped(self):
+        with self.__lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            self.handler.handle(
+                logging.makeLogRecord(
+                    {
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"{dropped} log messages were dropped",
+                    }
+                )
+            )
+
+
 class Logger(logging.getLoggerClass()):
     """
     This class is a wrapper for the logging module. It provides
     custom formats for the log messages.
+
+    Unless LOG_ASYNC=0 is set, records and journal events are handed to
+    the AsyncLogWriter thread instead of being written by the caller.
     """
 
+    writer: ClassVar[AsyncLogWriter] = AsyncLogWriter()
+
     __color_map = {"debug": 37, "info": 36, "warning": 33, "error": 31, "critical": 41}
     __format_log = {
         "fmt": "\033[80m%(asctime)s \033[1m(%(levelname)s)\033[0m %(message)s \033[0m",
@@ -43,6 +199,10 @@ class Logger(logging.getLoggerClass()):
         color_id = self.__color_map[level]
         return "\033[%dm%s\033[0m" % (color_id, message)
 
+    @staticmethod
+    def is_async() -> bool:
+        return os.environ.get("LOG_ASYNC", "1") != "0"
+
     def __init__(self, formatter=None):
         if formatter is None:
             formatter = self.__format_log
@@ -57,8 +217,23 @@ class Logger(logging.getLoggerClass()):
 
         handler = logging.StreamHandler()
         handler.setFormatter(formatter)
+        if self.is_async():
+            self.writer.handler = handler
+            self.writer.start()
+            handler = QueueHandler(self.writer)
         self.root.addHandler(handler)
 
+    def __journal(self, severity: str, message: str):
+        if self.writer.running:
+            self.writer.journal(severity, message)
+        else:
+            JournalManager.write(severity, message)
+
+    @classmethod
+    def flush(cls, timeout: Optional[float] = 5) -> bool:
+        """Wait for the queued records and journal events to be written."""
+        return cls.writer.flush(timeout)
+
     def debug(self, message, **kwargs):
         self.root.debug(
             self.__color("debug", message),
@@ -69,28 +244,28 @@ class Logger(logging.getLoggerClass()):
             self.__color("info", message),
         )
         if jn:
-            JournalManager.write(JournalSeverity.INFO, message)
+            self.__journal(JournalSeverity.INFO, message)
 
     def warning(self, message, jn=True, **kwargs):
         self.root.warning(
             self.__color("warning", message),
         )
         if jn:
-            JournalManager.write(JournalSeverity.WARNING, message)
+            self.__journal(JournalSeverity.WARNING, message)
 
     def error(self, message, jn=True, **kwargs):
         self.root.error(
             self.__color("error", message),
         )
         if jn:
-            JournalManager.write(JournalSeverity.ERROR, message)
+            self.__journal(JournalSeverity.ERROR, message)
 
     def critical(self, message, jn=True, **kwargs):
         self.root.critical(
             self.__color("critical", message),
         )
         if jn:
-            JournalManager.write(JournalSeverity.CRITICAL, message)
+            self.__journal(JournalSeverity.CRITICAL, message)
 
     @staticmethod
     def write_log(data: list):
@@ -115,3 +290,6 @@ class Logger(logging.getLoggerClass()):
 
     def set_silent(self):
         self.root.handlers = []
+
+
+atexit.register(Logger.writer.stop)
@@ -15,16 +15,22 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import contextlib
+import hashlib
+import io
 import os
 import re
 import shutil
+import subprocess
 import tarfile
 import tempfile
-from concurrent.futures import CancelledError
+import time
+import uuid
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from datetime import datetime
 from gettext import gettext as _
-from threading import Event, Lock
-from typing import Callable, ClassVar, Optional
+from threading import BoundedSemaphore, Event, Lock, Thread
+from typing import Callable, ClassVar, Dict, List, Optional, Set
 
 import pathvalidate
 
@@ -34,23 +40,38 @@ from bottles.backend.managers.manager import Manager
 from bottles.backend.models.config import BottleConfig
 from bottles.backend.models.result import Result
 from bottles.backend.state import Task, TaskManager
-from bottles.backend.utils import yaml
+from bottles.backend.utils import json, yaml
+from bottles.backend.utils.clone import TreeCloner
 from bottles.backend.utils.manager import ManagerUtils
 
 logging = Logger()
 
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
 
 class _CancellableReader:
-    def __init__(self, stream, cancel_event: Event):
+    def __init__(
+        self,
+        stream,
+        cancel_event: Optional[Event] = None,
+        progress: Optional["ProgressTrackingFilter"] = None,
+        digest=None,
+    ):
         self._stream = stream
         self._cancel_event = cancel_event
+        self._progress = progress
+        self._digest = digest
 
     def read(self, size=-1):
-        if self._cancel_event.is_set():
+        if self._cancel_event and self._cancel_event.is_set():
             raise CancelledError
         data = self._stream.read(size)
-        if self._cancel_event.is_set():
+        if self._cancel_event and self._cancel_event.is_set():
             raise CancelledError
+        if self._progress is not None:
+            self._progress.advance(len(data))
+        if self._digest is not None:
+            self._digest.update(data)
         return data
 
 
@@ -60,10 +81,14 @@ class _BackupTarFile(tarfile.TarFile):
         *args,
         source_path: str,
         cancel_event: Optional[Event] = None,
+        progress: Optional["ProgressTrackingFilter"] = None,
+        manifest: Optional["_ManifestFilter"] = None,
         **kwargs,
     ):
         self._source_path = source_path
         self._cancel_event = cancel_event
+        self._progress = progress
+        self._manifest = manifest
         super().__init__(*args, **kwargs)
 
     def add(self, name, arcname=None, recursive=True, *, filter=None):
@@ -111,9 +136,17 @@ class _BackupTarFile(tarfile.TarFile):
     def addfile(self, tarinfo, fileobj=None):
         if self._cancel_event and self._cancel_event.is_set():
             raise CancelledError
-        if fileobj is not None and self._cancel_event is not None:
-            fileobj = _CancellableReader(fileobj, self._cancel_event)
-        return super().addfile(tarinfo, fileobj)
+        digest = None
+        if fileobj is not None and self._manifest is not None:
+            digest = self._manifest.digest_for(tarinfo)
+        if fileobj is not None and (self._cancel_event or self._progress or digest):
+            fileobj = _CancellableReader(
+                fileobj, self._cancel_event, self._progress, digest
+            )
+        result = super().addfile(tarinfo, fileobj)
+        if digest is not None:
+            self._manifest.record(tarinfo, digest.hexdigest())
+        return result
 
     def _skip_missing(self, name, error):
         if os.path.realpath(name) == self._source_path:
@@ -121,10 +154,99 @@ class _BackupTarFile(tarfile.TarFile):
         logging.warning(f"Skipping file removed during backup: {name}")
 
 
+def _remove_existing(path: str):
+    """Remove what a restored member replaces, never writing through it."""
+    if os.path.islink(path) or (os.path.exists(path) and not os.path.isdir(path)):
+        os.unlink(path)
+
+
+class _RestoredFile:
+    def __init__(self, fd: int, path: str, member: tarfile.TarInfo):
+        self.fd = fd
+        self.path = path
+        self.member = member
+        self.pending = 1  # the reader holds one until all chunks are queued
+        self.lock = Lock()
+
+
+class _RestoreWriter:
+    """
+    Write the files of a backup from a pool of threads while the caller
+    keeps reading the archive. Each file is queued as chunks written with
+    pwrite, at most max_pending chunks are held in memory. Blocks of
+    zeros are skipped, leaving holes, so sparse files stay sparse.
+    """
+
+    chunk_size = 4 * 1024 * 1024
+    block_size = 64 * 1024
+    _zeros = memoryview(bytes(block_size))
+
+    def __init__(self, workers: int = 0, max_pending: int = 16):
+        self._pool = ThreadPoolExecutor(workers or min(8, os.cpu_count() or 1))
+        self._slots = BoundedSemaphore(max_pending)
+        self._errors: List[str] = []
+
+    def write(self, tar: tarfile.TarFile, member: tarfile.TarInfo, path: str):
+        """Queue a regular file, it is read from the archive right away."""
+        _remove_existing(path)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_CLOEXEC, 0o600)
+        file = _RestoredFile(fd, path, member)
+        try:
+            source = tar.extractfile(member)
+            offset = 0
+            while offset < member.size:
+                data = source.read(min(self.chunk_size, member.size - offset))
+                if not data:
+                    raise tarfile.ReadError(f"Unexpected end of data: {member.name}")
+                self._slots.acquire()
+                with file.lock:
+                    file.pending += 1
+                self._pool.submit(self._write_chunk, file, offset, data)
+                offset += len(data)
+        finally:
+            self._release(file)
+
+    def _write_chunk(self, file: _RestoredFile, offset: int, data: bytes):
+        try:
+            view = memoryview(data)
+            for start in range(0, len(view), self.block_size):
+                block = view[start : start + self.block_size]
+                if block != self._zeros[: len(block)]:
+                    os.pwrite(file.fd, block, offset + start)
+        except OSError as error:
+            self._errors.append(f"{file.path}: {error}")
+        finally:
+            self._slots.release()
+            self._release(file)
+
+    def _release(self, file: _RestoredFile):
+        with file.lock:
+            file.pending -= 1
+            if file.pending:
+                return
+        try:
+            # trailing holes were never written
+            os.ftruncate(file.fd, file.member.size)
+            os.fchmod(file.fd, file.member.mode & 0o7777)
+        except OSError as error:
+            self._errors.append(f"{file.path}: {error}")
+        finally:
+            os.close(file.fd)
+        with contextlib.suppress(OSError):
+            os.utime(file.path, (file.member.mtime, file.member.mtime))
+
+    def close(self, check: bool = True):
+        """Wait for the queued files, raises OSError if any failed."""
+        self._pool.shutdown(wait=True)
+        if check and self._errors:
+            raise OSError("; ".join(self._errors[:5]))
+
+
 class ProgressTrackingFilter:
     """
     A filter wrapper that tracks uncompressed bytes being added to the tar
-    and reports progress via a Task.
+    and reports progress via a Task. The bytes are counted as they are
+    read, the total may be set later, once the size estimate is done.
     """
 
     def __init__(
@@ -151,13 +273,16 @@ class ProgressTrackingFilter:
             if tarinfo is None:
                 return None
 
-        # Track progress based on file size being added
-        if tarinfo.isfile():
-            self._processed += tarinfo.size
-            self._update_progress()
-
         return tarinfo
 
+    def set_total(self, total_size: int):
+        self._total_size = total_size
+        self._update_progress()
+
+    def advance(self, size: int):
+        self._processed += size
+        self._update_progress()
+
     def _update_progress(self):
         if self._task and self._total_size > 0:
             percent = min(int(self._processed * 100 / self._total_size), 99)
@@ -166,9 +291,153 @@ class ProgressTrackingFilter:
                 self._task.subtitle = f"{percent}%"
 
 
+class BackupManifest:
+    """
+    The files of a bottle backup by path relative to the bottle, as
+    [size, mtime, sha256]. Incremental backups also name the backup they
+    build on and the files deleted since; they only hold the files that
+    changed. The manifest is the last member of the archive and is also
+    written next to it as <archive>.json, so the next incremental backup
+    doesn't have to decompress the archive to find it.
+    """
+
+    NAME = ".bottles-backup.json"
+    VERSION = 1
+
+    def __init__(self, bottle: str, parent: Optional["BackupManifest"] = None):
+        self.id = uuid.uuid4().hex
+        self.bottle = bottle
+        self.created = datetime.now().isoformat()
+        self.parent_id = parent.id if parent else None
+        self.parent_file: Optional[str] = None
+        self.files: Dict[str, list] = {}
+        self.deleted: List[str] = []
+
+    @property
+    def incremental(self) -> bool:
+        return self.parent_id is not None
+
+    @staticmethod
+    def sidecar_path(archive_path: str) -> str:
+        return f"{archive_path}.json"
+
+    def dumps(self) -> str:
+        return json.dumps(
+            {
+                "version": self.VERSION,
+                "id": self.id,
+                "bottle": self.bottle,
+                "created": self.created,
+                "parent": self.parent_id,
+                "parent_file": self.parent_file,
+                "files": self.files,
+                "deleted": self.deleted,
+            }
+        )
+
+    @classmethod
+    def loads(cls, data: str | bytes) -> "BackupManifest":
+        content = json.loads(data)
+        if content.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported backup manifest: {content.get('version')}")
+        manifest = cls(content["bottle"])
+        manifest.id = content["id"]
+        manifest.created = content["created"]
+        manifest.parent_id = content.get("parent")
+        manifest.parent_file = content.get("parent_file")
+        manifest.files = content.get("files", {})
+        manifest.deleted = content.get("deleted", [])
+        return manifest
+
+
+class _ManifestFilter:
+    """
+    Tar filter filling a manifest. With the manifest of the previous
+    backup, files whose size and mtime are unchanged are skipped, and so
+    are files only touched, whose content hash didn't change. The hash of
+    archived files is computed while they are read into the archive.
+    """
+
+    def __init__(
+        self,
+        source_path: str,
+        manifest: BackupManifest,
+        previous: Optional[BackupManifest] = None,
+        base_filter: Optional[Callable] = None,
+    ):
+        self._root = os.path.dirname(source_path)
+        self._prefix = f"{os.path.basename(source_path)}/"
+        self._manifest = manifest
+        self._previous = previous.files if previous else {}
+        self._base_filter = base_filter
+        self._others: Set[str] = set()
+        self.progress: Optional[ProgressTrackingFilter] = None
+
+    def __call__(self, tarinfo: tarfile.TarInfo) -> Optional[tarfile.TarInfo]:
+        if self._base_filter:
+            tarinfo = self._base_filter(tarinfo)
+            if tarinfo is None:
+                return None
+        if not tarinfo.isreg():
+            # e.g. a file replaced by a symlink, which is not deleted
+            self._others.add(tarinfo.name[len(self._prefix) :])
+            return tarinfo
+        if not self._changed(tarinfo):
+            # unchanged files count as done, the estimate includes them
+            if self.progress is not None:
+                self.progress.advance(tarinfo.size)
+            return None
+        return tarinfo
+
+    def _changed(self, tarinfo: tarfile.TarInfo) -> bool:
+        path = tarinfo.name[len(self._prefix) :]
+        entry = self._previous.get(path)
+        if entry is None:
+            return True
+        if entry[:2] == [tarinfo.size, tarinfo.mtime]:
+            self._manifest.files[path] = entry
+            return False
+
+        try:
+            with open(os.path.join(self._root, tarinfo.name), "rb") as file:
+                digest = hashlib.file_digest(file, "sha256").hexdigest()
+        except OSError:
+            return True
+        if digest != entry[2]:
+            return True
+        self._manifest.files[path] = [tarinfo.size, tarinfo.mtime, digest]
+        return False
+
+    def digest_for(self, tarinfo: tarfile.TarInfo):
+        if tarinfo.isreg() and tarinfo.name.startswith(self._prefix):
+            return hashlib.sha256()
+        return None
+
+    def record(self, tarinfo: tarfile.TarInfo, digest: str):
+        path = tarinfo.name[len(self._prefix) :]
+        self._manifest.files[path] = [tarinfo.size, tarinfo.mtime, digest]
+
+    def finish(self):
+        """List the files of the previous backup which are gone."""
+        self._manifest.deleted = sorted(
+            path
+            for path in self._previous
+            if path not in self._manifest.files and path not in self._others
+        )
+
+
 class BackupManager:
+    COMPRESSION_GZIP = "gz"
+    COMPRESSION_ZSTD = "zst"
     _BOTTLE_PATH_TOKEN = "%BOTTLE_PATH%"
     _PROGRAM_BACKUP_PATTERN = re.compile(r"^\d{8}-\d{6}-\d{6}$")
+    _DUPLICATE_ITEMS = (
+        "drive_c",
+        "system.reg",
+        "user.reg",
+        "userdef.reg",
+        "bottle.yml",
+    )
     _program_backup_locks: ClassVar[dict[str, Lock]] = {}
     _program_backup_locks_guard: ClassVar[Lock] = Lock()
 
@@ -500,9 +769,20 @@ class BackupManager:
         exclude_filter: Optional[Callable] = None,
         task: Optional[Task] = None,
         cancel_event: Optional[Event] = None,
+        compression: str = COMPRESSION_GZIP,
+        manifest: Optional[BackupManifest] = None,
+        previous: Optional[BackupManifest] = None,
     ) -> bool:
-        """Helper function to create a tar.gz file from a source path."""
+        """
+        Helper function to create a tar.gz or tar.zst file from a source
+        path. The size used for progress is computed while archiving.
+        With a manifest, it is filled and stored with the archive; with
+        the manifest of the previous backup too, only the files changed
+        since are archived.
+        """
         temp_path = None
+        sidecar_temp_path = None
+        scan_done = Event()
         try:
             source_path = os.path.realpath(source_path)
             destination_path = os.path.abspath(destination_path)
@@ -518,25 +798,29 @@ class BackupManager:
                 logging.error("The backup destination is inside the bottle.")
                 return False
 
-            # Calculate total size for progress tracking
-            total_size = 0
-            if task:
-                task.subtitle = _("Calculating...")
-                total_size = BackupManager._calculate_dir_size(
-                    source_path, exclude_filter, cancel_event
-                )
-
             if cancel_event and cancel_event.is_set():
                 raise CancelledError
 
-            # Create progress-tracking filter if task is provided
-            if task and total_size > 0:
-                progress_filter = ProgressTrackingFilter(
-                    total_size, task, exclude_filter, cancel_event
+            manifest_filter = None
+            active_filter = exclude_filter
+            if manifest is not None:
+                manifest_filter = _ManifestFilter(
+                    source_path, manifest, previous, exclude_filter
                 )
-                active_filter = progress_filter
-            else:
-                active_filter = exclude_filter
+                active_filter = manifest_filter
+
+            progress = None
+            if task:
+                task.subtitle = _("Calculating...")
+                progress = ProgressTrackingFilter(0, task, active_filter, cancel_event)
+                active_filter = progress
+                if manifest_filter is not None:
+                    manifest_filter.progress = progress
+                Thread(
+                    target=BackupManager._estimate_size,
+                    args=(source_path, exclude_filter, progress, scan_done),
+                    daemon=True,
+                ).start()
 
             file_descriptor, temp_path = tempfile.mkstemp(
                 prefix=f".{os.path.basename(destination_path)}.",
@@ -544,24 +828,50 @@ class BackupManager:
                 dir=destination_dir,
             )
             with os.fdopen(file_descriptor, "wb") as temp_file:
-                with _BackupTarFile.open(
-                    temp_path,
-                    "w:gz",
-                    fileobj=temp_file,
-                    source_path=source_path,
-                    cancel_event=cancel_event,
-                ) as tar:
-                    tar.add(
-                        source_path,
-                        arcname=os.path.basename(source_path),
-                        filter=active_filter,
-                    )
+                with BackupManager._open_compressor(temp_file, compression) as (
+                    mode,
+                    output,
+                ):
+                    with _BackupTarFile.open(
+                        temp_path,
+                        mode,
+                        fileobj=output,
+                        source_path=source_path,
+                        cancel_event=cancel_event,
+                        progress=progress,
+                        manifest=manifest_filter,
+                    ) as tar:
+                        tar.add(
+                            source_path,
+                            arcname=os.path.basename(source_path),
+                            filter=active_filter,
+                        )
+                        if manifest_filter is not None:
+                            manifest_filter.finish()
+                            data = manifest.dumps().encode()
+                            info = tarfile.TarInfo(BackupManifest.NAME)
+                            info.size = len(data)
+                            info.mtime = int(time.time())
+                            tar.addfile(info, io.BytesIO(data))
 
             if cancel_event and cancel_event.is_set():
                 raise CancelledError
 
+            if manifest is not None:
+                sidecar_path = BackupManifest.sidecar_path(destination_path)
+                file_descriptor, sidecar_temp_path = tempfile.mkstemp(
+                    prefix=f".{os.path.basename(sidecar_path)}.",
+                    suffix=".tmp",
+                    dir=destination_dir,
+                )
+                with os.fdopen(file_descriptor, "w") as sidecar_file:
+                    sidecar_file.write(manifest.dumps())
+
             os.replace(temp_path, destination_path)
             temp_path = None
+            if sidecar_temp_path:
+                os.replace(sidecar_temp_path, sidecar_path)
+                sidecar_temp_path = None
 
             if task:
                 task.subtitle = "100%"
@@ -574,66 +884,298 @@ class BackupManager:
             logging.error(f"Error creating backup: {e}")
             return False
         finally:
-            if temp_path:
-                try:
-                    os.remove(temp_path)
-                except FileNotFoundError:
-                    pass
+            scan_done.set()
+            for path in (temp_path, sidecar_temp_path):
+                if path:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    @staticmethod
+    def _estimate_size(
+        source_path: str,
+        exclude_filter: Optional[Callable],
+        progress: ProgressTrackingFilter,
+        done: Event,
+    ):
+        # runs alongside the archiving, which starts right away
+        try:
+            total_size = BackupManager._calculate_dir_size(
+                source_path, exclude_filter, done
+            )
+        except CancelledError:
+            return
+        progress.set_total(total_size)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_compressor(output, compression: str):
+        """
+        Yield the tarfile mode and the file object to write the archive
+        to. zstd compresses in a separate process using all the cores.
+        """
+        if compression == BackupManager.COMPRESSION_GZIP:
+            yield "w:gz", output
+            return
+        if compression != BackupManager.COMPRESSION_ZSTD:
+            raise ValueError(f"Unknown backup compression: {compression}")
+
+        zstd = shutil.which("zstd")
+        if zstd is None:
+            raise OSError("zstd is required for .tar.zst backups")
+        process = subprocess.Popen(
+            [zstd, "-q", "-T0", "-c"], stdin=subprocess.PIPE, stdout=output
+        )
+        try:
+            yield "w|", process.stdin
+            process.stdin.close()
+            if process.wait() != 0:
+                raise OSError(f"zstd failed with exit code {process.returncode}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdin.close()
+
+    @staticmethod
+    def compression_for(path: str) -> str:
+        """The compression of a new backup, from its file name."""
+        if path.endswith(".zst"):
+            return BackupManager.COMPRESSION_ZSTD
+        return BackupManager.COMPRESSION_GZIP
 
     @staticmethod
     def _safe_extract_tarfile(
         tar_path: str, extract_path: str, task: Optional[Task] = None
     ) -> bool:
         """
-        Safely extract a tar.gz file to avoid directory traversal
-        vulnerabilities.
+        Safely extract a tar.gz or tar.zst file to avoid directory traversal
+        vulnerabilities. The format is detected from the magic bytes.
         """
         try:
-            with tarfile.open(tar_path, "r:gz") as tar:
-                members = tar.getmembers()
-
-                # Validate all members first
-                for member in members:
-                    member_path = os.path.abspath(
-                        os.path.join(extract_path, member.name)
-                    )
-                    if not member_path.startswith(os.path.abspath(extract_path)):
-                        raise Exception("Detected path traversal attempt in tar file")
-
-                if task:
-                    # Calculate total size for progress
-                    total_size = sum(m.size for m in members if m.isfile())
-                    extracted_size = 0
-                    last_percent = -1
-
-                    for member in members:
-                        tar.extract(member, path=extract_path)
-                        if member.isfile():
-                            extracted_size += member.size
-                            percent = (
-                                min(int(extracted_size * 100 / total_size), 99)
-                                if total_size > 0
-                                else 0
-                            )
-                            if percent != last_percent:
-                                last_percent = percent
-                                task.subtitle = f"{percent}%"
-                    task.subtitle = "100%"
-                else:
-                    tar.extractall(path=extract_path)
-
+            BackupManager._extract_stream(tar_path, extract_path, task)
             return True
         except (tarfile.TarError, Exception) as e:
             logging.error(f"Error extracting backup: {e}")
             return False
 
     @staticmethod
-    def export_backup(config: BottleConfig, scope: str, path: str) -> Result:
+    def _check_member(member: tarfile.TarInfo, extract_path: str):
+        names = [member.name]
+        if member.islnk():
+            names.append(member.linkname)
+        for name in names:
+            member_path = os.path.abspath(os.path.join(extract_path, name))
+            if not member_path.startswith(os.path.abspath(extract_path)):
+                raise Exception("Detected path traversal attempt in tar file")
+            # a symlink restored earlier must not lead the member elsewhere
+            root = os.path.realpath(extract_path)
+            parent = os.path.realpath(os.path.dirname(member_path))
+            if os.path.commonpath((root, parent)) != root:
+                raise Exception("Detected path traversal attempt in tar file")
+
+    @staticmethod
+    def _extract_stream(tar_path: str, extract_path: str, task: Optional[Task]):
+        """
+        Extract a backup in a single streaming pass: members are checked
+        one by one as they are read, regular files are written by a pool
+        of threads. Progress is the share of the compressed file consumed,
+        with the restore speed.
+        """
+        compressed_size = os.path.getsize(tar_path)
+        directories = []
+        written = 0
+        start = time.monotonic()
+        last_update = 0.0
+        writer = _RestoreWriter()
+        try:
+            with BackupManager._open_archive_stream(tar_path) as (tar, archive):
+                for member in tar:
+                    if member.name == BackupManifest.NAME:
+                        continue
+                    BackupManager._check_member(member, extract_path)
+                    target = os.path.join(extract_path, member.name)
+                    if member.isreg():
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        writer.write(tar, member, target)
+                        written += member.size
+                    elif member.isdir():
+                        # attributes are set last, files change the mtime
+                        tar.extract(member, path=extract_path, set_attrs=False)
+                        directories.append(member)
+                    elif member.islnk():
+                        # tarfile would look for the target back in the
+                        # stream if the link exists, it is restored already
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        _remove_existing(target)
+                        source = os.path.join(extract_path, member.linkname)
+                        os.link(source, target, follow_symlinks=False)
+                    else:
+                        if member.issym():
+                            _remove_existing(target)
+                        tar.extract(member, path=extract_path)
+
+                    now = time.monotonic()
+                    if not task or compressed_size == 0 or now - last_update < 0.5:
+                        continue
+                    last_update = now
+                    consumed = os.lseek(archive.fileno(), 0, os.SEEK_CUR)
+                    percent = min(int(consumed * 100 / compressed_size), 99)
+                    speed = written / 1024**2 / max(now - start, 1e-3)
+                    task.subtitle = f"{percent}% ({speed:.0f} MiB/s)"
+
+                writer.close()
+                for member in reversed(directories):
+                    target = os.path.join(extract_path, member.name)
+                    tar.chmod(member, target)
+                    tar.utime(member, target)
+        except BaseException:
+            writer.close(check=False)
+            raise
+
+        logging.info(
+            f"Restored {written / 1024**2:.1f} MiB in "
+            f"{time.monotonic() - start:.1f}s from {tar_path}"
+        )
+        if task:
+            task.subtitle = "100%"
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_archive_stream(tar_path: str):
+        """
+        Yield a streaming TarFile reading a tar.gz or tar.zst file, and
+        the compressed file. zstd reads from our file descriptor, so its
+        offset tells how much of the file was consumed in both cases.
+        """
+        # unbuffered, zstd must start reading at the offset we seek to
+        with open(tar_path, "rb", buffering=0) as archive:
+            is_zstd = archive.read(len(ZSTD_MAGIC)) == ZSTD_MAGIC
+            archive.seek(0)
+            if not is_zstd:
+                with tarfile.open(fileobj=archive, mode="r|gz") as tar:
+                    yield tar, archive
+                return
+
+            zstd = shutil.which("zstd")
+            if zstd is None:
+                raise OSError("zstd is required to import .tar.zst backups")
+            process = subprocess.Popen(
+                [zstd, "-d", "-q", "-c"], stdin=archive, stdout=subprocess.PIPE
+            )
+            try:
+                with tarfile.open(fileobj=process.stdout, mode="r|") as tar:
+                    yield tar, archive
+                process.stdout.close()
+                if process.wait() != 0:
+                    raise OSError(f"zstd failed with exit code {process.returncode}")
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+
+    @staticmethod
+    def _read_manifest(tar_path: str) -> Optional[BackupManifest]:
+        """
+        The manifest of a backup, from the file next to it or else from
+        the archive. Backups made before manifests existed have none.
+        """
+        try:
+            with open(BackupManifest.sidecar_path(tar_path), "rb") as file:
+                return BackupManifest.loads(file.read())
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as error:
+            logging.warning(f"Ignoring the manifest next to {tar_path}: {error}")
+
+        with BackupManager._open_archive_stream(tar_path) as (tar, _archive):
+            for member in tar:
+                if member.name == BackupManifest.NAME:
+                    return BackupManifest.loads(tar.extractfile(member).read())
+        return None
+
+    @staticmethod
+    def _find_previous_backup(directory: str, bottle: str) -> Optional[str]:
+        """The newest backup of the bottle in the directory with a manifest."""
+        newest = None
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return None
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            archive = os.path.join(directory, name[: -len(".json")])
+            if not os.path.isfile(archive):
+                continue
+            try:
+                with open(os.path.join(directory, name), "rb") as file:
+                    manifest = BackupManifest.loads(file.read())
+            except (OSError, ValueError, KeyError):
+                continue
+            if manifest.bottle != bottle:
+                continue
+            if newest is None or manifest.created > newest[0]:
+                newest = (manifest.created, archive)
+        return newest[1] if newest else None
+
+    @staticmethod
+    def _backup_chain(tar_path: str) -> List[str]:
+        """
+        The backups to restore, oldest first: the full backup, then the
+        incremental ones up to tar_path. Parents are looked up next to it.
+        """
+        chain = [tar_path]
+        manifest = BackupManager._read_manifest(tar_path)
+        while manifest is not None and manifest.incremental:
+            if not manifest.parent_file:
+                raise ValueError("The backup manifest does not name its parent")
+            parent_path = os.path.join(
+                os.path.dirname(tar_path), os.path.basename(manifest.parent_file)
+            )
+            if parent_path in chain or not os.path.isfile(parent_path):
+                raise ValueError(f"Missing parent backup: {manifest.parent_file}")
+            parent = BackupManager._read_manifest(parent_path)
+            if parent is None or parent.id != manifest.parent_id:
+                raise ValueError(f"Parent backup does not match: {parent_path}")
+            chain.insert(0, parent_path)
+            manifest = parent
+        return chain
+
+    @staticmethod
+    def _apply_deletions(manifest: BackupManifest, extract_path: str):
+        bottle_path = os.path.realpath(os.path.join(extract_path, manifest.bottle))
+        for path in manifest.deleted:
+            # a symlink now at the path is removed, not what it points to
+            full_path = os.path.join(bottle_path, path)
+            parent = os.path.realpath(os.path.dirname(full_path))
+            name = os.path.basename(full_path)
+            if (
+                os.path.commonpath((bottle_path, parent)) != bottle_path
+                or name in ("", ".", "..")
+            ):
+                logging.warning(f"Ignoring deletion outside the bottle: {path}")
+                continue
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(parent, name))
+
+    @staticmethod
+    def export_backup(
+        config: BottleConfig,
+        scope: str,
+        path: str,
+        compression: Optional[str] = None,
+    ) -> Result:
         """
         Exports a bottle backup to the specified path.
-        Use the scope parameter to specify the backup type: config, full.
-        Config will only export the bottle configuration, full will export
-        the full bottle in tar.gz format.
+        Use the scope parameter to specify the backup type: config, full,
+        incremental. Config will only export the bottle configuration, full
+        will export the full bottle in tar.gz or tar.zst format, by default
+        picked from the file name. Incremental only exports the files that
+        changed since the newest backup of the bottle in the same folder, or
+        a full backup if there is none.
         """
         if not BackupManager._validate_path(path):
             return Result(status=False)
@@ -646,14 +1188,31 @@ class BackupManager:
             task = Task(title=_("Backup {0}").format(config.Name), cancellable=True)
             task_id = TaskManager.add(task)
             bottle_path = ManagerUtils.get_bottle_path(config)
+            bottle = os.path.basename(os.path.realpath(bottle_path))
             backup_cancelled = False
             try:
+                previous = None
+                manifest = BackupManifest(bottle)
+                if scope == "incremental":
+                    previous_path = BackupManager._find_previous_backup(
+                        os.path.dirname(os.path.abspath(path)), bottle
+                    )
+                    if previous_path:
+                        previous = BackupManager._read_manifest(previous_path)
+                    if previous is not None:
+                        manifest = BackupManifest(bottle, parent=previous)
+                        manifest.parent_file = os.path.basename(previous_path)
+                    else:
+                        logging.info("No previous backup found, making a full one.")
                 backup_created = BackupManager._create_tarfile(
                     bottle_path,
                     path,
                     exclude_filter=BackupManager.exclude_filter,
                     task=task,
                     cancel_event=task.cancel_event,
+                    compression=compression or BackupManager.compression_for(path),
+                    manifest=manifest,
+                    previous=previous,
                 )
                 backup_cancelled = not backup_created and task.cancel_event.is_set()
             finally:
@@ -686,7 +1245,8 @@ class BackupManager:
         Imports a backup from the specified path.
         Use the scope parameter to specify the backup type: config, full.
         Config will make a new bottle reproducing the configuration, full will
-        import the full bottle from a tar.gz file.
+        import the full bottle from a tar.gz or tar.zst file. For incremental
+        backups, the backups they build on are restored first.
         """
         if not BackupManager._validate_path(path):
             return Result(status=False)
@@ -720,15 +1280,30 @@ class BackupManager:
     def _import_full_backup(path: str) -> Result:
         task = Task(title=_("Importing full backup"))
         task_id = TaskManager.add(task)
-        if BackupManager._safe_extract_tarfile(path, Paths.bottles, task=task):
-            Manager().update_bottles()
-            TaskManager.remove(task_id)
-            logging.info("Full backup imported successfully.")
-            return Result(status=True)
-        else:
+        try:
+            chain = BackupManager._backup_chain(path)
+        except (OSError, ValueError, KeyError, tarfile.TarError) as error:
             TaskManager.remove(task_id)
-            logging.error("Failed to import full backup.")
-            return Result(status=False)
+            logging.error(f"Failed to import full backup: {error}")
+            return Result(status=False, message=str(error))
+
+        for index, archive in enumerate(chain, start=1):
+            if len(chain) > 1:
+                logging.info(f"Restoring backup {index}/{len(chain)}: {archive}")
+            if not BackupManager._safe_extract_tarfile(
+                archive, Paths.bottles, task=task
+            ):
+                TaskManager.remove(task_id)
+                logging.error("Failed to import full backup.")
+                return Result(status=False)
+            if index > 1:
+                manifest = BackupManager._read_manifest(archive)
+                BackupManager._apply_deletions(manifest, Paths.bottles)
+
+        Manager().update_bottles()
+        TaskManager.remove(task_id)
+        logging.info("Full backup imported successfully.")
+        return Result(status=True)
 
     @staticmethod
     def duplicate_bottle(config: BottleConfig, name: str) -> Result:
@@ -768,26 +1343,31 @@ class BackupManager:
     ) -> Result:
         destination_created = False
         duplicate_succeeded = False
+        task = Task(title=_("Duplicating {0}").format(config.Name), cancellable=True)
+        task_id = TaskManager.add(task)
+        last_percent = -1
+
+        def only_bottle_items(directory: str, names: list) -> set:
+            if directory != source_path:
+                return set()
+            return set(names) - set(BackupManager._DUPLICATE_ITEMS)
+
+        def update_progress(done: int, total: int):
+            nonlocal last_percent
+            percent = min(int(done * 100 / total), 99) if total else 0
+            if percent != last_percent:
+                last_percent = percent
+                task.subtitle = f"{percent}%"
+
         try:
             os.makedirs(destination_path)
             destination_created = True
-            for item in [
-                "drive_c",
-                "system.reg",
-                "user.reg",
-                "userdef.reg",
-                "bottle.yml",
-            ]:
-                source_item = os.path.join(source_path, item)
-                destination_item = os.path.join(destination_path, item)
-                if os.path.isdir(source_item):
-                    shutil.copytree(
-                        source_item,
-                        destination_item,
-                        symlinks=True,
-                    )
-                elif os.path.isfile(source_item):
-                    shutil.copy(source_item, destination_item)
+            report = TreeCloner(
+                ignore=only_bottle_items,
+                progress=update_progress,
+                cancel_event=task.cancel_event,
+            ).clone(source_path, destination_path, dirs_exist_ok=True)
+            logging.info(f"Bottle files copied: {report}")
 
             # Update the bottle configuration
             config_path = os.path.join(destination_path, "bottle.yml")
@@ -798,12 +1378,17 @@ class BackupManager:
             with open(config_path, "w") as config_file:
                 yaml.dump(config_data, config_file, indent=4)
 
+            task.subtitle = "100%"
             logging.info(f"Bottle duplicated successfully as {new_name}.")
             duplicate_succeeded = True
             return Result(status=True)
+        except CancelledError:
+            logging.info("Bottle duplication cancelled.")
+            return Result(status=False, message="cancelled")
         except (OSError, shutil.Error) as e:
             logging.error(f"Error duplicating bottle: {e}")
             return Result(status=False, message=str(e))
         finally:
             if destination_created and not duplicate_succeeded:
                 shutil.rmtree(destination_path, ignore_errors=True)
+            TaskManager.remove(task_id)
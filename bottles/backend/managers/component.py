@@ -32,6 +32,7 @@ from bottles.backend.downloader import Downloader
 from bottles.backend.globals import Paths
 from bottles.backend.logger import Logger
 from bottles.backend.models.result import Result
+from bottles.backend.repos.component import ComponentRepo
 from bottles.backend.state import (
     LockManager,
     Locks,
@@ -145,26 +146,25 @@ class ComponentManager:
         if not isinstance(index, dict):
             return catalog
 
-        for component in index.items():
+        classified = getattr(self.__repo, "classified", None)
+        if classified is None:
+            classified = ComponentRepo.classify(index)
+
+        for category, names in classified.items():
             """
             For each component, append it to the corresponding
             catalog and mark it as installed if it is.
             """
-
-            if (
-                not isinstance(component[0], str)
-                or not component[0]
-                or not isinstance(component[1], dict)
-                or not isinstance(component[1].get("Category"), str)
-                or not isinstance(component[1].get("Channel"), str)
-            ):
+            if category not in catalog:
                 continue
 
-            if component[1].get("Category") == "runners":
-                if "soda" in component[0].lower() or "caffe" in component[0].lower():
+            for name in names:
+                if category in ("wine", "proton") and (
+                    "soda" in name.lower() or "caffe" in name.lower()
+                ):
                     if not is_glibc_min_available():
                         logging.warning(
-                            f"{component[0]} was found but it requires "
+                            f"{name} was found but it requires "
                             "glibc >= 2.32 and your system is running an older "
                             "version. Use the Flatpak instead if you can't "
                             "upgrade your system. This runner will be ignored, "
@@ -173,35 +173,16 @@ class ComponentManager:
                         )
                         continue
 
-                sub_category = component[1].get("Sub-category")
-                if sub_category not in ("wine", "proton"):
-                    continue
-                catalog[sub_category][component[0]] = component[1]
-                if component[0] in components_available[sub_category]:
-                    catalog[sub_category][component[0]]["Installed"] = True
+                catalog[category][name] = index[name]
+                if name in components_available[category]:
+                    catalog[category][name]["Installed"] = True
                 else:
-                    catalog[sub_category][component[0]].pop("Installed", None)
+                    catalog[category][name].pop("Installed", None)
                     if getattr(self, "_ComponentManager__offline", False):
-                        catalog[sub_category][component[0]]["Cached"] = (
-                            self.is_component_cached(component[0])
+                        catalog[category][name]["Cached"] = self.is_component_cached(
+                            name
                         )
 
-                continue
-
-            category = component[1].get("Category")
-            if category not in catalog:
-                continue
-
-            catalog[category][component[0]] = component[1]
-            if component[0] in components_available[category]:
-                catalog[category][component[0]]["Installed"] = True
-            else:
-                catalog[category][component[0]].pop("Installed", None)
-                if getattr(self, "_ComponentManager__offline", False):
-                    catalog[category][component[0]]["Cached"] = (
-                        self.is_component_cached(component[0])
-                    )
-
         return catalog
 
     def is_component_cached(self, name: str) -> bool:
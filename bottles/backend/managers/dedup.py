@@ -0,0 +1,301 @@
+# dedup.py
+#
+# Copyright 2025 mirkobrombin <brombin94@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import contextlib
+import dataclasses
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from bottles.backend.globals import Paths
+from bottles.backend.logger import Logger
+from bottles.backend.models.config import BottleConfig
+from bottles.backend.models.result import Result
+from bottles.backend.utils import json
+from bottles.backend.utils.clone import dedupe_range, is_unsupported, reflink
+from bottles.backend.utils.manager import ManagerUtils
+
+logging = Logger()
+
+
+@dataclasses.dataclass
+class DedupReport:
+    files: int = 0
+    bytes: int = 0
+    deduplicated: int = 0
+    bytes_saved: int = 0
+    new_objects: int = 0
+    seconds: float = 0.0
+
+    def __str__(self):
+        return (
+            f"{self.deduplicated} of {self.files} files shared, "
+            f"{self.bytes_saved / 1024**2:.1f} of {self.bytes / 1024**2:.1f} MiB "
+            f"saved, {self.new_objects} new objects in {self.seconds:.1f}s"
+        )
+
+
+class DedupManager:
+    """
+    Opt-in deduplication of identical files across bottles. Files are
+    hashed into a content-addressed store (objects/<sha256>) and bottles
+    holding the same content share its extents through FIDEDUPERANGE, so
+    every bottle keeps its own inodes: writing to a file (e.g. installing
+    DXVK) only unshares that file, nothing else changes. This needs a
+    filesystem with shared extents (Btrfs, XFS) holding both the store
+    and the bottles.
+
+    The files of each bottle in the store are listed in refs/<key>.json,
+    which also lets unchanged files be skipped on the next run. Objects no
+    bottle refers to anymore are removed by gc(), which runs when a bottle
+    is deleted.
+    """
+
+    default_paths = ("drive_c/windows",)
+    min_size = 64 * 1024
+
+    def __init__(
+        self,
+        store: Optional[str] = None,
+        paths: Sequence[str] = default_paths,
+        min_size: int = min_size,
+    ):
+        self.store = store or Paths.dedup
+        self.paths = paths
+        self.min_size = min_size
+
+    def __object_path(self, digest: str) -> str:
+        return os.path.join(self.store, "objects", digest[:2], digest)
+
+    @staticmethod
+    def __bottle_key(bottle: str) -> str:
+        return hashlib.sha1(os.path.realpath(bottle).encode()).hexdigest()[:16]
+
+    def __refs_path(self, bottle: str) -> str:
+        return os.path.join(self.store, "refs", f"{self.__bottle_key(bottle)}.json")
+
+    def __load_refs(self, bottle: str) -> Dict[str, list]:
+        try:
+            with open(self.__refs_path(bottle)) as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def __save_refs(self, bottle: str, files: Dict[str, list]):
+        path = self.__refs_path(bottle)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"path": bottle, "files": files}, f)
+            os.replace(tmp, path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
+
+    def __walk(self, bottle: str):
+        """Yield the relative path and stat of the files worth sharing."""
+        for base in self.paths:
+            for root, _dirs, files in os.walk(os.path.join(bottle, base)):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.lstat(path)
+                    except OSError:
+                        continue
+                    # hardlinked files are shared already, leave them alone
+                    if (
+                        st.st_size >= self.min_size
+                        and os.path.isfile(path)
+                        and not os.path.islink(path)
+                        and st.st_nlink == 1
+                    ):
+                        yield os.path.relpath(path, bottle), st
+
+    @staticmethod
+    def __hash(fd: int) -> str:
+        digest = hashlib.sha256()
+        while chunk := os.read(fd, 1024 * 1024):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def __share(self, path: str, st: os.stat_result, report: DedupReport) -> str:
+        """Share a file with the store, returns its digest."""
+        fd = os.open(path, os.O_RDWR)
+        try:
+            digest = self.__hash(fd)
+            obj = self.__object_path(digest)
+            try:
+                obj_fd = os.open(obj, os.O_RDONLY)
+            except FileNotFoundError:
+                self.__add_object(fd, obj)
+                report.new_objects += 1
+                return digest
+
+            try:
+                shared = dedupe_range(obj_fd, fd, st.st_size)
+            finally:
+                os.close(obj_fd)
+            if shared:
+                report.deduplicated += 1
+                report.bytes_saved += shared
+            return digest
+        finally:
+            os.close(fd)
+
+    def __add_object(self, fd: int, obj: str):
+        """Store a reflink of the file, sharing its extents from the start."""
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        tmp_fd, tmp = tempfile.mkstemp(dir=os.path.dirname(obj), suffix=".tmp")
+        try:
+            reflink(fd, tmp_fd)
+            os.fchmod(tmp_fd, 0o444)
+            os.close(tmp_fd)
+            tmp_fd = -1
+            os.replace(tmp, obj)
+        except OSError:
+            if tmp_fd != -1:
+                os.close(tmp_fd)
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
+
+    def dedup(self, config: BottleConfig) -> Result:
+        """Share the files of the bottle with the store, data is a DedupReport."""
+        start = time.perf_counter()
+        bottle = ManagerUtils.get_bottle_path(config)
+        report = DedupReport()
+
+        if not os.path.isdir(bottle):
+            return Result(False, message=f"Bottle not found: {bottle}")
+        os.makedirs(self.store, exist_ok=True)
+        if os.stat(self.store).st_dev != os.stat(bottle).st_dev:
+            return Result(
+                False, message="The store and the bottle are on different filesystems"
+            )
+
+        known = self.__load_refs(bottle)
+        files: Dict[str, list] = {}
+        for rel, st in self.__walk(bottle):
+            report.files += 1
+            report.bytes += st.st_size
+            signature = [st.st_size, st.st_mtime_ns]
+            ref = known.get(rel)
+            if ref is not None and ref[1:] == signature:
+                files[rel] = ref
+                continue
+
+            try:
+                digest = self.__share(os.path.join(bottle, rel), st, report)
+            except OSError as error:
+                if is_unsupported(error):
+                    logging.warning(
+                        f"Deduplication is not supported here: {error.strerror}"
+                    )
+                    return Result(False, data=report, message=str(error))
+                logging.debug(f"Skipping {rel}: {error}")
+                continue
+            files[rel] = [digest, *signature]
+
+        self.__save_refs(bottle, files)
+        report.seconds = time.perf_counter() - start
+        logging.info(f"Deduplicated {config.Name}: {report}")
+        return Result(True, data=report)
+
+    def rehydrate(self, config: BottleConfig) -> Result:
+        """
+        Give the bottle private copies of its shared files and forget its
+        references, e.g. before moving it to another filesystem.
+        """
+        bottle = ManagerUtils.get_bottle_path(config)
+        restored = 0
+        for rel in self.__load_refs(bottle):
+            path = os.path.join(bottle, rel)
+            try:
+                self.__unshare(path)
+                restored += 1
+            except FileNotFoundError:
+                continue
+            except OSError as error:
+                return Result(False, message=f"Failed to rehydrate {rel}: {error}")
+
+        self.release(config)
+        logging.info(f"Rehydrated {restored} files of {config.Name}")
+        return Result(True, data=restored)
+
+    @staticmethod
+    def __unshare(path: str):
+        # a plain copy, copy_file_range could share the extents again
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with open(path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            shutil.copystat(path, tmp)
+            os.replace(tmp, path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
+
+    def release(self, config: BottleConfig) -> Set[str]:
+        """
+        Forget the references of the bottle, e.g. when it is deleted,
+        returns the objects it referred to.
+        """
+        bottle = ManagerUtils.get_bottle_path(config)
+        released = {ref[0] for ref in self.__load_refs(bottle).values()}
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.__refs_path(bottle))
+        return released
+
+    def gc(self, released: Iterable[str] = ()) -> int:
+        """
+        Remove the objects no bottle refers to, returns the bytes freed.
+        Recent objects are kept unless they are in released.
+        """
+        released = set(released)
+        used = set()
+        refs_dir = os.path.join(self.store, "refs")
+        if os.path.isdir(refs_dir):
+            for name in os.listdir(refs_dir):
+                try:
+                    with open(os.path.join(refs_dir, name)) as f:
+                        refs = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                used.update(ref[0] for ref in refs.get("files", {}).values())
+
+        freed = 0
+        objects: List[str] = []
+        for root, _dirs, files in os.walk(os.path.join(self.store, "objects")):
+            objects.extend(os.path.join(root, name) for name in files)
+        # objects may be in use by a dedup run that didn't save its refs yet
+        limit = time.time() - 3600
+        for obj in objects:
+            if os.path.basename(obj) in used:
+                continue
+            with contextlib.suppress(OSError):
+                st = os.lstat(obj)
+                if st.st_mtime > limit and os.path.basename(obj) not in released:
+                    continue
+                os.remove(obj)
+                freed += st.st_size
+        return freed
@@ -20,7 +20,7 @@ import shutil
 import traceback
 from functools import lru_cache
 from glob import glob
-from typing import Callable, Optional
+from typing import Callable, Iterable, Optional
 
 from gettext import gettext as _
 
@@ -34,11 +34,12 @@ from bottles.backend.managers.registry_rule import RegistryRuleManager
 from bottles.backend.models.config import BottleConfig
 from bottles.backend.models.enum import Arch
 from bottles.backend.models.result import Result
+from bottles.backend.repos.dependency import DependencyRepo
 from bottles.backend.state import Status, Task, TaskManager
 from bottles.backend.utils.generic import validate_url
 from bottles.backend.utils.manager import ManagerUtils
 from bottles.backend.wine.executor import WineExecutor
-from bottles.backend.wine.reg import Reg, RegItem
+from bottles.backend.wine.reg import Reg
 from bottles.backend.wine.regkeys import RegKeys
 from bottles.backend.wine.regsvr32 import Regsvr32
 from bottles.backend.wine.uninstaller import Uninstaller
@@ -48,6 +49,15 @@ logging = Logger()
 
 
 class DependencyManager:
+    # steps which only edit the registry, see Reg.batch
+    registry_actions = (
+        "override_dll",
+        "set_register_key",
+        "register_font",
+        "replace_font",
+        "use_windows",
+    )
+
     def __init__(self, manager, offline: bool = False):
         self.__manager = manager
         self.__repo = manager.repository_manager.get_repo(
@@ -57,11 +67,53 @@ class DependencyManager:
         )
         self.__offline = offline
         self.__checksum_cache = {}
+        self.__manifests = {}
 
     @lru_cache
     def get_dependency(self, name: str, plain: bool = False) -> str | dict | bool:
+        manifest = self.__prefetched().get(name)
+        if not plain and isinstance(manifest, dict):
+            return manifest
         return self.__repo.get(name, plain)
 
+    def __prefetched(self) -> dict:
+        """The manifests got by prefetch, shared with get_dependency."""
+        return self.__dict__.setdefault("_DependencyManager__manifests", {})
+
+    def prefetch(self, names: Iterable[str]) -> dict:
+        """
+        Get the manifests of the given dependencies and of everything
+        they depend on, downloading the missing ones together instead of
+        one by one while walking the tree. get_dependency returns them
+        from then on. Dependencies without a valid manifest are left out.
+        """
+        manifests = {}
+        prefetched = self.__prefetched()
+        seen = set()
+        pending = list(dict.fromkeys(names))
+        while pending:
+            seen.update(pending)
+            missing = [name for name in pending if name not in prefetched]
+            if missing:
+                prefetched.update(self.__repo.get_manifests(missing))
+
+            found = []
+            for name in pending:
+                manifest = prefetched.get(name)
+                if not isinstance(manifest, dict):
+                    continue
+                manifests[name] = manifest
+                dependencies = manifest.get("Dependencies", [])
+                if isinstance(dependencies, list):
+                    found += [
+                        dependency
+                        for dependency in dependencies
+                        if isinstance(dependency, str) and dependency not in seen
+                    ]
+            pending = list(dict.fromkeys(found))
+
+        return manifests
+
     @lru_cache
     def fetch_catalog(self) -> dict:
         """
@@ -74,28 +126,11 @@ class DependencyManager:
         if not isinstance(index, dict):
             return catalog
 
-        for dependency in index.items():
-            if not isinstance(dependency[0], str) or not dependency[0]:
-                continue
-            if not isinstance(dependency[1], dict):
-                continue
-            category = dependency[1].get("Category")
-            description = dependency[1].get("Description")
-            arch = dependency[1].get("Arch", "win64_win32")
-            if (
-                not isinstance(category, str)
-                or not category
-                or not isinstance(description, str)
-                or not (
-                    isinstance(arch, str)
-                    or isinstance(arch, list)
-                    and all(isinstance(item, str) for item in arch)
-                )
-            ):
-                continue
-            catalog[dependency[0]] = dependency[1]
+        classified = getattr(self.__repo, "classified", None)
+        if classified is None:
+            classified = DependencyRepo.classify(index)
+        catalog = {name: index[name] for name in classified}
 
-        catalog = dict(sorted(catalog.items()))
         if getattr(self, "_DependencyManager__offline", False):
             for name, dependency in catalog.items():
                 dependency["Cached"] = {
@@ -418,35 +453,43 @@ class DependencyManager:
                         TaskManager.remove(task_id)
                         return _res
 
-        for step in steps:
-            """
-            Here we execute all steps in the manifest.
-            Steps are the actions performed to install the dependency.
-            """
-            arch = step.get("for", "win64_win32")
-            if config.Arch not in arch:
-                continue
+        reg = Reg(config)
+        with reg.batch():
+            for step in steps:
+                """
+                Here we execute all steps in the manifest.
+                Steps are the actions performed to install the dependency.
+                Consecutive registry steps are applied together, before
+                any other step runs.
+                """
+                arch = step.get("for", "win64_win32")
+                if config.Arch not in arch:
+                    continue
 
-            description = self.__describe_step(step)
-            self.__notify_progress(progress_cb, description, task=task)
-            self.__notify_progress_fraction(progress_progress_cb, None)
+                if step["action"] not in self.registry_actions:
+                    reg.flush()
 
-            res = self.__perform_steps(
-                config,
-                step,
-                task=task,
-                progress_cb=progress_cb,
-                progress_progress_cb=progress_progress_cb,
-            )
-            if not res.ok:
-                TaskManager.remove(task_id)
-                return Result(
-                    status=False,
-                    message=f"One or more steps failed for {dependency[0]}.",
+                description = self.__describe_step(step)
+                self.__notify_progress(progress_cb, description, task=task)
+                self.__notify_progress_fraction(progress_progress_cb, None)
+
+                res = self.__perform_steps(
+                    config,
+                    step,
+                    task=task,
+                    progress_cb=progress_cb,
+                    progress_progress_cb=progress_progress_cb,
                 )
-            if not res.data.get("uninstaller"):
-                uninstaller = False
+                if not res.ok:
+                    TaskManager.remove(task_id)
+                    return Result(
+                        status=False,
+                        message=f"One or more steps failed for {dependency[0]}.",
+                    )
+                if not res.data.get("uninstaller"):
+                    uninstaller = False
 
+        updates = []
         if dependency[0] not in config.Installed_Dependencies:
             """
             If the dependency is not already listed in the installed
@@ -457,9 +500,7 @@ class DependencyManager:
             if config.Installed_Dependencies:
                 dependencies = config.Installed_Dependencies + [dependency[0]]
 
-            self.__manager.update_config(
-                config=config, key="Installed_Dependencies", value=dependencies
-            )
+            updates.append(("Installed_Dependencies", dependencies))
             installed_new = True
 
         if manifest.get("Uninstaller"):
@@ -472,9 +513,8 @@ class DependencyManager:
 
         if not isinstance(uninstaller, str) or not uninstaller:
             uninstaller = "NO_UNINSTALLER"
-        self.__manager.update_config(
-            config, dependency[0], uninstaller, "Uninstallers"
-        )
+        updates.append((dependency[0], uninstaller, "Uninstallers"))
+        self.__manager.update_config_many(config, updates)
 
         # Remove entry from task manager
         TaskManager.remove(task_id)
@@ -1006,16 +1046,13 @@ class DependencyManager:
             logging.warning("Invalid replace_font, 'replace' field should be list.")
             return False
 
-        regs = [
-            RegItem(
-                key="HKEY_CURRENT_USER\\Software\\Wine\\Fonts\\Replacements",
-                value=r,
-                value_type="",
-                data=target_font,
-            )
-            for r in replaces
-        ]
-        reg.bulk_add(regs)
+        with reg.batch():
+            for r in replaces:
+                reg.add(
+                    key="HKEY_CURRENT_USER\\Software\\Wine\\Fonts\\Replacements",
+                    value=r,
+                    data=target_font,
+                )
         return True
 
     @staticmethod
@@ -18,7 +18,7 @@ import os
 import subprocess
 import uuid
 from functools import lru_cache
-from typing import Optional
+from typing import Iterable, Optional
 
 import markdown
 import pycurl
@@ -48,6 +48,7 @@ class InstallerManager:
         self.__utils_conn = manager.utils_conn
         self.__component_manager = manager.component_manager
         self.__local_resources = {}
+        self.__manifests = {}
 
     @lru_cache
     def get_review(self, installer_name, parse: bool = True) -> str:
@@ -67,8 +68,52 @@ class InstallerManager:
         Return an installer manifest from the repository. Use the plain
         argument to get the manifest as plain text.
         """
+        manifest = self.__prefetched().get(installer_name)
+        if not plain and isinstance(manifest, dict):
+            return manifest
         return self.__repo.get(installer_name, plain)
 
+    def __prefetched(self) -> dict:
+        """The manifests got by prefetch, shared with get_installer."""
+        return self.__dict__.setdefault("_InstallerManager__manifests", {})
+
+    def prefetch(self, names: Iterable[str]) -> dict:
+        """
+        Get the manifests of the given installers, of the installers they
+        install first and of all their dependencies, downloading the
+        missing ones together. get_installer returns them from then on.
+        """
+        manifests = {}
+        dependencies = []
+        prefetched = self.__prefetched()
+        seen = set()
+        pending = list(dict.fromkeys(names))
+        while pending:
+            seen.update(pending)
+            missing = [name for name in pending if name not in prefetched]
+            if missing:
+                prefetched.update(self.__repo.get_manifests(missing))
+
+            found = []
+            for name in pending:
+                manifest = prefetched.get(name)
+                if not isinstance(manifest, dict):
+                    continue
+                manifests[name] = manifest
+                for installer in manifest.get("Installers") or []:
+                    if isinstance(installer, (list, tuple)) and installer:
+                        installer = installer[0]
+                    if isinstance(installer, str) and installer not in seen:
+                        found.append(installer)
+                if isinstance(manifest.get("Dependencies"), list):
+                    dependencies += manifest["Dependencies"]
+            pending = list(dict.fromkeys(found))
+
+        dependencies = [name for name in dependencies if isinstance(name, str)]
+        if dependencies:
+            self.__manager.dependency_manager.prefetch(dependencies)
+        return manifests
+
     @lru_cache
     def fetch_catalog(self) -> dict:
         """Fetch the installers catalog from the repository"""
@@ -135,6 +180,9 @@ class InstallerManager:
     ):
         """Install a list of dependencies"""
         _config = config
+        self.__manager.dependency_manager.prefetch(
+            [dep for dep in dependencies if dep not in config.Installed_Dependencies]
+        )
 
         for dep in dependencies:
             if is_final:
@@ -17,14 +17,18 @@
 
 import contextlib
 import os
-import shutil
+import sqlite3
+import threading
+import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import ClassVar, Optional
 
 from bottles.backend.globals import Paths
 from bottles.backend.utils import yaml
 
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 class JournalSeverity:
     """Represents the severity of a journal entry."""
@@ -39,75 +43,138 @@ class JournalSeverity:
 
 class JournalManager:
     """
-    Store and retrieve data from the journal file (YAML). This should
+    Store and retrieve data from the journal database (SQLite). This should
     contain only important Bottles events.
+
+    Events are appended and looked up by their timestamp index, so writing
+    one doesn't depend on the size of the journal. Events older than a
+    month are removed by a background thread, at most once per
+    cleanup_interval seconds. The YAML journal of older versions is
+    imported the first time the database is opened.
     """
 
-    path = f"{Paths.base}/journal.yml"
+    path = Paths.journal
+    legacy_path = f"{Paths.base}/journal.yml"
+    retention = timedelta(days=30)
+    cleanup_interval = 3600
+
+    _conn: ClassVar[Optional[sqlite3.Connection]] = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+    _last_cleanup: ClassVar[float] = 0.0
 
     @staticmethod
-    def __get_journal() -> dict:
-        """Return the journal as a dictionary."""
-        if not os.path.exists(JournalManager.path):
-            with open(JournalManager.path, "w") as f:
-                yaml.dump({}, f)
-
-        with open(JournalManager.path, "r") as f:
-            try:
-                journal = yaml.load(f)
-            except yaml.YAMLError:
-                journal_backup = f"{JournalManager.path}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.bak"
-                shutil.copy2(JournalManager.path, journal_backup)
-                journal = {}
+    def __connect() -> sqlite3.Connection:
+        """Open the database on first use, call with the lock held."""
+        if JournalManager._conn is not None:
+            return JournalManager._conn
+
+        os.makedirs(os.path.dirname(JournalManager.path), exist_ok=True)
+        conn = sqlite3.connect(JournalManager.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA busy_timeout=3000;")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                id TEXT PRIMARY KEY,
+                severity TEXT NOT NULL,
+                message TEXT NOT NULL,
+                timestamp TEXT NOT NULL
+            );
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp);"
+        )
+        conn.commit()
+        JournalManager.__migrate(conn)
+        JournalManager._conn = conn
+        return conn
 
-        if journal is None:
-            return {}
+    @staticmethod
+    def __migrate(conn: sqlite3.Connection):
+        """Import the YAML journal once, then move it out of the way."""
+        legacy_path = JournalManager.legacy_path
+        if not os.path.exists(legacy_path):
+            return
 
         try:
-            journal = {
-                k: v
-                for k, v in sorted(
-                    journal.items(), key=lambda item: item[1]["timestamp"], reverse=True
+            with open(legacy_path, "r") as f:
+                journal = yaml.load(f)
+        except (OSError, yaml.YAMLError):
+            journal = None
+
+        rows = []
+        if isinstance(journal, dict):
+            for event_id, event in journal.items():
+                if not isinstance(event, dict) or not event.get("timestamp"):
+                    continue
+                rows.append(
+                    (
+                        str(event_id),
+                        str(event.get("severity", JournalSeverity.INFO)),
+                        str(event.get("message", "")),
+                        str(event["timestamp"]),
+                    )
                 )
-            }
-        except (KeyError, TypeError):
-            journal = {}
 
-        return journal
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        with contextlib.suppress(OSError):
+            os.replace(legacy_path, f"{legacy_path}.migrated")
 
     @staticmethod
-    def __clean_old():
-        """Clean old journal entries (1 month)."""
-        journal = JournalManager.__get_journal()
-        old_events = []
-        latest = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        for event_id, event in journal.items():
-            if event.get("timestamp", None) is None:
-                latest_datetime = datetime.strptime(latest, "%Y-%m-%d %H:%M:%S")
-            else:
-                latest_datetime = datetime.strptime(
-                    event["timestamp"], "%Y-%m-%d %H:%M:%S"
-                )
-                latest = event["timestamp"]
-
-            if latest_datetime < datetime.now() - timedelta(days=30):
-                old_events.append(event_id)
-
-        for event_id in old_events:
-            del journal[event_id]
+    def __query(sql: str, params: tuple = ()) -> list:
+        try:
+            with JournalManager._lock:
+                conn = JournalManager.__connect()
+                return conn.execute(sql, params).fetchall()
+        except (sqlite3.Error, OSError):
+            return []
 
-        JournalManager.__save_journal(journal)
+    @staticmethod
+    def __to_dict(rows: list) -> dict:
+        return {
+            event_id: {
+                "severity": severity,
+                "message": message,
+                "timestamp": timestamp,
+            }
+            for event_id, severity, message, timestamp in rows
+        }
 
     @staticmethod
-    def __save_journal(journal: Optional[dict] = None):
-        """Save the journal to the journal file."""
-        if journal is None:
-            journal = JournalManager.__get_journal()
+    def __clean_old():
+        """Clean old journal entries (1 month)."""
+        limit = datetime.now() - JournalManager.retention
+        try:
+            with JournalManager._lock:
+                conn = JournalManager.__connect()
+                with conn:
+                    conn.execute(
+                        "DELETE FROM events WHERE timestamp < ?",
+                        (limit.strftime(TIMESTAMP_FORMAT),),
+                    )
+        except (sqlite3.Error, OSError):
+            pass
 
-        with contextlib.suppress(IOError, OSError):
-            with open(JournalManager.path, "w") as f:
-                yaml.dump(journal, f)
+    @staticmethod
+    def __schedule_cleanup():
+        now = time.monotonic()
+        with JournalManager._lock:
+            if (
+                JournalManager._last_cleanup
+                and now - JournalManager._last_cleanup < JournalManager.cleanup_interval
+            ):
+                return
+            JournalManager._last_cleanup = now
+
+        threading.Thread(
+            target=JournalManager.__clean_old, name="JournalCleanup", daemon=True
+        ).start()
 
     @staticmethod
     def get(period: str = "today", plain: bool = False):
@@ -116,7 +183,6 @@ class JournalManager:
         Supported periods: all, today, yesterday, week, month
         Set plain to True to get the response as plain text.
         """
-        journal = JournalManager.__get_journal()
         periods = [
             "all",
             "today",
@@ -127,7 +193,7 @@ class JournalManager:
         if period not in periods:
             period = "today"
 
-        _journal = JournalManager.__filter_by_date(journal, period)
+        _journal = JournalManager.__filter_by_date(period)
 
         if plain:
             _journal = yaml.dump(_journal, sort_keys=False, indent=4)
@@ -135,74 +201,85 @@ class JournalManager:
         return _journal
 
     @staticmethod
-    def __filter_by_date(journal: dict, period: str):
-        """Filter the journal by date."""
-        _journal = {}
-        if period == "today":
-            start = datetime.now().date()
-            end = start + timedelta(days=1)
-        elif period == "yesterday":
-            start = datetime.now().date() - timedelta(days=1)
+    def __filter_by_date(period: str) -> dict:
+        """Return the events of the period, newest first."""
+        if period == "all":
+            return JournalManager.__to_dict(
+                JournalManager.__query(
+                    "SELECT id, severity, message, timestamp FROM events "
+                    "ORDER BY timestamp DESC, rowid DESC"
+                )
+            )
+
+        today = datetime.now().date()
+        if period == "yesterday":
+            start = today - timedelta(days=1)
             end = start + timedelta(days=1)
         elif period == "week":
-            start = datetime.now().date() - timedelta(days=7)
-            end = datetime.now().date() + timedelta(days=1)
+            start = today - timedelta(days=7)
+            end = today + timedelta(days=1)
         elif period == "month":
-            start = datetime.now().date() - timedelta(days=30)
-            end = datetime.now().date() + timedelta(days=1)
-        elif period == "all":
-            return journal
+            start = today - timedelta(days=30)
+            end = today + timedelta(days=1)
         else:
-            start = datetime.now().date()
+            start = today
             end = start + timedelta(days=1)
 
-        for event_id, event in journal.items():
-            timestamp = datetime.strptime(
-                event["timestamp"], "%Y-%m-%d %H:%M:%S"
-            ).date()
-
-            if start <= timestamp <= end:
-                _journal[event_id] = event
-
-        return _journal
+        return JournalManager.__to_dict(
+            JournalManager.__query(
+                "SELECT id, severity, message, timestamp FROM events "
+                "WHERE timestamp >= ? AND timestamp < ? "
+                "ORDER BY timestamp DESC, rowid DESC",
+                (str(start), str(end)),
+            )
+        )
 
     @staticmethod
     def get_event(event_id: str):
         """Return the event with the given id."""
-        journal = JournalManager.__get_journal()
-        return journal.get(event_id, None)
+        rows = JournalManager.__query(
+            "SELECT id, severity, message, timestamp FROM events WHERE id = ?",
+            (event_id,),
+        )
+        return JournalManager.__to_dict(rows).get(event_id, None)
 
     @staticmethod
     def first_event_date():
         """Return the timestamp of the oldest event as datetime."""
-        journal = JournalManager.__get_journal()
-        first = None
-        for event in journal.values():
-            timestamp = event.get("timestamp")
-            if not timestamp:
-                continue
-            try:
-                ts = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-            except (ValueError, TypeError):
-                continue
-            if first is None or ts < first:
-                first = ts
-        return first
+        rows = JournalManager.__query("SELECT MIN(timestamp) FROM events")
+        if not rows or not rows[0][0]:
+            return None
+        try:
+            return datetime.strptime(rows[0][0], TIMESTAMP_FORMAT)
+        except (ValueError, TypeError):
+            return None
 
     @staticmethod
     def write(severity: JournalSeverity, message: str):
         """Write an event to the journal."""
-        journal = JournalManager.__get_journal()
-        event_id = str(uuid.uuid4())
-        now = datetime.now()
-
         if severity not in JournalSeverity.__dict__.values():
             severity = JournalSeverity.INFO
 
-        journal[event_id] = {
-            "severity": severity,
-            "message": message,
-            "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
-        }
-        JournalManager.__save_journal(journal)
-        JournalManager.__clean_old()
+        event = (
+            str(uuid.uuid4()),
+            severity,
+            str(message),
+            datetime.now().strftime(TIMESTAMP_FORMAT),
+        )
+        try:
+            with JournalManager._lock:
+                conn = JournalManager.__connect()
+                with conn:
+                    conn.execute("INSERT INTO events VALUES (?, ?, ?, ?)", event)
+        except (sqlite3.Error, OSError):
+            return
+
+        JournalManager.__schedule_cleanup()
+
+    @staticmethod
+    def close():
+        """Close the database, it is opened again when needed."""
+        with JournalManager._lock:
+            if JournalManager._conn is not None:
+                JournalManager._conn.close()
+                JournalManager._conn = None
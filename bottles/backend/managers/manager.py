@@ -16,6 +16,7 @@
 #
 
 import fnmatch
+import functools
 import os
 import random
 import re
@@ -23,12 +24,25 @@ import shutil
 import subprocess
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
 from datetime import datetime
 from gettext import gettext as _
 from glob import glob
-from threading import Event
-from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple
+from threading import Event, RLock, Timer, local
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 import pathvalidate
 
@@ -41,6 +55,7 @@ from bottles.backend.globals import Paths
 from bottles.backend.logger import Logger
 from bottles.backend.managers.component import ComponentManager
 from bottles.backend.managers.data import DataManager, UserDataKeys
+from bottles.backend.managers.dedup import DedupManager
 from bottles.backend.managers.dependency import DependencyManager
 from bottles.backend.managers.epicgamesstore import EpicGamesStoreManager
 from bottles.backend.managers.importer import ImportManager
@@ -83,10 +98,11 @@ from bottles.backend.utils.file import FileUtils
 from bottles.backend.utils.generic import sort_by_version
 from bottles.backend.utils.gpu import GPUUtils, GPUVendors
 from bottles.backend.utils.gsettings_stub import GSettingsStub
-from bottles.backend.utils.lnk import LnkUtils
+from bottles.backend.utils.lnk import LnkIndex
 from bottles.backend.utils.manager import ManagerUtils
 from bottles.backend.utils.singleton import Singleton
 from bottles.backend.utils.steam import SteamUtils
+from bottles.backend.utils.taskgraph import GraphReport, GraphStep, TaskGraph
 from bottles.backend.utils.threading import RunAsync
 from bottles.backend.utils.wine import WineUtils
 from bottles.backend.wine.drives import Drives
@@ -134,6 +150,23 @@ class Manager(metaclass=Singleton):
     supported_installers = {}
     _playtime_signals_connected: bool = False
 
+    # bottles are loaded concurrently, most of the work is waiting for the
+    # disk so the pool is bounded by I/O rather than by the number of CPUs
+    check_bottles_workers: int = 8
+
+    # startup steps run as a graph, most of them wait for the disk or the
+    # network; checks_report holds the timings of the last checks()
+    startup_workers: int = 4
+    checks_report: Optional[GraphReport] = None
+
+    # config writes: batches opened by batch_config (per thread) and
+    # debounced writes waiting for config_write_delay seconds of quiet
+    config_write_delay: float = 0.5
+    _config_lock: ClassVar[RLock] = RLock()
+    _config_batches: ClassVar[local] = local()
+    _deferred_configs: ClassVar[Dict[str, BottleConfig]] = {}
+    _deferred_timer: ClassVar[Optional[Timer]] = None
+
     def __init__(
         self,
         g_settings: Any = None,
@@ -143,7 +176,7 @@ class Manager(metaclass=Singleton):
     ):
         super().__init__(**kwargs)
 
-        times = {"start": time.time()}
+        boot_start = time.time()
 
         # common variables
         self.is_cli = is_cli
@@ -176,9 +209,6 @@ class Manager(metaclass=Singleton):
         self.umu_error = ""
         _offline = True
 
-        if check_connection and not self.utils_conn.force_offline:
-            _offline = not self.utils_conn.check_connection()
-
         # validating user-defined Paths.bottles
         if user_bottles_path := self.data_mgr.get(UserDataKeys.CustomBottlesPath):
             is_portal_path = (
@@ -200,27 +230,40 @@ class Manager(metaclass=Singleton):
                     f"directory! Falling back to default path."
                 )
 
-        # sub-managers
-        self.repository_manager = RepositoryManager(get_index=not _offline)
-        if self.repository_manager.aborted_connections > 0:
-            self.utils_conn.status = False
-            _offline = True
-
-        times["RepositoryManager"] = time.time()
-        self.versioning_manager = VersioningManager(self)
-        times["VersioningManager"] = time.time()
-        self.component_manager = ComponentManager(self, _offline)
-        self.umu_proton_catalog = UmuProtonCatalog(self)
-        self.installer_manager = InstallerManager(self, _offline)
-        self.dependency_manager = DependencyManager(self, _offline)
-        self.import_manager = ImportManager(self)
-        times["ImportManager"] = time.time()
-        self.steam_manager = SteamManager()
-        times["SteamManager"] = time.time()
-
-        # Initialize playtime tracker
-        self._initialize_playtime_tracker()
-        times["PlaytimeTracker"] = time.time()
+        # sub-managers, only the repositories wait for the connection check
+        def connect():
+            nonlocal _offline
+            if check_connection and not self.utils_conn.force_offline:
+                _offline = not self.utils_conn.check_connection()
+
+        def load_repositories():
+            nonlocal _offline
+            self.repository_manager = RepositoryManager(get_index=not _offline)
+            if self.repository_manager.aborted_connections > 0:
+                self.utils_conn.status = False
+                _offline = True
+
+        def load_catalogs():
+            self.component_manager = ComponentManager(self, _offline)
+            self.umu_proton_catalog = UmuProtonCatalog(self)
+            self.installer_manager = InstallerManager(self, _offline)
+            self.dependency_manager = DependencyManager(self, _offline)
+
+        def load_managers():
+            self.versioning_manager = VersioningManager(self)
+            self.import_manager = ImportManager(self)
+
+        def load_steam():
+            self.steam_manager = SteamManager()
+
+        boot = TaskGraph(self.startup_workers)
+        boot.add("ConnectionCheck", connect)
+        boot.add("RepositoryManager", load_repositories, after=["ConnectionCheck"])
+        boot.add("ComponentManager", load_catalogs, after=["RepositoryManager"])
+        boot.add("VersioningManager", load_managers)
+        boot.add("SteamManager", load_steam)
+        boot.add("PlaytimeTracker", self._initialize_playtime_tracker)
+        boot_report = boot.run()
 
         # React to runtime changes in playtime preference when available
         if hasattr(self.settings, "connect"):
@@ -238,21 +281,15 @@ class Manager(metaclass=Singleton):
             Manager._playtime_signals_connected = True
 
         if not self.is_cli:
-            times.update(self.checks(install_latest=False, first_run=True).data)
+            self.checks(install_latest=False, first_run=True)
         else:
             logging.set_silent()
 
         if "BOOT_TIME" in os.environ:
-            _temp_times = times.copy()
-            last = 0
-            times_str = "Boot times:"
-            for f, t in _temp_times.items():
-                if last == 0:
-                    last = int(round(t))
-                    continue
-                t = int(round(t))
-                times_str += f"\n\t - {f} took: {t - last}s"
-                last = t
+            times_str = f"Boot took {time.time() - boot_start:.2f}s"
+            times_str += f"\nManagers, {boot_report}"
+            if self.checks_report is not None:
+                times_str += f"\nChecks, {self.checks_report}"
             logging.info(times_str)
 
     def checks(
@@ -261,119 +298,118 @@ class Manager(metaclass=Singleton):
         first_run=False,
         progress_callback: Optional[Callable[..., None]] = None,
     ) -> Result:
+        """
+        Check the folders, components, runners and bottles. The checks run
+        concurrently as a graph: each one starts as soon as what it needs
+        is done, e.g. bottles are loaded once the runners are known. The
+        progress_callback gets the description of the step starting or
+        done, how many steps are done (plus the starting one) and the total.
+        """
         logging.info("Performing Bottles checks…")
 
         rv = Result(status=True, data={})
+        graph = TaskGraph(self.startup_workers)
+        graph.add("check_app_dirs", self.check_app_dirs, [], _("Preparing folders…"))
+        setup = prepared = ["check_app_dirs"]
 
-        steps: List[Tuple[Optional[str], str, Callable[[], bool | None]]] = [
-            ("check_app_dirs", _("Preparing folders…"), self.check_app_dirs),
-            (
-                "check_d7vk",
-                _("Setting up D7VK..."),
-                lambda: self.check_d7vk(install_latest),
-            ),
-            (
-                "check_dxvk",
-                _("Setting up DXVK…"),
-                lambda: self.check_dxvk(install_latest),
-            ),
-            (
-                "check_vkd3d",
-                _("Setting up VKD3D…"),
-                lambda: self.check_vkd3d(install_latest),
-            ),
-            (
-                "check_nvapi",
-                _("Setting up NVAPI…"),
-                lambda: self.check_nvapi(install_latest),
-            ),
+        if first_run:
+            # before anything downloads to the temp directory, the catalogs
+            # are cached there too
+            graph.add(
+                "clear_temp",
+                self.__clear_temp,
+                setup,
+                _("Cleaning temporary files…"),
+            )
+            setup = prepared = ["clear_temp"]
+            if install_latest:
+                # installing the latest versions needs the catalog
+                graph.add(
+                    "organize_components",
+                    self.__organize_components,
+                    setup,
+                    _("Organizing components…"),
+                )
+                setup = ["organize_components"]
+            else:
+                graph.add(
+                    "organize_components",
+                    self.organize_components,
+                    prepared,
+                    _("Organizing components…"),
+                )
+
+        components = [
+            ("check_d7vk", _("Setting up D7VK..."), self.check_d7vk),
+            ("check_dxvk", _("Setting up DXVK…"), self.check_dxvk),
+            ("check_vkd3d", _("Setting up VKD3D…"), self.check_vkd3d),
+            ("check_nvapi", _("Setting up NVAPI…"), self.check_nvapi),
             (
                 "check_latencyflex",
                 _("Setting up LatencyFleX…"),
-                lambda: self.check_latencyflex(install_latest),
-            ),
-            (
-                "check_runtimes",
-                _("Preparing runtimes…"),
-                lambda: self.check_runtimes(install_latest),
-            ),
-            (
-                "check_winebridge",
-                _("Preparing WineBridge…"),
-                lambda: self.check_winebridge(install_latest),
-            ),
-            (
-                "check_runners",
-                _("Preparing runners…"),
-                lambda: self.check_runners(install_latest),
+                self.check_latencyflex,
             ),
+            ("check_runtimes", _("Preparing runtimes…"), self.check_runtimes),
+            ("check_winebridge", _("Preparing WineBridge…"), self.check_winebridge),
+            ("check_runners", _("Preparing runners…"), self.check_runners),
         ]
-
-        if first_run:
-            steps.extend(
-                [
-                    (
-                        None,
-                        _("Organizing components…"),
-                        self.organize_components,
-                    ),
-                    (
-                        None,
-                        _("Cleaning temporary files…"),
-                        self.__clear_temp,
-                    ),
-                ]
+        for name, description, check in components:
+            graph.add(
+                name,
+                functools.partial(check, install_latest),
+                setup,
+                description,
             )
 
-        steps.extend(
-            [
-                (
-                    None,
-                    _("Organizing dependencies…"),
-                    self.organize_dependencies,
-                ),
-                (
-                    None,
-                    _("Organizing installers…"),
-                    self.organize_installers,
-                ),
-                ("check_bottles", _("Loading bottles…"), self.check_bottles),
-            ]
+        graph.add(
+            "organize_dependencies",
+            self.organize_dependencies,
+            prepared,
+            _("Organizing dependencies…"),
+        )
+        graph.add(
+            "organize_installers",
+            self.organize_installers,
+            prepared,
+            _("Organizing installers…"),
+        )
+        graph.add(
+            "check_bottles",
+            self.check_bottles,
+            ["check_runners"],
+            _("Loading bottles…"),
         )
 
-        total_steps = len(steps)
-
-        for index, (data_key, description, func) in enumerate(steps, start=1):
-            if progress_callback:
-                try:
-                    progress_callback(
-                        description=description,
-                        current_step=index,
-                        total_steps=total_steps,
-                        completed=False,
-                    )
-                except Exception as error:  # pragma: no cover - defensive
-                    logging.debug(f"Progress callback start failed: {error}")
+        total_steps = len(graph)
 
-            result = func()
+        def notify(step: GraphStep, current_step: int, completed: bool):
+            if progress_callback is None:
+                return
+            try:
+                progress_callback(
+                    description=step.description,
+                    current_step=current_step,
+                    total_steps=total_steps,
+                    completed=completed,
+                )
+            except Exception as error:  # pragma: no cover - defensive
+                logging.debug(f"Progress callback failed: {error}")
 
-            if result is False:
-                rv.set_status(False)
+        done = 0
 
-            if progress_callback:
-                try:
-                    progress_callback(
-                        description=description,
-                        current_step=index,
-                        total_steps=total_steps,
-                        completed=True,
-                    )
-                except Exception as error:  # pragma: no cover - defensive
-                    logging.debug(f"Progress callback end failed: {error}")
+        def on_start(step: GraphStep, _started: int):
+            notify(step, done + 1, False)
 
-            if data_key:
-                rv.data[data_key] = time.time()
+        def on_done(step: GraphStep, finished: int):
+            nonlocal done
+            done = finished
+            if step.result is False:
+                rv.set_status(False)
+            if step.name.startswith("check_"):
+                rv.data[step.name] = step.finished
+            notify(step, finished, True)
 
+        self.checks_report = graph.run(on_start, on_done)
         return rv
 
     def get_umu_installation(self, refresh: bool = False) -> Optional[UmuInstallation]:
@@ -752,6 +788,9 @@ class Manager(metaclass=Singleton):
     @RunAsync.run_async
     def organize_components(self):
         """Get components catalog and organizes into supported_ lists."""
+        self.__organize_components()
+
+    def __organize_components(self):
         EventManager.wait(Events.ComponentsFetching)
         catalog = self.component_manager.fetch_catalog()
         if len(catalog) == 0:
@@ -1255,18 +1294,7 @@ class Manager(metaclass=Singleton):
 
         bottle = ManagerUtils.get_bottle_path(config)
         winepath = WinePath(config)
-        results = glob(f"{bottle}/drive_c/users/*/Desktop/*.lnk", recursive=True)
-        results += glob(
-            f"{bottle}/drive_c/users/*/Start Menu/Programs/**/*.lnk", recursive=True
-        )
-        results += glob(
-            f"{bottle}/drive_c/ProgramData/Microsoft/Windows/Start Menu/Programs/**/*.lnk",
-            recursive=True,
-        )
-        results += glob(
-            f"{bottle}/drive_c/users/*/AppData/Roaming/Microsoft/Windows/Start Menu/Programs/**/*.lnk",
-            recursive=True,
-        )
+        results = LnkIndex(bottle).get_targets()
         installed_programs = []
         ignored_patterns = [
             "*installer*",
@@ -1333,15 +1361,12 @@ class Manager(metaclass=Singleton):
                 }
             )
 
-        for program in results:
+        for _, executable_path in results:
             """
-            for each .lnk file, try to get the executable path and
-            append it to the installed_programs list with its icon,
-            skip if the path contains the "Uninstall" word.
+            for each .lnk file, take the executable path from the
+            shortcuts index and append it to the installed_programs list
+            with its icon, skip if the path contains the "Uninstall" word.
             """
-            executable_path = LnkUtils.get_data(program)
-            if executable_path in [None, ""]:
-                continue
             executable_name = executable_path.split("\\")[-1]
             program_folder = ManagerUtils.get_exe_parent_dir(config, executable_path)
             stop = False
@@ -1427,12 +1452,12 @@ class Manager(metaclass=Singleton):
         self.local_bottles = {}
         self._programs_cache = {}
 
-        # custom-path bottles whose location is currently unreachable (e.g. an
-        # unmounted drive), so the user can be told instead of them silently
-        # vanishing from the list
-        unavailable = []
-
-        def process_bottle(bottle):
+        def process_bottle(bottle) -> Tuple[Optional[BottleConfig], bool]:
+            """
+            Load and repair a single bottle. Returns its config (None if it
+            can't be loaded) and whether it lives on a custom path that is
+            currently unreachable.
+            """
             _name = bottle
             _bottle = str(os.path.join(Paths.bottles, bottle))
             _placeholder = os.path.join(_bottle, "placeholder.yml")
@@ -1449,15 +1474,13 @@ class Manager(metaclass=Singleton):
                         else:
                             raise ValueError("Missing Path in placeholder.yml")
                     except (yaml.YAMLError, ValueError):
-                        return
+                        return None, False
 
             config_load = BottleConfig.load(_config)
 
             if not config_load.status:
-                if _placeholder_target:
-                    # the bottle lives on a custom path that is not reachable now
-                    unavailable.append(_name)
-                return
+                # the bottle may live on a custom path that is not reachable now
+                return None, bool(_placeholder_target)
 
             config = config_load.data
             session_arguments = config.session_arguments
@@ -1488,8 +1511,7 @@ class Manager(metaclass=Singleton):
                             _bottle, str(os.path.join(Paths.bottles, sane_name))
                         )
                         # Restart the process bottle function. Normally, can't be recursive!
-                        process_bottle(sane_name)
-                        return
+                        return process_bottle(sane_name)
 
                     config.Path = sane_name
                     self.update_config(config=config, key="Path", value=sane_name)
@@ -1498,7 +1520,7 @@ class Manager(metaclass=Singleton):
             miss_keys = sample.keys() - config.keys()
             for key in miss_keys:
                 logging.warning(f"Key {key} is missing for bottle {_name}, updating…")
-                self.update_config(config=config, key=key, value=sample[key])
+                config[key] = sample[key]
 
             miss_params_keys = sample.Parameters.keys() - config.Parameters.keys()
 
@@ -1510,12 +1532,14 @@ class Manager(metaclass=Singleton):
                 logging.warning(
                     f"Parameters key {key} is missing for bottle {_name}, updating…"
                 )
-                self.update_config(
-                    config=config,
-                    key=key,
-                    value=sample.Parameters[key],
-                    scope="Parameters",
-                )
+                config.Parameters[key] = sample.Parameters[key]
+
+            if miss_keys or miss_params_keys:
+                # all the repaired keys are written at once
+                persisted_config = config.copy()
+                persisted_config.session_arguments = session_arguments
+                persisted_config.run_in_terminal = run_in_terminal
+                persisted_config.dump(_config)
 
             system_runners = [
                 runner for runner in self.runners_available if runner.startswith("sys-")
@@ -1537,7 +1561,6 @@ class Manager(metaclass=Singleton):
 
             if not self.reconcile_d7vk(config):
                 logging.warning(f"Could not reconcile D7VK for bottle {_name}.")
-            self.local_bottles[config.Name] = config
 
             try:
                 real_path = ManagerUtils.get_bottle_path(config)
@@ -1587,12 +1610,29 @@ class Manager(metaclass=Singleton):
             if config.Parameters.dxvk_nvapi:
                 NVAPIComponent.check_bottle_nvngx(real_path, config)
 
-        for b in sorted(bottles):
+            return config, False
+
+        bottles = sorted(bottles)
+        workers = max(1, min(self.check_bottles_workers, len(bottles)))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="check_bottles"
+        ) as executor:
+            results = list(executor.map(process_bottle, bottles))
+
+        # custom-path bottles whose location is currently unreachable (e.g. an
+        # unmounted drive), so the user can be told instead of them silently
+        # vanishing from the list
+        unavailable = []
+
+        for b, (config, is_unavailable) in zip(bottles, results):
             """
             For each bottle add the path name to the `local_bottles` variable
-            and append the config.
+            and append the config, in the same order as the folders.
             """
-            process_bottle(b)
+            if config is not None:
+                self.local_bottles[config.Name] = config
+            elif is_unavailable:
+                unavailable.append(b)
 
         if len(self.local_bottles) > 0 and not silent:
             logging.info(
@@ -1637,51 +1677,159 @@ class Manager(metaclass=Singleton):
         scope: str = "",
         remove: bool = False,
         fallback: bool = False,
+        debounce: bool = False,
     ) -> Result[dict]:
         """
         Update parameters in bottle config. Use the scope argument to
         update the parameters in the specified scope (e.g. Parameters).
         A new key will be created if another already exists and fallback
         is set to True.
+        The change is written to disk right away, unless a batch is open
+        for the bottle (see batch_config) or debounce is set to True, in
+        which case the write happens once the changes stop for
+        config_write_delay seconds (see flush_config_writes).
         TODO: move to bottle.py (Bottle manager)
         """
         _name = config.Name
         logging.info(f"Setting Key {key}={value} for bottle {_name}…")
 
-        _config = config.copy()
-        wineboot = WineBoot(_config)
-        wineserver = WineServer(_config)
-        bottle_path = ManagerUtils.get_bottle_path(config)
-
         if key == "sync":
             """
             Workaround <https://github.com/bottlesdevs/Bottles/issues/916>
             Sync type change requires wineserver restart or wine will fail
             to execute any command.
             """
-            wineboot.kill()
-            wineserver.wait()
-
-        if scope:
-            if remove:
-                del config[scope][key]
-            elif config[scope].get(key) and fallback:
-                config[scope][f"{key}-{uuid.uuid4()}"] = value
-            else:
-                config[scope][key] = value
-        else:
-            if remove:
-                del config[key]
-            elif config.get(key) and fallback:
-                config[f"{key}-{uuid.uuid4()}"] = value
+            _config = config.copy()
+            WineBoot(_config).kill()
+            WineServer(_config).wait()
+
+        with self._config_lock:
+            if scope:
+                if remove:
+                    del config[scope][key]
+                elif config[scope].get(key) and fallback:
+                    config[scope][f"{key}-{uuid.uuid4()}"] = value
+                else:
+                    config[scope][key] = value
             else:
-                config[key] = value
+                if remove:
+                    del config[key]
+                elif config.get(key) and fallback:
+                    config[f"{key}-{uuid.uuid4()}"] = value
+                else:
+                    config[key] = value
+
+            batch = getattr(self._config_batches, "batches", {}).get(_name)
+            if batch is not None and batch[0] is config:
+                batch[1].update((key, scope))
+                return Result(status=True, data={"config": config})
+
+            if debounce:
+                self.__defer_config_write(config)
+
+        if debounce:
+            # only the write is deferred, the timer thread must not race
+            # other updates of the bottle reacting to their keys
+            self.__config_updated(config, {key, scope})
+            return Result(status=True, data={"config": config})
+        return self.__write_config(config, {key, scope})
+
+    def update_config_many(
+        self,
+        config: BottleConfig,
+        updates: Iterable[Tuple[str, Any] | Tuple[str, Any, str]],
+    ) -> Result[dict]:
+        """
+        Apply several (key, value[, scope]) updates to the bottle config
+        and write it to disk once.
+        """
+        with self.batch_config(config) as result:
+            for update in updates:
+                key, value, *scope = update
+                self.update_config(config, key, value, scope[0] if scope else "")
+        return result
+
+    @contextmanager
+    def batch_config(self, config: BottleConfig) -> Iterator[Result[dict]]:
+        """
+        Collect every update_config call made for the bottle by the current
+        thread inside the block, and write the config once when the block
+        exits. Nested blocks are written by the outermost one.
+        """
+        batches = self._config_batches.__dict__.setdefault("batches", {})
+        result = Result(status=True, data={"config": config})
+
+        if config.Name in batches:
+            yield result
+            return
+
+        batches[config.Name] = (config, set())
+        try:
+            yield result
+        finally:
+            _, keys = batches.pop(config.Name)
+
+        if keys:
+            written = self.__write_config(config, keys)
+            result.status = written.status
+            result.message = written.message
+
+    def flush_config_writes(self):
+        """Write the configs which have debounced changes pending."""
+        with self._config_lock:
+            if Manager._deferred_timer is not None:
+                Manager._deferred_timer.cancel()
+                Manager._deferred_timer = None
+            pending = list(Manager._deferred_configs.values())
+            Manager._deferred_configs.clear()
+
+        for config in pending:
+            self.__dump_config(config)
+
+    def __defer_config_write(self, config: BottleConfig):
+        # keyed by file, bottles can share a name (e.g. one being renamed)
+        path = os.path.join(ManagerUtils.get_bottle_path(config), "bottle.yml")
+        Manager._deferred_configs[path] = config
+
+        if Manager._deferred_timer is not None:
+            Manager._deferred_timer.cancel()
+        Manager._deferred_timer = Timer(
+            self.config_write_delay, self.flush_config_writes
+        )
+        Manager._deferred_timer.daemon = True
+        Manager._deferred_timer.start()
+
+    def __write_config(self, config: BottleConfig, keys: Set[str]) -> Result[dict]:
+        """Write the config to disk and react to the updated keys."""
+        dumped = self.__dump_config(config)
+        self.__config_updated(config, keys)
+
+        if not dumped.status:
+            return Result(status=False, data={"config": config}, message=dumped.message)
+        return Result(status=True, data={"config": config})
 
-        config.dump(os.path.join(bottle_path, "bottle.yml"))
+    def __dump_config(self, config: BottleConfig) -> Result:
+        path = os.path.join(ManagerUtils.get_bottle_path(config), "bottle.yml")
+
+        with self._config_lock:
+            # a debounced write would only repeat this one, wherever it was
+            # queued from if the bottle moved since
+            for pending, deferred in list(Manager._deferred_configs.items()):
+                if deferred is config:
+                    del Manager._deferred_configs[pending]
+
+            dumped = config.dump(path)
 
         config.Update_Date = str(datetime.now())
+        return dumped
 
-        if scope == "External_Programs":
+    def __config_updated(self, config: BottleConfig, keys: Set[str]):
+        """
+        React to the updated keys (and scopes) of the config: refresh the
+        programs of the bottle, update the Steam prefix and apply the
+        component registry rules.
+        """
+        if "External_Programs" in keys:
             self._programs_cache.pop(config.Name, None)
 
         if config.Environment == "Steam":
@@ -1697,11 +1845,9 @@ class Manager(metaclass=Singleton):
             "LatencyFleX_Activated",
         }
 
-        if key in component_keys or scope in component_keys:
+        if keys & component_keys:
             RegistryRuleManager.apply_rules(config, trigger="components")
 
-        return Result(status=True, data={"config": config})
-
     def apply_audio_driver(self, driver: str) -> Result[None]:
         """Apply the configured audio driver override to every bottle."""
 
@@ -2788,6 +2934,11 @@ class Manager(metaclass=Singleton):
         logging.info("Removing the bottle…")
         path = ManagerUtils.get_bottle_path(config)
         subprocess.run(["rm", "-rf", path], stdout=subprocess.DEVNULL)
+        dedup = DedupManager()
+        released = dedup.release(config)
+        if released:
+            freed = dedup.gc(released)
+            logging.info(f"Freed {freed / 1024**2:.1f} MiB of shared files")
 
         # The UI invokes delete_bottle in a worker thread. Refresh only the
         # backend state here; its RunAsync callback rebuilds the GTK list on
@@ -2936,6 +3087,7 @@ class Manager(metaclass=Singleton):
     def shutdown(self):
         """Cleanup only truly orphaned or stuck bottles."""
         logging.info("Starting shutdown cleanup …")
+        self.flush_config_writes()
 
         active_bottle_ids = []
         if hasattr(self, "playtime_tracker"):
@@ -2954,26 +3106,22 @@ class Manager(metaclass=Singleton):
 
         from bottles.backend.utils.proc import ProcUtils
 
-        procs = ProcUtils.get_procs()
+        procs = ProcUtils.query(
+            env={"WINEPREFIX": lambda _value: True}, fields=("environ", "name")
+        )
         prefix_to_procs = {}
 
         for proc in procs:
-            env = proc.get_env()
-            if "WINEPREFIX=" in env:
-                for var in env.split("\x00"):
-                    if var.startswith("WINEPREFIX="):
-                        prefix = var.split("=", 1)[1]
-                        if prefix not in prefix_to_procs:
-                            prefix_to_procs[prefix] = []
-                        prefix_to_procs[prefix].append(proc)
+            prefix = proc.getenv("WINEPREFIX")
+            prefix_to_procs.setdefault(prefix, []).append(proc)
 
         for prefix, p_list in prefix_to_procs.items():
             if prefix in protected_prefixes:
                 continue
 
             for p in p_list:
-                name = p.get_name().lower()
-                state = p.get_state()
+                name = p.name.lower()
+                state = p.state
 
                 if name != "wineserver" and state != "Z":
                     logging.info(
@@ -71,10 +71,20 @@ class RegistryRuleManager:
             }
 
         reg = Reg(config)
+        regs = []
         for name, rule in selected.items():
             if not rule.keys.strip():
                 continue
             logging.info(f"Applying registry rule '{name}' for {config.Name}")
+            try:
+                regs.extend(Reg.parse_import(rule.keys))
+                continue
+            except ValueError as error:
+                logging.info(f"Importing registry rule '{name}' with reg.exe: {error}")
+
+            reg.apply(regs)
+            regs = []
+
             reg_file = ManagerUtils.get_temp_path(f"{uuid.uuid4()}.reg")
             keys = rule.keys.lstrip()
             has_header = keys.upper().startswith("REGEDIT4") or keys.lower().startswith(
@@ -88,3 +98,6 @@ class RegistryRuleManager:
                 bundle_file.write("\n")
             reg.launch(f"import {reg_file}", communicate=True, minimal=True)
             os.remove(reg_file)
+
+        # rules which could be parsed are applied together
+        reg.apply(regs)
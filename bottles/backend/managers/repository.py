@@ -24,6 +24,7 @@ from bottles.backend.logger import Logger
 from bottles.backend.managers.data import DataManager, UserDataKeys
 from bottles.backend.models.result import Result
 from bottles.backend.params import APP_VERSION
+from bottles.backend.repos.cache import CachedRequest, repository_cache_path
 from bottles.backend.repos.component import ComponentRepo
 from bottles.backend.repos.dependency import DependencyRepo
 from bottles.backend.repos.installer import InstallerRepo
@@ -75,6 +76,7 @@ class RepositoryManager:
                 "cache_url": repository["sources"][0],
                 "index": "",
                 "catalog": None,
+                "validators": None,
             }
             for name, repository in self.__repositories.items()
         }
@@ -98,6 +100,7 @@ class RepositoryManager:
                 callback_in_main_loop=callback_in_main_loop,
                 catalog_data=None if offline else repo["catalog"],
                 cache_url=repo["cache_url"],
+                catalog_validators=repo["validators"],
             )
 
         logging.error(f"Repository {name} not found")
@@ -170,12 +173,16 @@ class RepositoryManager:
         for repo, data in self.__repositories.items():
 
             def query(_repo, _data):
+                cache_path = repository_cache_path(
+                    _repo, _data["cache_url"], "catalog.yml"
+                )
                 for source in _data["sources"]:
                     for filename in (f"{APP_VERSION}.yml", "index.yml"):
                         if not self.do_get_index:
                             break
 
                         url = os.path.join(source, filename)
+                        request = CachedRequest(url, cache_path)
                         buffer = BytesIO()
                         c = pycurl.Curl()
                         try:
@@ -191,6 +198,7 @@ class RepositoryManager:
                             c.setopt(c.TIMEOUT, 10)
                             c.setopt(c.NOPROGRESS, False)
                             c.setopt(c.XFERINFOFUNCTION, self.__curl_progress)
+                            request.prepare(c)
                             self.__perform_index_request(c, buffer)
                             response_code = c.getinfo(c.RESPONSE_CODE)
                         except pycurl.error as e:
@@ -203,7 +211,11 @@ class RepositoryManager:
                         finally:
                             c.close()
 
-                        if url.startswith("file://") or response_code == 200:
+                        catalog = None
+                        if request.not_modified(response_code):
+                            # validated when it was cached, no need to parse it
+                            catalog = request.cached
+                        elif url.startswith("file://") or response_code == 200:
                             catalog = buffer.getvalue()
                             try:
                                 parsed_catalog = yaml.load(catalog)
@@ -215,9 +227,11 @@ class RepositoryManager:
                                 )
                                 break
 
+                        if catalog is not None:
                             _data["url"] = source
                             _data["index"] = url
                             _data["catalog"] = catalog
+                            _data["validators"] = request.validators
                             SignalManager.send(
                                 Signals.RepositoryFetched, Result(True, data=total)
                             )
@@ -27,6 +27,7 @@ from bottles.backend.logger import Logger
 from bottles.backend.models.config import BottleConfig
 from bottles.backend.models.samples import Samples
 from bottles.backend.utils import yaml
+from bottles.backend.utils.clone import TreeCloner
 from bottles.backend.utils.manager import ManagerUtils
 
 logging = Logger()
@@ -62,9 +63,8 @@ class TemplateManager:
         # copy, copytree aggregates the failures into a shutil.Error, so handle
         # it together with the missing source directory case.
         with contextlib.suppress(FileNotFoundError, shutil.Error):
-            shutil.copytree(
-                bottle, _path, symlinks=True, ignore=shutil.ignore_patterns(*ignored)
-            )
+            cloner = TreeCloner(ignore=shutil.ignore_patterns(*ignored))
+            logging.info(f"Template copied: {cloner.clone(bottle, _path)}")
 
         template = {
             "uuid": _uuid,
@@ -182,28 +182,16 @@ class TemplateManager:
 
     @staticmethod
     def unpack_template(template: dict, config: BottleConfig) -> bool:
-        def copy_func(source: str, dest: str):
-            if os.path.islink(source):
-                # we don't want symlinks from templates
-                return
-            shutil.copy2(source, dest)
-
         logging.info(f"Unpacking template: {template['uuid']}")
         bottle = ManagerUtils.get_bottle_path(config)
         _path = os.path.join(Paths.templates, template["uuid"])
 
         try:
-            shutil.copytree(
-                _path,
-                bottle,
-                symlinks=True,
-                dirs_exist_ok=True,
-                ignore=shutil.ignore_patterns(".*"),
-                ignore_dangling_symlinks=True,
-            )
-        except (FileNotFoundError, shutil.Error):
+            cloner = TreeCloner(ignore=shutil.ignore_patterns(".*"))
+            report = cloner.clone(_path, bottle, dirs_exist_ok=True)
+        except (OSError, shutil.Error):
             logging.error(f"Failed to unpack template: {template['uuid']}")
             return False
 
-        logging.info("Template unpacked successfully!")
+        logging.info(f"Template unpacked successfully: {report}")
         return True
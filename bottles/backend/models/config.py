@@ -1,11 +1,14 @@
 import contextlib
+import copy
 import inspect
 import logging
 import os
 import tempfile
+import threading
+import time
 from dataclasses import asdict, dataclass, field, is_dataclass, replace
 from io import IOBase
-from typing import IO, Container, Dict, ItemsView, List, Optional
+from typing import IO, Container, Dict, ItemsView, List, Optional, Tuple
 
 from bottles.backend.models.result import Result
 from bottles.backend.utils import yaml
@@ -37,6 +40,15 @@ _LEGACY_DEFAULT_INHERITED_ENVIRONMENTS = [
     _LEGACY_DEFAULT_INHERITED_ENVIRONMENT,
 ]
 
+# Parsed configs, by absolute path, along with the (st_mtime_ns, st_size,
+# st_ino) of the file they were read from. Files modified less than
+# _CONFIG_CACHE_RACY_NS ago are not cached, as a rewrite within the mtime
+# granularity of the filesystem could go unnoticed.
+_config_cache: Dict[str, Tuple[Tuple[int, int, int], "BottleConfig"]] = {}
+_config_cache_lock = threading.Lock()
+_config_cache_stats = {"hits": 0, "misses": 0}
+_CONFIG_CACHE_RACY_NS = 1_000_000_000
+
 # class name prefix "Bottle" is a workaround for:
 # https://github.com/python/cpython/issues/90104
 
@@ -225,6 +237,8 @@ class BottleConfig(DictCompatMixIn):
                     with contextlib.suppress(OSError):
                         os.remove(tmp_path)
                     raise
+                finally:
+                    self.cache_invalidate(file)
             return Result(True)
         except Exception as e:
             logging.exception(e)
@@ -247,6 +261,11 @@ class BottleConfig(DictCompatMixIn):
                     logging.info("Config file %s not found, skipping load", file)
                     return Result(False, message="Config file not exists")
 
+                cached = cls.__cache_get(file)
+                if cached is not None:
+                    return Result(True, data=cached)
+
+                stamp = cls.__stat_stamp(file)
                 with open(file, mode=mode) as f:
                     data = yaml.load(f)
             if not isinstance(data, dict):
@@ -258,11 +277,67 @@ class BottleConfig(DictCompatMixIn):
             if not filled.status:
                 raise ValueError("Invalid Config data (%s)" % filled.message)
 
+            if not isinstance(file, IOBase):
+                cls.__cache_set(file, stamp, filled.data)
+
             return Result(True, data=filled.data)
         except Exception as e:
             logging.exception(e)
             return Result(False, message=str(e))
 
+    @staticmethod
+    def __stat_stamp(file: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    @classmethod
+    def __cache_get(cls, file: str) -> Optional["BottleConfig"]:
+        path = os.path.abspath(file)
+        stamp = cls.__stat_stamp(file)
+        with _config_cache_lock:
+            entry = _config_cache.get(path)
+            if stamp is None or entry is None or entry[0] != stamp:
+                _config_cache_stats["misses"] += 1
+                return None
+            _config_cache_stats["hits"] += 1
+            config = entry[1]
+        return copy.deepcopy(config)
+
+    @classmethod
+    def __cache_set(
+        cls,
+        file: str,
+        stamp: Optional[Tuple[int, int, int]],
+        config: "BottleConfig",
+    ):
+        if stamp is None or time.time_ns() - stamp[0] < _CONFIG_CACHE_RACY_NS:
+            return
+        config = copy.deepcopy(config)
+        with _config_cache_lock:
+            _config_cache[os.path.abspath(file)] = (stamp, config)
+
+    @staticmethod
+    def cache_invalidate(file: str):
+        """Forget the parsed config of the given file, if any."""
+        with _config_cache_lock:
+            _config_cache.pop(os.path.abspath(file), None)
+
+    @staticmethod
+    def cache_clear():
+        """Forget every parsed config and reset the counters."""
+        with _config_cache_lock:
+            _config_cache.clear()
+            _config_cache_stats.update(hits=0, misses=0)
+
+    @staticmethod
+    def cache_info() -> dict:
+        """Returns the hits, misses and size of the config parse cache."""
+        with _config_cache_lock:
+            return {**_config_cache_stats, "size": len(_config_cache)}
+
     @classmethod
     def _fill_with(cls, data: dict) -> Result[Optional["BottleConfig"]]:
         """fill with dict"""
@@ -0,0 +1,196 @@
+# cache.py
+#
+# Copyright 2025 mirkobrombin <brombin94@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import marshal
+import os
+import tempfile
+import threading
+from hashlib import sha256
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+import pycurl
+
+from bottles.backend.globals import Paths
+from bottles.backend.logger import Logger
+from bottles.backend.utils import json
+
+logging = Logger()
+
+
+def repository_cache_path(repository: str, cache_url: str, name: str) -> str:
+    """Where the files of a repository are cached, by its canonical url."""
+    repo_id = sha256(cache_url.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(Paths.temp, "repositories", repository, repo_id, name)
+
+
+def _write(path: str, data: bytes):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class CachedRequest:
+    """
+    A GET revalidated against the copy of its response cached at `path`.
+    The ETag and Last-Modified of the response are stored next to the
+    copy, with the url they came from and the hash of the body, so the
+    next request for the url only gets the body if it changed. A 304 is
+    trusted only while the copy still matches that hash.
+
+    Handles set up with prepare() share their DNS cache and TLS sessions,
+    so the repositories, which mostly live on the same hosts, don't do
+    the whole handshake for every request.
+    """
+
+    suffix = ".http.json"
+
+    _share: ClassVar[Optional[pycurl.CurlShare]] = None
+    _share_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, url: str, path: str):
+        self.url = url
+        self.path = path
+        self.cached: Optional[bytes] = None
+        self.__stored: Dict[str, str] = {}
+        self.__headers: Dict[str, str] = {}
+        self.__status = 0
+        self.__load()
+
+    @classmethod
+    def share(cls) -> pycurl.CurlShare:
+        with cls._share_lock:
+            if cls._share is None:
+                share = pycurl.CurlShare()
+                share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_DNS)
+                share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_SSL_SESSION)
+                cls._share = share
+            return cls._share
+
+    def __load(self):
+        try:
+            with open(self.path + self.suffix) as f:
+                stored = json.load(f)
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except (OSError, ValueError):
+            return
+        if not isinstance(stored, dict) or stored.get("url") != self.url:
+            return
+        if stored.get("sha256") != sha256(data).hexdigest():
+            logging.debug(f"Cached copy of {self.url} changed, not revalidating.")
+            return
+        self.cached = data
+        self.__stored = stored
+
+    def prepare(self, c):
+        """Set up a handle for the request, before perform()."""
+        c.setopt(pycurl.SHARE, self.share())
+        c.setopt(pycurl.HEADERFUNCTION, self.__on_header)
+        headers = []
+        if self.__stored.get("etag"):
+            headers.append(f"If-None-Match: {self.__stored['etag']}")
+        if self.__stored.get("last_modified"):
+            headers.append(f"If-Modified-Since: {self.__stored['last_modified']}")
+        if headers:
+            c.setopt(pycurl.HTTPHEADER, headers)
+
+    def __on_header(self, line: bytes):
+        header = line.decode("iso-8859-1").strip()
+        if header.startswith("HTTP/"):
+            # a new response, e.g. after a redirect
+            status = header.split()
+            code = status[1] if len(status) > 1 else ""
+            self.__status = int(code) if code.isdigit() else 0
+            self.__headers = {}
+            return
+        name, sep, value = header.partition(":")
+        if sep:
+            self.__headers[name.strip().lower()] = value.strip()
+
+    def not_modified(self, response_code: int) -> bool:
+        """Whether the cached copy can be used as the response."""
+        return response_code == 304 and self.cached is not None
+
+    @property
+    def validators(self) -> Optional[Dict[str, str]]:
+        """What to store with the body of the response, None if nothing."""
+        stored = self.__stored if self.__status == 304 else {}
+        etag = self.__headers.get("etag", stored.get("etag"))
+        modified = self.__headers.get("last-modified", stored.get("last_modified"))
+        if not etag and not modified:
+            return None
+        return {"url": self.url, "etag": etag or "", "last_modified": modified or ""}
+
+    @classmethod
+    def save(cls, path: str, data: bytes, validators: Optional[Dict[str, str]]):
+        """Cache a response body and the validators it came with."""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write(path, data)
+            if validators:
+                stored = {**validators, "sha256": sha256(data).hexdigest()}
+                _write(path + cls.suffix, json.dumps(stored).encode("utf-8"))
+        except OSError:
+            logging.warning(f"Cannot cache repository data at {path}.")
+
+
+class CompiledCatalog:
+    """
+    A parsed catalog stored with marshal next to the YAML it comes from,
+    with what its repository classifies from it (see Repo.classify). It
+    replaces parsing the YAML as long as the hash of the YAML matches,
+    which is the case on every start the catalog didn't change.
+    """
+
+    schema = 1
+    suffix = ".marshal"
+
+    @classmethod
+    def load(cls, path: str, data: bytes) -> Optional[Tuple[dict, Any]]:
+        """The catalog and its classification, None if data isn't cached."""
+        try:
+            with open(path + cls.suffix, "rb") as f:
+                schema, digest, catalog, classified = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if schema != cls.schema or digest != sha256(data).hexdigest():
+            return None
+        if not isinstance(catalog, dict):
+            return None
+        return catalog, classified
+
+    @classmethod
+    def save(cls, path: str, data: bytes, catalog: dict, classified: Any):
+        try:
+            compiled = marshal.dumps(
+                (cls.schema, sha256(data).hexdigest(), catalog, classified)
+            )
+        except ValueError:
+            # marshal only knows builtin types, YAML can give dates too
+            logging.debug(f"Cannot compile the catalog at {path}.")
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write(path + cls.suffix, compiled)
+        except OSError:
+            logging.warning(f"Cannot cache repository data at {path}.")
@@ -21,6 +21,31 @@ from bottles.backend.repos.repo import Repo
 class ComponentRepo(Repo):
     name = "components"
 
+    @staticmethod
+    def classify(catalog: dict) -> dict[str, list[str]]:
+        """
+        The names of the valid components by category, in catalog order.
+        Runners are listed under their sub-category (wine or proton).
+        """
+        classified: dict[str, list[str]] = {}
+        for name, entry in catalog.items():
+            if (
+                not isinstance(name, str)
+                or not name
+                or not isinstance(entry, dict)
+                or not isinstance(entry.get("Category"), str)
+                or not isinstance(entry.get("Channel"), str)
+            ):
+                continue
+
+            category = entry["Category"]
+            if category == "runners":
+                category = entry.get("Sub-category")
+                if category not in ("wine", "proton"):
+                    continue
+            classified.setdefault(category, []).append(name)
+        return classified
+
     def get(self, name: str, plain: bool = False) -> str | dict | bool:
         if not isinstance(name, str) or not name:
             return False
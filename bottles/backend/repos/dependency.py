@@ -21,19 +21,48 @@ from bottles.backend.repos.repo import Repo
 class DependencyRepo(Repo):
     name = "dependencies"
 
-    def get(self, name: str, plain: bool = False) -> str | dict | bool:
+    @staticmethod
+    def classify(catalog: dict) -> list[str]:
+        """The names of the valid dependencies, sorted."""
+        names = []
+        for name, entry in catalog.items():
+            if not isinstance(name, str) or not name or not isinstance(entry, dict):
+                continue
+            category = entry.get("Category")
+            description = entry.get("Description")
+            arch = entry.get("Arch", "win64_win32")
+            if (
+                not isinstance(category, str)
+                or not category
+                or not isinstance(description, str)
+                or not (
+                    isinstance(arch, str)
+                    or isinstance(arch, list)
+                    and all(isinstance(item, str) for item in arch)
+                )
+            ):
+                continue
+            names.append(name)
+        return sorted(names)
+
+    def manifest_url(self, name: str) -> str | None:
         if not isinstance(name, str) or not name:
-            return False
+            return None
         if not isinstance(self.catalog, dict):
-            return False
+            return None
 
         entry = self.catalog.get(name)
         if not isinstance(entry, dict):
-            return False
+            return None
 
         category = entry.get("Category")
         if not isinstance(category, str) or not category:
-            return False
+            return None
+
+        return f"{self.url}/{category}/{name}.yml"
 
-        url = f"{self.url}/{category}/{name}.yml"
+    def get(self, name: str, plain: bool = False) -> str | dict | bool:
+        url = self.manifest_url(name)
+        if url is None:
+            return False
         return self.get_manifest(url, plain)
@@ -21,12 +21,17 @@ from bottles.backend.repos.repo import Repo
 class InstallerRepo(Repo):
     name = "installers"
 
-    def get(self, name: str, plain: bool = False) -> str | dict | bool:
+    def manifest_url(self, name: str) -> str | None:
         if name in self.catalog:
             entry = self.catalog[name]
-            url = f"{self.url}/{entry['Category']}/{name}.yml"
-            return self.get_manifest(url, plain)
-        return False
+            return f"{self.url}/{entry['Category']}/{name}.yml"
+        return None
+
+    def get(self, name: str, plain: bool = False) -> str | dict | bool:
+        url = self.manifest_url(name)
+        if url is None:
+            return False
+        return self.get_manifest(url, plain)
 
     def get_review(self, name: str) -> str | dict | bool:
         if name in self.catalog:
@@ -19,11 +19,16 @@ from hashlib import sha256
 #
 
 from io import BytesIO
+from typing import Iterable
 
 import pycurl
 
-from bottles.backend.globals import Paths
 from bottles.backend.logger import Logger
+from bottles.backend.repos.cache import (
+    CachedRequest,
+    CompiledCatalog,
+    repository_cache_path,
+)
 from bottles.backend.state import EventManager, Events
 from bottles.backend.utils import yaml
 from bottles.backend.utils.threading import RunAsync
@@ -33,6 +38,7 @@ logging = Logger()
 
 class Repo:
     name: str = ""
+    parallel_downloads = 8
 
     def __init__(
         self,
@@ -42,6 +48,7 @@ class Repo:
         callback_in_main_loop: bool = True,
         catalog_data: bytes | None = None,
         cache_url: str | None = None,
+        catalog_validators: dict | None = None,
     ):
         self.url = url
         self.cache_url = cache_url or url
@@ -49,7 +56,7 @@ class Repo:
         self.catalog = None
 
         if catalog_data is not None and not offline:
-            self.catalog = self.__parse_catalog(catalog_data)
+            self.catalog = self.__parse_catalog(catalog_data, catalog_validators)
             EventManager.done(Events(self.name + ".fetching"))
             return
 
@@ -68,91 +75,223 @@ class Repo:
     def __get_catalog(self, index: str, offline: bool = False):
         cache_path = self.__get_cache_path("catalog.yml")
         if index in ["", None] or offline:
-            return self.__read_cache(cache_path) or {}
+            return self.__read_catalog(cache_path)
 
         try:
-            buffer = BytesIO()
-
-            c = pycurl.Curl()
-            try:
-                _proxy = os.environ.get("http_proxy") or os.environ.get("https_proxy")
-
-                if _proxy:
-                    c.setopt(pycurl.PROXY, _proxy)
-                c.setopt(c.URL, index)
-                c.setopt(c.FOLLOWLOCATION, True)
-                c.setopt(c.WRITEDATA, buffer)
-                c.setopt(pycurl.CONNECTTIMEOUT, 10)
-                c.setopt(pycurl.TIMEOUT, 30)
-                c.perform()
-            finally:
-                c.close()
+            request = CachedRequest(index, cache_path)
+            response_code, data = self.__fetch(request)
+            if request.not_modified(response_code):
+                return self.__read_catalog(cache_path)
 
-            return self.__parse_catalog(buffer.getvalue())
+            return self.__parse_catalog(data, request.validators)
         except (pycurl.error, yaml.YAMLError):
             logging.error(f"Cannot fetch {self.name} repository index.")
-            return self.__read_cache(cache_path) or {}
+            return self.__read_catalog(cache_path)
 
-    def __parse_catalog(self, data: bytes) -> dict:
+    def __parse_catalog(self, data: bytes, validators: dict | None = None) -> dict:
         cache_path = self.__get_cache_path("catalog.yml")
+        index = self.__load_catalog(cache_path, data)
+        if index is None:
+            logging.error(f"Invalid catalog returned by {self.name} repository.")
+            return self.__read_catalog(cache_path)
+
+        CachedRequest.save(cache_path, data, validators)
+        logging.info(f"Catalog {self.name} loaded")
+        return index
+
+    def __load_catalog(self, cache_path: str, data: bytes) -> dict | None:
+        compiled = CompiledCatalog.load(cache_path, data)
+        if compiled is not None:
+            self.__compiled = compiled
+            return compiled[0]
+
         try:
             index = yaml.load(data)
         except yaml.YAMLError:
-            index = None
+            return None
         if not isinstance(index, dict):
-            logging.error(f"Invalid catalog returned by {self.name} repository.")
-            return self.__read_cache(cache_path) or {}
+            return None
 
-        self.__write_cache(cache_path, data)
-        logging.info(f"Catalog {self.name} loaded")
+        self.__compiled = (index, self.classify(index))
+        CompiledCatalog.save(cache_path, data, *self.__compiled)
         return index
 
+    def __read_catalog(self, cache_path: str) -> dict:
+        try:
+            with open(cache_path, "rb") as cache:
+                data = cache.read()
+        except OSError:
+            return {}
+        return self.__load_catalog(cache_path, data) or {}
+
+    @staticmethod
+    def classify(catalog: dict):
+        """
+        Sort the entries of the catalog the way the manager of the
+        repository needs them. Kept with the compiled catalog, so it's
+        only done when the catalog changes. None if there's nothing to do.
+        """
+        return None
+
+    @property
+    def classified(self):
+        """What classify() returns for the current catalog."""
+        catalog = getattr(self, "catalog", None)
+        if not isinstance(catalog, dict):
+            return None
+        compiled = getattr(self, "_Repo__compiled", None)
+        if compiled is None or compiled[0] is not catalog:
+            # the catalog was not loaded by __load_catalog, e.g. set by hand
+            compiled = self.__compiled = (catalog, self.classify(catalog))
+        return compiled[1]
+
+    @staticmethod
+    def __handle(request: CachedRequest, buffer: BytesIO):
+        c = pycurl.Curl()
+        _proxy = os.environ.get("http_proxy") or os.environ.get("https_proxy")
+
+        if _proxy:
+            c.setopt(pycurl.PROXY, _proxy)
+        c.setopt(c.URL, request.url)
+        c.setopt(c.FOLLOWLOCATION, True)
+        c.setopt(c.WRITEDATA, buffer)
+        c.setopt(pycurl.CONNECTTIMEOUT, 10)
+        c.setopt(pycurl.TIMEOUT, 30)
+        request.prepare(c)
+        return c
+
+    def __fetch(self, request: CachedRequest) -> tuple[int, bytes]:
+        buffer = BytesIO()
+
+        c = self.__handle(request, buffer)
+        try:
+            c.perform()
+            response_code = c.getinfo(c.RESPONSE_CODE)
+        finally:
+            c.close()
+
+        return response_code, buffer.getvalue()
+
     def get_manifest(self, url: str, plain: bool = False) -> str | dict | bool:
-        cache_url = url
-        canonical_url = getattr(self, "cache_url", self.url)
-        if url.startswith(self.url):
-            cache_url = canonical_url + url[len(self.url) :]
-        cache_name = sha256(cache_url.encode("utf-8")).hexdigest() + ".yml"
-        cache_path = self.__get_cache_path(cache_name)
+        cache_path = self.__get_manifest_cache_path(url)
         if self.offline:
             return self.__read_cache(cache_path, plain=plain) or False
 
         try:
+            request = CachedRequest(url, cache_path)
+            response_code, res = self.__fetch(request)
+            return self.__read_response(request, response_code, res, plain)
+        except (OSError, UnicodeDecodeError, pycurl.error, yaml.YAMLError):
+            logging.error(f"Cannot fetch {self.name} manifest.")
+            return self.__read_cache(cache_path, plain=plain) or False
+
+    def manifest_url(self, name: str) -> str | None:
+        """The url of the manifest of an entry of the catalog."""
+        return None
+
+    def get_manifests(self, names: Iterable[str]) -> dict[str, dict]:
+        """
+        Get the manifests of several entries of the catalog at once. They
+        are downloaded together over one multi handle, at most
+        parallel_downloads at a time, and cached like get_manifest does.
+        Entries without a valid manifest are left out.
+        """
+        requests = {}
+        for name in dict.fromkeys(names):
+            url = self.manifest_url(name)
+            if url is not None:
+                requests[name] = CachedRequest(url, self.__get_manifest_cache_path(url))
+
+        if self.offline:
+            manifests = {
+                name: self.__read_cache(request.path)
+                for name, request in requests.items()
+            }
+            return {name: m for name, m in manifests.items() if m}
+
+        multi = pycurl.CurlMulti()
+        multi.setopt(pycurl.M_MAX_TOTAL_CONNECTIONS, self.parallel_downloads)
+        transfers = {}
+        for name, request in requests.items():
             buffer = BytesIO()
+            c = self.__handle(request, buffer)
+            multi.add_handle(c)
+            transfers[c] = (name, request, buffer)
 
-            c = pycurl.Curl()
-            try:
-                _proxy = os.environ.get("http_proxy") or os.environ.get("https_proxy")
-
-                if _proxy:
-                    c.setopt(pycurl.PROXY, _proxy)
-                c.setopt(c.URL, url)
-                c.setopt(c.FOLLOWLOCATION, True)
-                c.setopt(c.WRITEDATA, buffer)
-                c.setopt(pycurl.CONNECTTIMEOUT, 10)
-                c.setopt(pycurl.TIMEOUT, 30)
-                c.perform()
-            finally:
+        manifests = {}
+        try:
+            remaining = len(transfers)
+            while remaining:
+                while multi.perform()[0] == pycurl.E_CALL_MULTI_PERFORM:
+                    pass
+                while True:
+                    queued, done, failed = multi.info_read()
+                    for c in done:
+                        name, request, buffer = transfers[c]
+                        manifests[name] = self.__read_response(
+                            request, c.getinfo(c.RESPONSE_CODE), buffer.getvalue()
+                        )
+                    for c, _errno, message in failed:
+                        name, request, _buffer = transfers[c]
+                        logging.error(f"Cannot fetch {self.name} manifest: {message}")
+                        manifests[name] = self.__read_cache(request.path)
+                    for c in [*done, *(f[0] for f in failed)]:
+                        multi.remove_handle(c)
+                        remaining -= 1
+                    if not queued:
+                        break
+                if remaining:
+                    # wait for activity, at most as long as libcurl says
+                    timeout = multi.timeout()
+                    multi.select(min(timeout / 1000, 1.0) if timeout >= 0 else 1.0)
+        except pycurl.error as e:
+            logging.error(f"Cannot fetch {self.name} manifests together: {e}")
+        finally:
+            for c in transfers:
                 c.close()
+            multi.close()
 
-            res = buffer.getvalue()
-            manifest = yaml.load(res)
-            if not isinstance(manifest, dict):
-                logging.error(f"Invalid manifest returned by {self.name} repository.")
-                return self.__read_cache(cache_path, plain=plain) or False
+        for name, request in requests.items():
+            if name not in manifests:
+                # left behind by a broken multi handle, one by one then
+                manifests[name] = self.get_manifest(request.url)
 
-            self.__write_cache(cache_path, res)
-            if plain:
-                return res.decode("utf-8")
-            return manifest
-        except (OSError, UnicodeDecodeError, pycurl.error, yaml.YAMLError):
-            logging.error(f"Cannot fetch {self.name} manifest.")
-            return self.__read_cache(cache_path, plain=plain) or False
+        return {name: m for name, m in manifests.items() if isinstance(m, dict)}
+
+    def __read_response(
+        self,
+        request: CachedRequest,
+        response_code: int,
+        data: bytes,
+        plain: bool = False,
+    ) -> str | dict | bool:
+        if request.not_modified(response_code):
+            return self.__read_cache(request.path, plain=plain) or False
+
+        try:
+            manifest = yaml.load(data)
+        except yaml.YAMLError:
+            manifest = None
+        if not isinstance(manifest, dict):
+            logging.error(f"Invalid manifest returned by {self.name} repository.")
+            return self.__read_cache(request.path, plain=plain) or False
+
+        CachedRequest.save(request.path, data, request.validators)
+        if plain:
+            return data.decode("utf-8")
+        return manifest
+
+    def __get_manifest_cache_path(self, url: str) -> str:
+        cache_url = url
+        canonical_url = getattr(self, "cache_url", self.url)
+        if url.startswith(self.url):
+            cache_url = canonical_url + url[len(self.url) :]
+        cache_name = sha256(cache_url.encode("utf-8")).hexdigest() + ".yml"
+        return self.__get_cache_path(cache_name)
 
     def __get_cache_path(self, name: str) -> str:
         cache_url = getattr(self, "cache_url", self.url)
-        repo_id = sha256(cache_url.encode("utf-8")).hexdigest()[:16]
-        return os.path.join(Paths.temp, "repositories", self.name, repo_id, name)
+        return repository_cache_path(self.name, cache_url, name)
 
     @staticmethod
     def __read_cache(path: str, plain: bool = False) -> str | dict | bool:
@@ -167,14 +306,3 @@ class Repo:
             return parsed
         except (OSError, UnicodeDecodeError, yaml.YAMLError):
             return False
-
-    @staticmethod
-    def __write_cache(path: str, data: bytes) -> None:
-        try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            temp_path = f"{path}.tmp"
-            with open(temp_path, "wb") as cache:
-                cache.write(data)
-            os.replace(temp_path, path)
-        except OSError:
-            logging.warning(f"Cannot cache repository data at {path}.")
@@ -53,6 +53,9 @@ class Signals(Enum):
     # ProgramFinished data payload:
     ProgramFinished = "Playtime.program_finished"
 
+    # data(dict): "bottle" and "name" of the executable, status: running or not
+    ProcessStatusChanged = "ProcessMonitor.status_changed"
+
     # Eagle analysis signals
     EagleStep = "Eagle.step"  # data(Result): msg(str)
     EagleFinished = "Eagle.finished"  # data(Result): results(dict)
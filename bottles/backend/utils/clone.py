@@ -0,0 +1,357 @@
+# clone.py
+#
+# Copyright 2025 mirkobrombin <brombin94@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import dataclasses
+import errno
+import fcntl
+import os
+import shutil
+import struct
+import threading
+import time
+from collections import Counter
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from threading import Event
+from typing import Callable, List, Optional, Set, Tuple
+
+# ioctl(dest_fd, FICLONE, src_fd) from linux/fs.h
+FICLONE = 0x40049409
+
+# ioctl(src_fd, FIDEDUPERANGE, struct file_dedupe_range) from linux/fs.h,
+# followed by one struct file_dedupe_range_info per destination
+FIDEDUPERANGE = 0xC0189436
+_DEDUPE_RANGE = struct.Struct("=QQHHI")
+_DEDUPE_INFO = struct.Struct("=qQQiI")
+_DEDUPE_DIFFERS = 1
+# Btrfs handles at most 16 MiB per call
+_DEDUPE_CHUNK = 16 * 1024 * 1024
+
+# bytes copied between progress updates and cancellation checks
+_CHUNK = 64 * 1024 * 1024
+
+# errors meaning the filesystem (pair) can't do it, not that the file is bad
+_UNSUPPORTED = {
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EBADF,
+}
+
+IgnoreFunc = Callable[[str, List[str]], Set[str]]
+
+
+def is_unsupported(error: OSError) -> bool:
+    """Whether the error means the filesystem can't share extents."""
+    return error.errno in _UNSUPPORTED
+
+
+def reflink(src_fd: int, dst_fd: int):
+    """Make dst share all the extents of src, replacing its content."""
+    fcntl.ioctl(dst_fd, FICLONE, src_fd)
+
+
+def dedupe_range(src_fd: int, dst_fd: int, length: int) -> int:
+    """
+    Make dst share the extents of src where both hold the same bytes. The
+    kernel compares the data under lock, so a file changing meanwhile is
+    never corrupted, it is just not deduplicated. Returns the number of
+    bytes now shared, counted from the start of the files.
+    """
+    done = 0
+    while done < length:
+        chunk = min(_DEDUPE_CHUNK, length - done)
+        arg = bytearray(
+            _DEDUPE_RANGE.pack(done, chunk, 1, 0, 0)
+            + _DEDUPE_INFO.pack(dst_fd, done, 0, 0, 0)
+        )
+        fcntl.ioctl(src_fd, FIDEDUPERANGE, arg, True)
+        _fd, _offset, deduped, status, _reserved = _DEDUPE_INFO.unpack_from(
+            arg, _DEDUPE_RANGE.size
+        )
+        if status < 0:
+            raise OSError(-status, os.strerror(-status))
+        if status == _DEDUPE_DIFFERS or deduped == 0:
+            break
+        done += deduped
+    return done
+
+
+class CloneStrategy:
+    REFLINK = "reflink"
+    COPY_RANGE = "copy_file_range"
+    SENDFILE = "sendfile"
+    COPY = "copy"
+
+
+@dataclasses.dataclass
+class CloneReport:
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    strategies: Counter = dataclasses.field(default_factory=Counter)
+
+    @property
+    def strategy(self) -> str:
+        """The strategies used, most used first, e.g. "reflink"."""
+        return "+".join(name for name, _count in self.strategies.most_common())
+
+    def __str__(self):
+        return (
+            f"{self.files} files ({self.bytes / 1024**2:.1f} MiB) "
+            f"via {self.strategy or 'nothing'} in {self.seconds:.2f}s"
+        )
+
+
+class TreeCloner:
+    """
+    Copy a directory tree as cheaply as the filesystem allows: files are
+    reflinked (FICLONE) on filesystems sharing extents like Btrfs and XFS,
+    copied in the kernel with copy_file_range or sendfile otherwise, and
+    read/written as a last resort. Only the data of sparse files is
+    copied, so they stay sparse. Files are copied by a pool of threads,
+    which helps on SSDs and network filesystems. Symlinks are recreated,
+    metadata is kept like shutil.copy2 does.
+
+    Hardlinks are never used: bottles rewrite DLLs in place (DXVK, VKD3D,
+    dependencies), which would change every bottle sharing the inode.
+    """
+
+    def __init__(
+        self,
+        ignore: Optional[IgnoreFunc] = None,
+        workers: int = 0,
+        progress: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[Event] = None,
+    ):
+        self.ignore = ignore
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.__reflink = True
+        self.__copy_range = hasattr(os, "copy_file_range")
+        self.__sendfile = hasattr(os, "sendfile")
+        self.__lock = threading.Lock()
+        self.__done = 0
+        self.__total = 0
+
+    def clone(self, src: str, dst: str, dirs_exist_ok: bool = False) -> CloneReport:
+        """
+        Copy src into dst, like shutil.copytree with symlinks=True. The
+        progress callback gets the bytes copied so far and the total.
+        ---
+        raises: shutil.Error
+            With the (src, dst, reason) of the entries that failed, once
+            everything else has been copied.
+        raises: CancelledError
+            When the cancel event is set, the copy is left incomplete.
+        """
+        start = time.perf_counter()
+        report = CloneReport()
+        errors: List[Tuple[str, str, str]] = []
+        dirs, files = self.__plan(src, dst, dirs_exist_ok, errors)
+        self.__done = 0
+        self.__total = sum(size for _source, _dest, size in files)
+
+        def copy(job: Tuple[str, str, int]):
+            source, dest, size = job
+            try:
+                strategy = self.__copy_file(source, dest)
+            except OSError as error:
+                with self.__lock:
+                    errors.append((source, dest, str(error)))
+                return
+            with self.__lock:
+                report.files += 1
+                report.bytes += size
+                report.strategies[strategy] += 1
+
+        if files:
+            # the first file tells if reflinks work before going parallel
+            copy(files[0])
+            with ThreadPoolExecutor(self.workers) as pool:
+                list(pool.map(copy, files[1:]))
+
+        for source, dest in reversed(dirs):
+            try:
+                shutil.copystat(source, dest)
+            except OSError as error:
+                errors.append((source, dest, str(error)))
+
+        report.seconds = time.perf_counter() - start
+        if errors:
+            raise shutil.Error(errors)
+        return report
+
+    def __plan(
+        self, src: str, dst: str, dirs_exist_ok: bool, errors: list
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str, int]]]:
+        """Create the directories and symlinks, return the files to copy."""
+        os.makedirs(dst, exist_ok=dirs_exist_ok)
+        dirs = [(src, dst)]
+        files = []
+        pending = [(src, dst)]
+
+        while pending:
+            source_dir, dest_dir = pending.pop()
+            with os.scandir(source_dir) as scan:
+                entries = list(scan)
+            ignored = set()
+            if self.ignore is not None:
+                ignored = self.ignore(source_dir, [e.name for e in entries])
+
+            for entry in entries:
+                if entry.name in ignored:
+                    continue
+                dest = os.path.join(dest_dir, entry.name)
+                try:
+                    if entry.is_symlink():
+                        if os.path.lexists(dest):
+                            os.unlink(dest)
+                        os.symlink(os.readlink(entry.path), dest)
+                    elif entry.is_dir():
+                        os.makedirs(dest, exist_ok=True)
+                        dirs.append((entry.path, dest))
+                        pending.append((entry.path, dest))
+                    else:
+                        files.append((entry.path, dest, entry.stat().st_size))
+                except OSError as error:
+                    errors.append((entry.path, dest, str(error)))
+
+        return dirs, files
+
+    def __copy_file(self, source: str, dest: str) -> str:
+        # never write through an existing file, it may be shared
+        try:
+            os.unlink(dest)
+        except FileNotFoundError:
+            pass
+
+        with open(source, "rb") as fsrc, open(dest, "xb") as fdst:
+            strategy = self.__copy_data(fsrc.fileno(), fdst.fileno())
+        shutil.copystat(source, dest)
+        return strategy
+
+    def __copy_data(self, src_fd: int, dst_fd: int) -> str:
+        """
+        Copy with the cheapest working method, remembering the ones that
+        are not supported. Holes of sparse files are kept.
+        """
+        size = os.fstat(src_fd).st_size
+        if self.__reflink:
+            self.__check_cancel()
+            try:
+                reflink(src_fd, dst_fd)
+                self.__advance(size)
+                return CloneStrategy.REFLINK
+            except OSError as error:
+                if error.errno not in _UNSUPPORTED:
+                    raise
+                self.__reflink = False
+
+        strategy = self.__fastest_copy()
+        remaining = size
+        for offset, length in self.__data_ranges(src_fd, size):
+            end = offset + length
+            while offset < end:
+                self.__check_cancel()
+                count = min(_CHUNK, end - offset)
+                strategy, copied = self.__copy_chunk(src_fd, dst_fd, offset, count)
+                if copied == 0:
+                    # the kernel copy gave up early, or the source shrank
+                    data = os.pread(src_fd, count, offset)
+                    if not data:
+                        raise OSError(errno.EIO, "Source file ended while copying")
+                    strategy = CloneStrategy.COPY
+                    copied = os.pwrite(dst_fd, data, offset)
+                offset += copied
+                remaining -= copied
+                self.__advance(copied)
+        # a trailing hole is not written by anyone
+        os.ftruncate(dst_fd, size)
+        if remaining > 0:
+            self.__advance(remaining)
+        return strategy
+
+    def __fastest_copy(self) -> str:
+        if self.__copy_range:
+            return CloneStrategy.COPY_RANGE
+        if self.__sendfile:
+            return CloneStrategy.SENDFILE
+        return CloneStrategy.COPY
+
+    def __copy_chunk(
+        self, src_fd: int, dst_fd: int, offset: int, count: int
+    ) -> Tuple[str, int]:
+        if self.__copy_range:
+            try:
+                copied = os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+                return CloneStrategy.COPY_RANGE, copied
+            except OSError as error:
+                if error.errno not in _UNSUPPORTED:
+                    raise
+                self.__copy_range = False
+
+        if self.__sendfile:
+            try:
+                os.lseek(dst_fd, offset, os.SEEK_SET)
+                return CloneStrategy.SENDFILE, os.sendfile(
+                    dst_fd, src_fd, offset, count
+                )
+            except OSError as error:
+                if error.errno not in _UNSUPPORTED:
+                    raise
+                self.__sendfile = False
+
+        data = os.pread(src_fd, count, offset)
+        return CloneStrategy.COPY, os.pwrite(dst_fd, data, offset)
+
+    @staticmethod
+    def __data_ranges(fd: int, size: int) -> List[Tuple[int, int]]:
+        """The (offset, length) of the parts of the file holding data."""
+        st = os.fstat(fd)
+        if st.st_blocks * 512 >= size or not hasattr(os, "SEEK_DATA"):
+            return [(0, size)]
+
+        ranges = []
+        offset = 0
+        try:
+            while offset < size:
+                try:
+                    start = os.lseek(fd, offset, os.SEEK_DATA)
+                except OSError as error:
+                    if error.errno == errno.ENXIO:  # only a hole is left
+                        break
+                    raise
+                offset = os.lseek(fd, start, os.SEEK_HOLE)
+                ranges.append((start, offset - start))
+        except OSError:
+            return [(0, size)]
+        return ranges
+
+    def __check_cancel(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise CancelledError
+
+    def __advance(self, count: int):
+        if self.progress is None:
+            return
+        with self.__lock:
+            self.__done += count
+            done = self.__done
+        self.progress(done, self.__total)
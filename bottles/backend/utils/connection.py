@@ -15,16 +15,23 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import contextlib
 import os
+import tempfile
+import threading
+import time
 from datetime import datetime
 from gettext import gettext as _
-from typing import Optional
+from typing import ClassVar, Dict, Optional, Tuple
 
 import pycurl
+from gi.repository import Gio
 
+from bottles.backend.globals import Paths
 from bottles.backend.logger import Logger
 from bottles.backend.models.result import Result
 from bottles.backend.state import Notification, SignalManager, Signals
+from bottles.backend.utils import json
 
 logging = Logger()
 
@@ -34,6 +41,11 @@ class ConnectionUtils:
     This class is used to check the connection, pinging the official
     Bottle's website. If the connection is offline, the user will be
     notified and False will be returned, otherwise True.
+
+    When the system network monitor (NetworkManager or the portal) knows
+    the connectivity, nobody is pinged. Otherwise every url is pinged at
+    once and the first answer wins. Results are cached for a short time
+    in Paths.temp, so they are shared by every Manager and CLI call.
     """
 
     _status: Optional[bool] = None
@@ -45,12 +57,19 @@ class ConnectionUtils:
         "https://cloudflare.com",
     )
 
+    # seconds a probe result is trusted, being offline is re-checked sooner
+    cache_ttl: ClassVar[Dict[bool, float]] = {True: 120, False: 15}
+    _cache: ClassVar[Optional[Tuple[float, bool]]] = None
+    _monitor_connected: ClassVar[bool] = False
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
     def __init__(self, force_offline=False, **kwargs):
         super().__init__(**kwargs)
         self.force_offline = force_offline
         self.do_check_connection = True
         self.aborted_connections = 0
         SignalManager.connect(Signals.ForceStopNetworking, self.stop_check)
+        ConnectionUtils.__watch_monitor()
 
     @property
     def status(self) -> Optional[bool]:
@@ -75,7 +94,95 @@ class ConnectionUtils:
         if res.status:
             self.do_check_connection = False
 
-    def __ping(self, url: str) -> bool:
+    @staticmethod
+    def __cache_path() -> str:
+        return os.path.join(Paths.temp, "connection.json")
+
+    @classmethod
+    def __watch_monitor(cls):
+        """Forget the cached result when the system sees the network change."""
+        with cls._lock:
+            if cls._monitor_connected:
+                return
+            cls._monitor_connected = True
+        try:
+            Gio.NetworkMonitor.get_default().connect(
+                "network-changed", cls.__network_changed
+            )
+        except Exception as e:
+            logging.debug(f"Network monitor not available: {e}")
+
+    @classmethod
+    def __network_changed(cls, _monitor, _available):
+        cls.clear_cache()
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._cache = None
+        with contextlib.suppress(OSError):
+            os.remove(cls.__cache_path())
+
+    @classmethod
+    def __cached(cls) -> Optional[bool]:
+        """The last probe result if it is recent, from any process."""
+        with cls._lock:
+            cached = cls._cache
+        if cached is None:
+            try:
+                with open(cls.__cache_path()) as f:
+                    data = json.load(f)
+                cached = (float(data["time"]), bool(data["online"]))
+            except (OSError, ValueError, KeyError, TypeError):
+                return None
+        checked, online = cached
+        if not 0 <= time.time() - checked < cls.cache_ttl[online]:
+            return None
+        with cls._lock:
+            cls._cache = cached
+        return online
+
+    @classmethod
+    def __store(cls, online: bool):
+        now = time.time()
+        with cls._lock:
+            cls._cache = (now, online)
+        try:
+            os.makedirs(Paths.temp, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=Paths.temp, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"time": now, "online": online}, f)
+            os.replace(tmp, cls.__cache_path())
+        except OSError as e:
+            logging.debug(f"Cannot cache the connection status: {e}")
+
+    @staticmethod
+    def __monitor_connectivity() -> Optional[bool]:
+        """
+        What the system knows about the connection, None when unsure.
+        Without a route nothing can be reached, but only NetworkManager
+        and the portal actually check the connectivity; the fallback
+        monitor reports full connectivity as soon as there is a route.
+        """
+        try:
+            monitor = Gio.NetworkMonitor.get_default()
+            if not monitor.get_network_available():
+                return False
+            if monitor.__gtype__.name not in (
+                "GNetworkMonitorNM",
+                "GNetworkMonitorPortal",
+            ):
+                return None
+            connectivity = monitor.get_connectivity()
+        except Exception:
+            return None
+        if connectivity == Gio.NetworkConnectivity.FULL:
+            return True
+        if connectivity == Gio.NetworkConnectivity.LOCAL:
+            return False
+        return None  # behind a captive portal or limited, ask the servers
+
+    def __handle(self, url: str) -> pycurl.Curl:
         c = pycurl.Curl()
         _proxy = os.environ.get("http_proxy") or os.environ.get("https_proxy")
         if _proxy:
@@ -89,30 +196,62 @@ class ConnectionUtils:
         # whole startup; on timeout we simply fall back to offline mode
         c.setopt(pycurl.CONNECTTIMEOUT, 5)
         c.setopt(pycurl.TIMEOUT, 10)
+        return c
+
+    def __probe(self) -> bool:
+        """Ping every url at once, True as soon as one answers."""
+        multi = pycurl.CurlMulti()
+        handles = [self.__handle(url) for url in self._check_urls]
+        for c in handles:
+            multi.add_handle(c)
+
+        online = False
+        remaining = len(handles)
         try:
-            c.perform()
-            return c.getinfo(pycurl.HTTP_CODE) == 200
+            while remaining and not online:
+                if not self.do_check_connection:
+                    # stopped, don't wait for the servers to time out; counted
+                    # as aborted so the result is not cached
+                    self.aborted_connections += 1
+                    break
+                ret, _active = multi.perform()
+                while ret == pycurl.E_CALL_MULTI_PERFORM:
+                    ret, _active = multi.perform()
+                while True:
+                    queued, succeeded, failed = multi.info_read()
+                    remaining -= len(succeeded) + len(failed)
+                    if any(c.getinfo(pycurl.HTTP_CODE) == 200 for c in succeeded):
+                        online = True
+                    if not queued:
+                        break
+                if remaining and not online:
+                    multi.select(0.5)
         finally:
-            c.close()
+            for c in handles:
+                multi.remove_handle(c)
+                c.close()
+            multi.close()
+        return online
 
-    def check_connection(self, show_notification=False) -> Optional[bool]:
-        """check network status, send result through signal NetworkReady and return"""
+    def check_connection(self, show_notification=False, force=False) -> Optional[bool]:
+        """
+        check network status, send result through signal NetworkReady and return;
+        with force, a recent result is not trusted and the servers are asked
+        """
         if self.force_offline or "FORCE_OFFLINE" in os.environ:
             logging.info("Forcing offline mode")
             self.status = False
             return False
 
         try:
-            online = False
-            for url in self._check_urls:
-                if not self.do_check_connection:
-                    break
-                try:
-                    if self.__ping(url):
-                        online = True
-                        break
-                except Exception:
-                    continue
+            online = None if force else self.__cached()
+            if online is None and not force:
+                online = self.__monitor_connectivity()
+            if online is None and self.do_check_connection:
+                aborted = self.aborted_connections
+                online = self.__probe()
+                if self.aborted_connections == aborted:
+                    self.__store(online)
 
             if not online:
                 raise Exception("Connection status: offline …")
@@ -135,6 +274,6 @@ class ConnectionUtils:
                 )
             self.last_check = datetime.now()
             self.status = False
-        
+
         self.do_check_connection = True
         return self.status
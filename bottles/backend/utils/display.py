@@ -35,22 +35,9 @@ class DisplayUtils:
     @staticmethod
     def check_nvidia_device():
         """Check if there is an nvidia device connected"""
-        _query = "NVIDIA Corporation".lower()
-        _proc = (
-            subprocess.Popen(
-                "lspci | grep 'VGA'",
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                shell=True,
-            )
-            .communicate()[0]
-            .decode("utf-8")
-            .lower()
-        )
+        from bottles.backend.utils.gpu import GPUUtils, GPUVendors
 
-        if _query in _proc:
-            return True
-        return False
+        return GPUUtils.is_gpu(GPUVendors.NVIDIA)
 
     @staticmethod
     def display_server_type():
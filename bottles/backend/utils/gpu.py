@@ -15,10 +15,13 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import copy
 import os
 import subprocess
+import threading
+from dataclasses import dataclass
 from enum import Enum
-from functools import lru_cache
+from typing import List, Optional
 
 from bottles.backend.logger import Logger
 from bottles.backend.utils.nvidia import get_nvidia_dll_path
@@ -33,6 +36,15 @@ class GPUVendors(Enum):
     INTEL = "intel"
 
 
+@dataclass(frozen=True)
+class PCIDisplayDevice:
+    address: str
+    pci_class: int
+    vendor: int
+    device: int
+    boot_vga: bool
+
+
 # noinspection PyTypeChecker
 class GPUUtils:
     __vendors = {
@@ -40,9 +52,139 @@ class GPUUtils:
         "amd": "Advanced Micro Devices, Inc.",
         "intel": "Intel Corporation",
     }
+    __vendor_ids = {
+        0x10DE: "nvidia",
+        0x1002: "amd",
+        0x1022: "amd",
+        0x8086: "intel",
+    }
+
+    sysfs_pci_devices = "/sys/bus/pci/devices"
+
+    # the GPU topology does not change while Bottles is running (unless a
+    # GPU is hot-plugged, see refresh), so it's probed once per process
+    __lock = threading.Lock()
+    __devices: Optional[List[PCIDisplayDevice]] = None
+    __found: Optional[List[str]] = None
+    __gpu: Optional[dict] = None
 
     def __init__(self):
-        self.vk = VulkanUtils()
+        self.__vk: Optional[VulkanUtils] = None
+
+    @property
+    def vk(self) -> VulkanUtils:
+        if self.__vk is None:
+            self.__vk = VulkanUtils()
+        return self.__vk
+
+    @classmethod
+    def refresh(cls):
+        """
+        Forget the probed GPU topology, so the next call probes it again.
+        Call this when a GPU is plugged or unplugged.
+        """
+        with cls.__lock:
+            cls.__devices = None
+            cls.__found = None
+            cls.__gpu = None
+
+    @classmethod
+    def get_display_devices(cls) -> Optional[List[PCIDisplayDevice]]:
+        """
+        Returns the display controllers (PCI class 0x03) listed in sysfs,
+        or None if sysfs can't be read.
+        """
+        with cls.__lock:
+            if cls.__devices is None:
+                cls.__devices = cls.__read_sysfs()
+            return cls.__devices
+
+    @classmethod
+    def __read_sysfs(cls) -> Optional[List[PCIDisplayDevice]]:
+        def read(address: str, name: str) -> Optional[str]:
+            try:
+                with open(os.path.join(cls.sysfs_pci_devices, address, name)) as f:
+                    return f.read().strip()
+            except OSError:
+                return None
+
+        try:
+            addresses = sorted(os.listdir(cls.sysfs_pci_devices))
+        except OSError:
+            return None
+        if not addresses:
+            return None
+
+        devices = []
+        for address in addresses:
+            try:
+                pci_class = int(read(address, "class") or "", 16)
+                vendor = int(read(address, "vendor") or "", 16)
+                device = int(read(address, "device") or "0", 16)
+            except ValueError:
+                continue
+            if pci_class >> 16 != 0x03:
+                continue
+            devices.append(
+                PCIDisplayDevice(
+                    address=address,
+                    pci_class=pci_class,
+                    vendor=vendor,
+                    device=device,
+                    boot_vga=read(address, "boot_vga") == "1",
+                )
+            )
+        return devices
+
+    @classmethod
+    def get_vendors(cls) -> List[str]:
+        """
+        Returns the vendors of the display controllers, probed through sysfs
+        and falling back to lspci when it is not available.
+        """
+        found = cls.__found
+        if found is None:
+            devices = cls.get_display_devices()
+            if devices is None:
+                found = cls.__lspci_vendors()
+            else:
+                vendors = {cls.__vendor_ids.get(device.vendor) for device in devices}
+                found = [v for v in ("nvidia", "amd", "intel") if v in vendors]
+            with cls.__lock:
+                cls.__found = found
+        return list(found)
+
+    @classmethod
+    def get_boot_vendor(cls) -> Optional[str]:
+        """
+        Returns the vendor of the GPU the firmware booted on (boot_vga in
+        sysfs), or None if it's unknown.
+        """
+        for device in cls.get_display_devices() or []:
+            if device.boot_vga:
+                return cls.__vendor_ids.get(device.vendor)
+        return None
+
+    @staticmethod
+    def __lspci_vendors() -> List[str]:
+        checks = {
+            "nvidia": {"query": "(VGA|3D|Display).*NVIDIA"},
+            "amd": {"query": "(VGA|3D|Display).*AMD/ATI"},
+            "intel": {"query": "(VGA|3D|Display).*Intel"},
+        }
+        found = []
+        for _check in checks:
+            _query = checks[_check]["query"]
+            _proc = subprocess.Popen(
+                f"lspci | grep -iP '{_query}'",
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                shell=True,
+            )
+            stdout, stderr = _proc.communicate()
+            if len(stdout) > 0:
+                found.append(_check)
+        return found
 
     def list_all(self):
         found = []
@@ -61,7 +203,14 @@ class GPUUtils:
         return found
 
     @staticmethod
-    def assume_discrete(vendors: list):
+    def assume_discrete(vendors: list, boot_vendor: Optional[str] = None):
+        # hybrid laptops boot on the integrated GPU, which tells an AMD APU
+        # with an Intel card from an Intel CPU with an AMD card; NVIDIA has
+        # no integrated GPUs, booting on one says nothing
+        if boot_vendor in vendors and boot_vendor != "nvidia":
+            others = [v for v in vendors if v != boot_vendor]
+            if others:
+                return {"integrated": boot_vendor, "discrete": others[0]}
         if "nvidia" in vendors and "amd" in vendors:
             return {"integrated": "amd", "discrete": "nvidia"}
         if "nvidia" in vendors and "intel" in vendors:
@@ -87,11 +236,18 @@ class GPUUtils:
         return False
 
     def get_gpu(self):
-        checks = {
-            "nvidia": {"query": "(VGA|3D|Display).*NVIDIA"},
-            "amd": {"query": "(VGA|3D|Display).*AMD/ATI"},
-            "intel": {"query": "(VGA|3D|Display).*Intel"},
-        }
+        """
+        Returns the GPUs found and the environment needed to use each of
+        them. The result is cached, see refresh.
+        """
+        cached = GPUUtils.__gpu
+        if cached is None:
+            cached = self.__probe_gpu()
+            with GPUUtils.__lock:
+                GPUUtils.__gpu = cached
+        return copy.deepcopy(cached)
+
+    def __probe_gpu(self):
         gpus = {
             "nvidia": {
                 "vendor": "nvidia",
@@ -122,21 +278,12 @@ class GPUUtils:
             gpus["nvidia"]["envs"] = {"DRI_PRIME": "1"}
             gpus["nvidia"]["icd"] = nouveau_icd
 
-        for _check in checks:
-            _query = checks[_check]["query"]
-            _proc = subprocess.Popen(
-                f"lspci | grep -iP '{_query}'",
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                shell=True,
-            )
-            stdout, stderr = _proc.communicate()
-            if len(stdout) > 0:
-                found.append(_check)
-                result["vendors"][_check] = gpus[_check]
+        for _check in self.get_vendors():
+            found.append(_check)
+            result["vendors"][_check] = gpus[_check]
 
         if len(found) >= 2:
-            _discrete = self.assume_discrete(found)
+            _discrete = self.assume_discrete(found, self.get_boot_vendor())
             if _discrete:
                 _integrated = _discrete["integrated"]
                 _discrete = _discrete["discrete"]
@@ -146,13 +293,5 @@ class GPUUtils:
         return result
 
     @staticmethod
-    @lru_cache
     def is_gpu(vendor: GPUVendors) -> bool:
-        _proc = subprocess.Popen(
-            f"lspci | grep -iP '{vendor.value}'",
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            shell=True,
-        )
-        stdout, stderr = _proc.communicate()
-        return len(stdout) > 0
+        return vendor.value in GPUUtils.get_vendors()
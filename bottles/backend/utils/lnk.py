@@ -15,9 +15,20 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import contextlib
+import fnmatch
 import locale
+import os
+import stat
 import struct
+import tempfile
 from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from bottles.backend.logger import Logger
+from bottles.backend.utils import json
+
+logging = Logger()
 
 
 class LnkUtils:
@@ -26,6 +37,15 @@ class LnkUtils:
     def get_data(path):
         """
         Gets data from a .lnk file, and returns them in a dictionary.
+        The result is cached by path, use read_target to always read
+        the file from disk.
+        """
+        return LnkUtils.read_target(path)
+
+    @staticmethod
+    def read_target(path):
+        """
+        Reads the target path stored in a .lnk file.
         Thanks to @Winand and @Jared for the code.
         <https://gist.github.com/Winand/997ed38269e899eb561991a0c663fa49>
         """
@@ -78,3 +98,197 @@ class LnkUtils:
                     return content[-1].decode("utf-16", errors="replace")
                 except (UnicodeDecodeError, LookupError):
                     return None
+
+
+class LnkIndex:
+    """
+    Persistent index of the shortcuts (.lnk) found in the Desktop and
+    Start Menu folders of a bottle. The index is stored in the bottle
+    cache directory and keeps the mtime of every scanned directory and
+    the mtime and size of every shortcut, so only new or changed
+    shortcuts are parsed again and the folders are only walked when
+    one of them has changed.
+    """
+
+    version = 1
+    file_name = "programs_index.json"
+
+    # (pattern relative to drive_c, recursive)
+    search_roots = (
+        ("users/*/Desktop", False),
+        ("users/*/Start Menu/Programs", True),
+        ("ProgramData/Microsoft/Windows/Start Menu/Programs", True),
+        ("users/*/AppData/Roaming/Microsoft/Windows/Start Menu/Programs", True),
+    )
+
+    def __init__(self, bottle_path: str):
+        self.bottle_path = bottle_path
+        self.index_path = os.path.join(bottle_path, "cache", self.file_name)
+        self.parsed = 0
+        self.scanned = False
+
+    def get_targets(self) -> List[Tuple[str, str]]:
+        """
+        Returns a list of (shortcut path, target path) tuples, in the
+        same order the folders are searched. Shortcuts without a valid
+        target are skipped.
+        """
+        self.parsed = 0
+        self.scanned = False
+
+        index = self.__load()
+        dirs: Dict[str, Optional[int]] = index["dirs"]
+        cached_links: Dict[str, list] = index["links"]
+
+        if not dirs or any(self.__dir_mtime(d) != m for d, m in dirs.items()):
+            dirs, link_paths = self.__scan()
+            self.scanned = True
+        else:
+            link_paths = list(cached_links)
+
+        links: Dict[str, list] = {}
+        for rel_path in link_paths:
+            try:
+                st = os.stat(os.path.join(self.bottle_path, rel_path))
+            except OSError:
+                continue
+
+            cached = cached_links.get(rel_path)
+            if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                links[rel_path] = cached
+                continue
+
+            links[rel_path] = [st.st_mtime_ns, st.st_size, self.__parse(rel_path)]
+            self.parsed += 1
+
+        if dirs != index["dirs"] or links != cached_links:
+            self.__save({"version": self.version, "dirs": dirs, "links": links})
+
+        return [
+            (os.path.join(self.bottle_path, rel_path), link[2])
+            for rel_path, link in links.items()
+            if link[2]
+        ]
+
+    def __parse(self, rel_path: str) -> Optional[str]:
+        try:
+            return LnkUtils.read_target(os.path.join(self.bottle_path, rel_path))
+        except (OSError, struct.error) as e:
+            logging.debug(f"Could not read shortcut {rel_path}: {e}")
+            return None
+
+    def __dir_mtime(self, rel_path: str) -> Optional[int]:
+        try:
+            st = os.stat(os.path.join(self.bottle_path, rel_path))
+        except OSError:
+            return None
+        if not stat.S_ISDIR(st.st_mode):
+            return None
+        return st.st_mtime_ns
+
+    def __scan(self) -> Tuple[Dict[str, Optional[int]], List[str]]:
+        """
+        Walks the search roots, recording the mtime of every directory
+        involved (or None for the missing ones, so their creation is
+        noticed too) and collecting the shortcuts with the same rules
+        as glob: hidden entries are skipped and symlinks are followed.
+        """
+        dirs: Dict[str, Optional[int]] = {}
+        links: List[str] = []
+        visited = set()
+
+        def watch(rel_path: str) -> bool:
+            if rel_path not in dirs:
+                dirs[rel_path] = self.__dir_mtime(rel_path)
+            return dirs[rel_path] is not None
+
+        def walk(rel_path: str, recursive: bool):
+            try:
+                st = os.stat(os.path.join(self.bottle_path, rel_path))
+                if (st.st_dev, st.st_ino) in visited:
+                    return
+                visited.add((st.st_dev, st.st_ino))
+                entries = sorted(
+                    os.scandir(os.path.join(self.bottle_path, rel_path)),
+                    key=lambda e: e.name,
+                )
+            except OSError:
+                return
+
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                child = f"{rel_path}/{entry.name}"
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir:
+                    if recursive and watch(child):
+                        walk(child, recursive)
+                elif fnmatch.fnmatchcase(entry.name, "*.lnk"):
+                    links.append(child)
+
+        users = []
+        if watch("drive_c") and watch("drive_c/users"):
+            with contextlib.suppress(OSError):
+                users = sorted(
+                    e.name
+                    for e in os.scandir(os.path.join(self.bottle_path, "drive_c/users"))
+                    if not e.name.startswith(".") and e.is_dir()
+                )
+
+        for pattern, recursive in self.search_roots:
+            if pattern.startswith("users/*/"):
+                roots = [f"users/{u}/{pattern[8:]}" for u in users]
+            else:
+                roots = [pattern]
+
+            for root in roots:
+                rel_path = "drive_c"
+                for part in root.split("/"):
+                    rel_path = f"{rel_path}/{part}"
+                    if not watch(rel_path):
+                        break
+                else:
+                    walk(rel_path, recursive)
+
+        return dirs, links
+
+    def __load(self) -> dict:
+        empty = {"version": self.version, "dirs": {}, "links": {}}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return empty
+
+        if (
+            not isinstance(index, dict)
+            or index.get("version") != self.version
+            or not isinstance(index.get("dirs"), dict)
+            or not isinstance(index.get("links"), dict)
+        ):
+            return empty
+        return index
+
+    def __save(self, index: dict):
+        if not os.path.isdir(os.path.join(self.bottle_path, "drive_c")):
+            return
+
+        temporary = None
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            fd, temporary = tempfile.mkstemp(
+                dir=os.path.dirname(self.index_path), prefix=".programs-"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(temporary, self.index_path)
+            temporary = None
+        except OSError as e:
+            logging.warning(f"Could not save the programs index: {e}")
+        finally:
+            if temporary is not None:
+                with contextlib.suppress(OSError):
+                    os.remove(temporary)
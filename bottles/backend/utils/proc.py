@@ -16,7 +16,101 @@
 #
 
 import os
-import subprocess
+import select
+import signal
+import threading
+import time
+from threading import Event
+from typing import (
+    Callable,
+    ClassVar,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+# a string predicate matches as a substring, a callable gets the decoded value
+Predicate = Union[str, Callable[[str], bool]]
+
+PROC_FIELDS = ("name", "state", "start", "cmdline", "environ", "cwd")
+
+
+def _read(pid: int, name: str) -> Optional[bytes]:
+    try:
+        if name == "cwd":
+            return os.readlink(f"/proc/{pid}/cwd").encode()
+        with open(f"/proc/{pid}/{name}", "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _parse_stat(stat: bytes) -> Tuple[str, str, Optional[int]]:
+    """Name, state and start time (in clock ticks) of a /proc/<pid>/stat."""
+    # the name is inside parenthesis and may contain any character,
+    # e.g. "123 (wine server) S ..."
+    open_at, close_at = stat.find(b"("), stat.rfind(b")")
+    if open_at == -1 or close_at == -1:
+        return "", "", None
+    name = stat[open_at + 1 : close_at].decode("utf-8", errors="replace")
+    fields = stat[close_at + 2 :].split(b" ")
+    try:
+        return name, fields[0].decode(), int(fields[19])
+    except (IndexError, ValueError):
+        return name, fields[0].decode() if fields else "", None
+
+
+def _get_env_var(environ: bytes, name: str) -> Optional[str]:
+    """Value of a variable in a NUL separated environment block."""
+    key = f"{name}=".encode()
+    if environ.startswith(key):
+        at = len(key)
+    else:
+        at = environ.find(b"\0" + key)
+        if at == -1:
+            return None
+        at += len(key) + 1
+    end = environ.find(b"\0", at)
+    return environ[at : None if end == -1 else end].decode("utf-8", errors="replace")
+
+
+def _matches(value: str, predicate: Predicate) -> bool:
+    if callable(predicate):
+        return predicate(value)
+    return predicate in value
+
+
+def _signal(pid: int, sig: int, start: Optional[int] = None) -> bool:
+    """
+    Send a signal through a pidfd when possible. With the start time of the
+    process, a pid reused by another process since then is left alone.
+    """
+    try:
+        fd = os.pidfd_open(pid)
+    except ProcessLookupError:
+        return False
+    except (AttributeError, OSError):
+        fd = None
+
+    try:
+        if start is not None:
+            stat = _read(pid, "stat")
+            if stat is None or _parse_stat(stat)[2] != start:
+                return False
+        if fd is not None:
+            signal.pidfd_send_signal(fd, sig)
+        else:
+            os.kill(pid, sig)
+        return True
+    except OSError:
+        return False
+    finally:
+        if fd is not None:
+            os.close(fd)
 
 
 class Proc:
@@ -26,7 +120,7 @@ class Proc:
     def __get_data(self, data):
         try:
             with open(os.path.join("/proc", str(self.pid), data), "rb") as f:
-                return f.read().decode("utf-8")
+                return f.read().decode("utf-8", errors="replace")
         except OSError:
             return ""
 
@@ -63,42 +157,327 @@ class Proc:
             return ""
 
     def kill(self, signal: int = 15):
-        subprocess.Popen(
-            ["kill", f"-{signal}", str(self.pid)],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        return _signal(int(self.pid), signal)
+
+
+class ProcInfo:
+    """
+    A process as seen in a /proc snapshot. Only the fields that were asked
+    for are read, the others are None.
+    """
+
+    __slots__ = ("pid", "name", "state", "start", "cmdline", "environ", "cwd")
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.name: Optional[str] = None
+        self.state: Optional[str] = None
+        self.start: Optional[int] = None
+        self.cmdline: Optional[str] = None
+        self.environ: Optional[str] = None
+        self.cwd: Optional[str] = None
+
+    def __repr__(self):
+        return f"ProcInfo(pid={self.pid}, name={self.name!r})"
+
+    def getenv(self, name: str) -> Optional[str]:
+        if self.environ is None:
+            return None
+        return _get_env_var(self.environ.encode(), name)
+
+    def kill(self, sig: int = signal.SIGTERM) -> bool:
+        """
+        Signal the process, returns False if it is gone. When the snapshot
+        read its start time, a pid reused since then is not signalled.
+        """
+        return _signal(self.pid, sig, self.start)
 
 
 class ProcUtils:
+    _snapshots: ClassVar[Dict[Tuple[str, ...], Tuple[float, List[ProcInfo]]]] = {}
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
     @staticmethod
-    def get_procs():
-        procs = []
-        for pid in os.listdir("/proc"):
-            if pid.isdigit():
-                procs.append(Proc(pid))
+    def get_pids() -> List[int]:
+        try:
+            with os.scandir("/proc") as entries:
+                return [int(e.name) for e in entries if e.name.isdigit()]
+        except OSError:
+            return []
+
+    @staticmethod
+    def __load(info: ProcInfo, field: str, raw: bytes):
+        if field in ("name", "state", "start"):
+            info.name, info.state, info.start = _parse_stat(raw)
+        else:
+            setattr(info, field, raw.decode("utf-8", errors="replace"))
+
+    @staticmethod
+    def query(
+        name: Optional[Predicate] = None,
+        cmdline: Optional[Predicate] = None,
+        cwd: Optional[Predicate] = None,
+        env: Optional[Dict[str, Predicate]] = None,
+        fields: Iterable[str] = (),
+        ttl: float = 0,
+    ) -> List[ProcInfo]:
+        """
+        Find processes matching all the given predicates in a single pass
+        over /proc. Files are read in order of cost and only while the
+        process still matches, so e.g. environ is only read for processes
+        with the right name. Variables in env must be set and match (a
+        string matches exactly). The extra fields are read for the matches.
+
+        With a ttl, a cached snapshot up to ttl seconds old is filtered
+        instead, useful for callers polling many times in a row.
+        """
+        checks = []
+        if name is not None:
+            checks.append(("stat", lambda i: _matches(i.name, name)))
+        if cmdline is not None:
+            checks.append(("cmdline", lambda i: _matches(i.cmdline, cmdline)))
+        if cwd is not None:
+            checks.append(("cwd", lambda i: _matches(i.cwd, cwd)))
+        if env:
+            checks.append(("environ", lambda i: ProcUtils.__match_env(i, env)))
+
+        wanted = set(fields)
+        unknown = wanted.difference(PROC_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown process fields: {', '.join(sorted(unknown))}")
+
+        if ttl > 0:
+            needed = wanted.union("name" if f == "stat" else f for f, _check in checks)
+            procs = ProcUtils.snapshot(needed, ttl=ttl)
+            return [i for i in procs if all(check(i) for _f, check in checks)]
+
+        results = []
+        for pid in ProcUtils.get_pids():
+            info = ProcInfo(pid)
+            for field, check in checks:
+                raw = _read(pid, field)
+                if raw is None:
+                    break
+                ProcUtils.__load(info, "name" if field == "stat" else field, raw)
+                if not check(info):
+                    break
+            else:
+                if ProcUtils.__fill(info, wanted):
+                    results.append(info)
+        return results
+
+    @staticmethod
+    def __match_env(info: ProcInfo, env: Dict[str, Predicate]) -> bool:
+        environ = info.environ.encode()
+        for var, predicate in env.items():
+            value = _get_env_var(environ, var)
+            if value is None:
+                return False
+            if callable(predicate):
+                if not predicate(value):
+                    return False
+            elif value != predicate:
+                return False
+        return True
+
+    @staticmethod
+    def __fill(info: ProcInfo, fields: Iterable[str]) -> bool:
+        """Read the missing fields, False if the process went away."""
+        for field in fields:
+            if getattr(info, field) is not None:
+                continue
+            source = "stat" if field in ("name", "state", "start") else field
+            raw = _read(info.pid, source)
+            if raw is None:
+                return False
+            ProcUtils.__load(info, field, raw)
+        return True
+
+    @staticmethod
+    def snapshot(fields: Iterable[str] = ("name",), ttl: float = 0) -> List[ProcInfo]:
+        """
+        Read the given fields of every process. Snapshots are shared for ttl
+        seconds between callers asking for the same fields, treat them as
+        read only.
+        """
+        key = tuple(sorted(set(fields)))
+        now = time.monotonic()
+        if ttl > 0:
+            with ProcUtils._lock:
+                cached = ProcUtils._snapshots.get(key)
+            if cached is not None and now - cached[0] < ttl:
+                return cached[1]
+
+        procs = ProcUtils.query(fields=key)
+        if ttl > 0:
+            with ProcUtils._lock:
+                ProcUtils._snapshots[key] = (now, procs)
         return procs
 
+    @staticmethod
+    def cache_clear():
+        with ProcUtils._lock:
+            ProcUtils._snapshots.clear()
+
+    @staticmethod
+    def get_procs():
+        return [Proc(pid) for pid in ProcUtils.get_pids()]
+
     @staticmethod
     def get_by_cmdline(cmdline):
-        _procs = ProcUtils.get_procs()
-        return [proc for proc in _procs if cmdline in proc.get_cmdline()]
+        return [Proc(i.pid) for i in ProcUtils.query(cmdline=cmdline)]
 
     @staticmethod
     def get_by_env(env):
-        _procs = ProcUtils.get_procs()
-        return [proc for proc in _procs if env in proc.get_env()]
+        return [
+            Proc(i.pid)
+            for i in ProcUtils.query(fields=("environ",))
+            if env in i.environ
+        ]
 
     @staticmethod
     def get_by_cwd(cwd):
-        _procs = ProcUtils.get_procs()
-        return [proc for proc in _procs if cwd in proc.get_cwd()]
+        return [Proc(i.pid) for i in ProcUtils.query(cwd=cwd)]
 
     @staticmethod
     def get_by_name(name):
-        _procs = ProcUtils.get_procs()
-        return [proc for proc in _procs if name in proc.get_name()]
+        return [Proc(i.pid) for i in ProcUtils.query(name=name)]
 
     @staticmethod
     def get_by_pid(pid):
         return Proc(pid)
+
+
+class ProcWatch:
+    """
+    Follow the Windows processes of a wine prefix through /proc, so we can
+    wait for them without asking wine. A process belongs to the prefix when
+    its environment has the same WINEPREFIX, wine rewrites its cmdline to
+    start with the path of the Windows executable.
+    """
+
+    # how often cancel events are checked, and /proc polled without pidfd
+    interval = 0.1
+
+    def __init__(self, prefix: str):
+        self.prefix = os.path.normpath(prefix)
+
+    @staticmethod
+    def is_supported() -> bool:
+        return os.path.isdir("/proc/self")
+
+    @staticmethod
+    def get_exe_names(cmdline: str) -> List[str]:
+        """
+        Lowercase executable names of a cmdline: the first argument, and the
+        second one too when the first is a wine loader.
+        """
+        args = cmdline.split("\0")[:2]
+        names = [a.replace("\\", "/").rsplit("/", 1)[-1].lower() for a in args]
+        if names and names[0].startswith("wine"):
+            return names
+        return names[:1]
+
+    def find(self, name: str, ttl: float = 0) -> List[ProcInfo]:
+        """
+        Return the processes of the prefix running the named executable,
+        the .exe extension can be omitted. See ProcUtils.query for ttl.
+        """
+        target = name.replace("\\", "/").rsplit("/", 1)[-1].lower()
+        targets = {target, f"{target}.exe"} if "." not in target else {target}
+        return ProcUtils.query(
+            cmdline=lambda c: bool(targets.intersection(self.get_exe_names(c))),
+            env={"WINEPREFIX": lambda v: os.path.normpath(v) == self.prefix},
+            ttl=ttl,
+        )
+
+    def running(self) -> Set[str]:
+        """
+        Lowercase executable names of every Windows process of the prefix,
+        in a single pass over /proc: environ is only read for processes
+        whose cmdline mentions an .exe.
+        """
+        names: Set[str] = set()
+        for proc in ProcUtils.query(
+            cmdline=lambda c: ".exe" in c.lower(),
+            env={"WINEPREFIX": lambda v: os.path.normpath(v) == self.prefix},
+            fields=("cmdline",),
+        ):
+            names.update(self.get_exe_names(proc.cmdline))
+        return names
+
+    def wait(
+        self, name: str, timeout: Optional[float] = None, cancel: Optional[Event] = None
+    ) -> bool:
+        """
+        Wait until no process of the prefix runs the named executable.
+        Returns False if the timeout expired or the cancel event was set.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            procs = self.find(name)
+            if not procs:
+                return True
+            pids = [int(proc.pid) for proc in procs]
+            if not self.__wait_exit(pids, deadline, cancel):
+                return False
+
+    def __wait_exit(
+        self, pids: List[int], deadline: Optional[float], cancel: Optional[Event]
+    ) -> bool:
+        fds = []
+        try:
+            for pid in pids:
+                try:
+                    fds.append(os.pidfd_open(pid))
+                except ProcessLookupError:
+                    continue
+                except (AttributeError, OSError):
+                    return self.__poll_exit(pids, deadline, cancel)
+
+            poller = select.poll()
+            for fd in fds:
+                poller.register(fd, select.POLLIN)
+
+            pending = len(fds)
+            while pending:
+                wait = self.__next_wait(deadline, cancel)
+                if wait == 0:
+                    return False
+                for fd, _event in poller.poll(None if wait is None else wait * 1000):
+                    poller.unregister(fd)
+                    pending -= 1
+            return True
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    def __poll_exit(
+        self, pids: List[int], deadline: Optional[float], cancel: Optional[Event]
+    ) -> bool:
+        """Fallback for kernels without pidfd_open."""
+        pending = [Proc(pid) for pid in pids]
+        while True:
+            pending = [proc for proc in pending if proc.get_state() not in ("", "Z")]
+            if not pending:
+                return True
+            wait = self.__next_wait(deadline, cancel)
+            if wait == 0:
+                return False
+            time.sleep(self.interval if wait is None else wait)
+
+    def __next_wait(
+        self, deadline: Optional[float], cancel: Optional[Event]
+    ) -> Optional[float]:
+        """
+        Seconds to block before checking again, 0 when we must stop, None to
+        block until something happens.
+        """
+        if cancel is not None and cancel.is_set():
+            return 0
+        if deadline is None:
+            return self.interval if cancel is not None else None
+        left = deadline - time.monotonic()
+        if left <= 0:
+            return 0
+        return min(left, self.interval) if cancel is not None else left
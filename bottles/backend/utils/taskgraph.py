@@ -0,0 +1,173 @@
+# taskgraph.py
+#
+# Copyright 2025 mirkobrombin <brombin94@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+StepCallback = Callable[["GraphStep", int], None]
+
+
+class GraphStep:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        after: Sequence[str],
+        description: str,
+    ):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.description = description
+        self.started = 0.0
+        self.finished = 0.0
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+class GraphReport:
+    """Timings of a TaskGraph run, times are from time.time()."""
+
+    def __init__(self, steps: Dict[str, GraphStep], started: float, finished: float):
+        self.steps = steps
+        self.started = started
+        self.finished = finished
+
+    def critical_path(self) -> List[GraphStep]:
+        """
+        The chain of steps that decided how long the run took: the last
+        step to finish, the dependency it waited for last, and so on.
+        """
+        done = [step for step in self.steps.values() if step.finished]
+        if not done:
+            return []
+        path = [max(done, key=lambda step: step.finished)]
+        while path[-1].after:
+            path.append(
+                max(
+                    (self.steps[name] for name in path[-1].after),
+                    key=lambda step: step.finished,
+                )
+            )
+        return path[::-1]
+
+    def __str__(self):
+        total = self.finished - self.started
+        path = self.critical_path()
+        lines = [f"critical path {sum(s.duration for s in path):.2f}s of {total:.2f}s"]
+        for step in path:
+            waited = step.started - self.started
+            lines.append(
+                f"\t - {step.name} took: {step.duration:.2f}s (started at {waited:.2f}s)"
+            )
+        return "\n".join(lines)
+
+
+class TaskGraph:
+    """
+    Run named steps on a bounded pool of threads, each one as soon as the
+    steps it comes after are done. Steps can only come after steps added
+    before them, so the graph can't have cycles. Steps start in the order
+    they were added when several are ready.
+
+    When a step raises, the running steps are waited for, no new step is
+    started and the exception is raised by run().
+    """
+
+    def __init__(self, workers: int = 4):
+        self.workers = workers
+        self.__steps: Dict[str, GraphStep] = {}
+
+    def __len__(self):
+        return len(self.__steps)
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        after: Sequence[str] = (),
+        description: str = "",
+    ):
+        if name in self.__steps:
+            raise ValueError(f"Step {name} is already in the graph")
+        unknown = [dep for dep in after if dep not in self.__steps]
+        if unknown:
+            raise ValueError(f"Step {name} comes after unknown steps: {unknown}")
+        self.__steps[name] = GraphStep(name, func, after, description or name)
+
+    def run(
+        self,
+        on_start: Optional[StepCallback] = None,
+        on_done: Optional[StepCallback] = None,
+    ) -> GraphReport:
+        """
+        Run every step and return their timings. The callbacks are called
+        from the calling thread, with the step and how many steps have
+        been started (on_start) or are done (on_done) so far.
+        """
+        steps = self.__steps
+        waiting = {name: set(step.after) for name, step in steps.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in steps}
+        for name, step in steps.items():
+            for dep in step.after:
+                dependents[dep].append(name)
+
+        ready = [name for name, deps in waiting.items() if not deps]
+        running: Dict[Future, str] = {}
+        error: Optional[BaseException] = None
+        started = done = 0
+        start = time.time()
+
+        workers = max(1, min(self.workers, len(steps)))
+        with ThreadPoolExecutor(workers) as pool:
+            while ready or running:
+                # only start what can run now, the rest stays ready in order
+                while ready and error is None and len(running) < workers:
+                    step = steps[ready.pop(0)]
+                    started += 1
+                    step.started = time.time()
+                    if on_start is not None:
+                        on_start(step, started)
+                    running[pool.submit(step.func)] = step.name
+                if not running:
+                    break
+
+                finished, _pending = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = steps[running.pop(future)]
+                    step.finished = time.time()
+                    try:
+                        step.result = future.result()
+                    except Exception as exception:
+                        step.error = exception
+                        error = error or exception
+                    done += 1
+                    if on_done is not None:
+                        on_done(step, done)
+                    for name in dependents[step.name]:
+                        waiting[name].discard(step.name)
+                        if not waiting[name]:
+                            ready.append(name)
+
+        if error is not None:
+            raise error
+        return GraphReport(steps, start, time.time())
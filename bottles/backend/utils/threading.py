@@ -15,11 +15,16 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import heapq
+import itertools
 import os
 import sys
 import threading
+import time
 import traceback
-from typing import Any
+from collections import deque
+from concurrent.futures import CancelledError
+from typing import Any, Callable, ClassVar, Deque, Dict, List, Optional, Tuple
 
 from gi.repository import GLib
 
@@ -28,10 +33,289 @@ from bottles.backend.logger import Logger
 logging = Logger()
 
 
-class RunAsync(threading.Thread):
+class Priority:
+    """Lower values run first: what the user is looking at comes first."""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class _Job:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+
+    def __init__(self, func: Callable[[], None], priority: int, key: Optional[str]):
+        self.func = func
+        self.priority = priority
+        self.key = key
+        self.state = _Job.QUEUED
+        self.in_queue = False
+        self.done = threading.Event()
+        self.submitted = time.monotonic()
+        self.started = 0.0
+
+
+class AsyncExecutor:
+    """
+    The shared pool running RunAsync jobs. At most `workers` jobs run at
+    once, the others wait in a priority queue, in submission order within
+    a priority. Jobs sharing a serial key (e.g. a bottle name) run one at
+    a time, in order. Workers are started on demand and exit when idle.
+
+    Jobs blocking for long (waiting for a program to exit) should use
+    their own thread with RunAsync(long_running=True). In case they
+    don't, the pool grows past its size while every worker has been busy
+    for `stall_after` seconds and jobs are waiting, up to `max_threads`.
+    """
+
+    idle_timeout = 30.0
+    stall_after = 2.0
+    slow_wait = 1.0
+
+    _instance: ClassVar[Optional["AsyncExecutor"]] = None
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, workers: int = 0, max_threads: int = 0):
+        self.workers = workers or min(16, (os.cpu_count() or 1) + 4)
+        self.max_threads = max(max_threads or self.workers * 4, self.workers)
+        self._lock = threading.Condition()
+        self._queue: List[Tuple[int, int, _Job]] = []
+        self._order = itertools.count()
+        self._keys: Dict[str, Deque[_Job]] = {}
+        self._running: Dict[int, _Job] = {}
+        self._threads = 0
+        self._idle = 0
+        self._rebalance_timer: Optional[threading.Timer] = None
+        self._local = threading.local()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "max_queued": 0,
+            "wait_time": 0.0,
+            "run_time": 0.0,
+        }
+
+    @classmethod
+    def get(cls) -> "AsyncExecutor":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def submit(self, job: _Job):
+        with self._lock:
+            self._stats["submitted"] += 1
+            if job.key is not None:
+                if job.key in self._keys:
+                    # another job of the key is queued or running
+                    self._keys[job.key].append(job)
+                    self.__update_depth()
+                    return
+                self._keys[job.key] = deque()
+            self.__push(job)
+
+    def cancel(self, job: _Job) -> bool:
+        """Drop a job which didn't start yet, returns whether it was dropped."""
+        with self._lock:
+            if job.state != _Job.QUEUED:
+                return False
+            job.state = _Job.CANCELLED
+            self._stats["cancelled"] += 1
+            self._lock.notify_all()
+            waiting = self._keys.get(job.key) if job.key is not None else None
+            if waiting is not None and job in waiting:
+                waiting.remove(job)
+            elif job.key is not None:
+                # it was the next job of its key, let the following one go
+                self.__release_key(job)
+        job.done.set()
+        return True
+
+    def is_worker(self) -> bool:
+        return getattr(self._local, "worker", False)
+
+    def run_inline(self, job: _Job, timeout: Optional[float] = None) -> bool:
+        """
+        Run a queued job in the calling thread, returns whether it did.
+        Used when a worker waits for a job it submitted, which could
+        otherwise wait for a free worker forever. The queued jobs of its
+        serial key go first, if one is running elsewhere this waits for
+        it, up to timeout. Raises RuntimeError if the calling thread runs
+        a job of the key itself, the job could never start.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if job.state != _Job.QUEUED:
+                    return False
+                if job.in_queue:
+                    target = job
+                elif job.key is None:
+                    target = None
+                else:
+                    running = getattr(self._local, "jobs", [])
+                    if any(other.key == job.key for other in running):
+                        raise RuntimeError(
+                            f"Cannot wait for a job of {job.key} from a job of it"
+                        )
+                    target = next(
+                        (
+                            queued
+                            for _priority, _order, queued in self._queue
+                            if queued.key == job.key
+                            and queued.in_queue
+                            and queued.state == _Job.QUEUED
+                        ),
+                        None,
+                    )
+                if target is None:
+                    # the job before it runs in another thread
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                    self._lock.wait(remaining)
+                    continue
+                target.state = _Job.RUNNING
+            self.__run(target)
+            if target is job:
+                return True
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, thread counts and average wait and run times."""
+        with self._lock:
+            completed = self._stats["completed"] or 1
+            return {
+                "queued": self.__depth(),
+                "running": len(self._running),
+                "threads": self._threads,
+                "idle": self._idle,
+                "submitted": self._stats["submitted"],
+                "completed": self._stats["completed"],
+                "cancelled": self._stats["cancelled"],
+                "max_queued": self._stats["max_queued"],
+                "avg_wait": self._stats["wait_time"] / completed,
+                "avg_run": self._stats["run_time"] / completed,
+            }
+
+    def __depth(self) -> int:
+        return len(self._queue) + sum(len(w) for w in self._keys.values())
+
+    def __update_depth(self):
+        self._stats["max_queued"] = max(self._stats["max_queued"], self.__depth())
+
+    def __push(self, job: _Job):
+        heapq.heappush(self._queue, (job.priority, next(self._order), job))
+        job.in_queue = True
+        self.__update_depth()
+        # an idle worker takes it, unless run_inline() waits for it
+        self._lock.notify_all()
+        if self._idle > 0:
+            return
+        if self._threads < self.workers:
+            self.__start_worker()
+        else:
+            self.__schedule_rebalance()
+
+    def __start_worker(self):
+        self._threads += 1
+        threading.Thread(target=self.__worker, daemon=True).start()
+
+    def __schedule_rebalance(self):
+        if self._rebalance_timer is not None:
+            return
+        self._rebalance_timer = threading.Timer(self.stall_after, self.__rebalance)
+        self._rebalance_timer.daemon = True
+        self._rebalance_timer.start()
+
+    def __rebalance(self):
+        with self._lock:
+            self._rebalance_timer = None
+            if not self._queue or self._idle > 0:
+                return
+            now = time.monotonic()
+            stalled = sum(
+                1
+                for job in self._running.values()
+                if now - job.started >= self.stall_after
+            )
+            limit = min(self.workers + stalled, self.max_threads)
+            for _i in range(min(len(self._queue), limit - self._threads)):
+                self.__start_worker()
+            if self._threads < self.max_threads:
+                self.__schedule_rebalance()
+
+    def __worker(self):
+        self._local.worker = True
+        while True:
+            with self._lock:
+                while not self._queue:
+                    self._idle += 1
+                    notified = self._lock.wait(self.idle_timeout)
+                    self._idle -= 1
+                    if not notified and not self._queue:
+                        self._threads -= 1
+                        return
+                _priority, _order, job = heapq.heappop(self._queue)
+                job.in_queue = False
+                if job.state != _Job.QUEUED:
+                    continue  # cancelled or run inline
+                job.state = _Job.RUNNING
+            self.__run(job)
+
+    def __run(self, job: _Job):
+        job.started = time.monotonic()
+        waited = job.started - job.submitted
+        if waited >= self.slow_wait:
+            logging.debug(f"Async job waited {waited:.1f}s in the queue.")
+        ident = threading.get_ident()
+        jobs = self._local.__dict__.setdefault("jobs", [])
+        jobs.append(job)
+        with self._lock:
+            self._running[ident] = job
+        try:
+            job.func()
+        finally:
+            jobs.pop()
+            with self._lock:
+                if jobs:
+                    # back to the job which ran this one inline
+                    self._running[ident] = jobs[-1]
+                else:
+                    self._running.pop(ident, None)
+                job.state = _Job.DONE
+                self._lock.notify_all()
+                self._stats["completed"] += 1
+                self._stats["wait_time"] += waited
+                self._stats["run_time"] += time.monotonic() - job.started
+                if job.key is not None:
+                    self.__release_key(job)
+            job.done.set()
+
+    def __release_key(self, job: _Job):
+        waiting = self._keys.get(job.key)
+        if waiting:
+            self.__push(waiting.popleft())
+        else:
+            self._keys.pop(job.key, None)
+
+
+class RunAsync:
     """
     This class is used to execute a function asynchronously.
     It takes a function, a callback and a list of arguments as input.
+
+    Jobs run in the shared AsyncExecutor. These keyword arguments are not
+    passed to the function:
+    - priority: a Priority, NORMAL by default
+    - serial_key: jobs with the same key run one at a time, in order
+    - long_running: run in a new thread, e.g. to wait for a program
+    - callback_in_main_loop: call the callback from the GLib main loop
     """
 
     def __init__(
@@ -53,24 +337,39 @@ class RunAsync(threading.Thread):
         )
 
         self._callback_in_main_loop = kwargs.pop("callback_in_main_loop", True)
-
-        super(RunAsync, self).__init__(target=self.__target, args=args, kwargs=kwargs)
+        priority = kwargs.pop("priority", Priority.NORMAL)
+        serial_key = kwargs.pop("serial_key", None)
+        long_running = kwargs.pop("long_running", False)
 
         self.task_func = task_func
-
         self.callback = callback if callback else lambda r, e: None
         self.daemon = daemon
         self.cancel_event = kwargs.get("cancel_event")
         self._cancel_requested = False
+        self._args = args
+        self._kwargs = kwargs
 
-        self.start()
+        self._executor = AsyncExecutor.get()
+        self._job = _Job(self.__target, priority, serial_key)
+        if long_running:
+            self._job.state = _Job.RUNNING
+            threading.Thread(target=self.__run_thread, daemon=daemon).start()
+        else:
+            self._executor.submit(self._job)
 
-    def __target(self, *args, **kwargs):
+    def __run_thread(self):
+        try:
+            self.__target()
+        finally:
+            self._job.state = _Job.DONE
+            self._job.done.set()
+
+    def __target(self):
         result = None
         error = None
 
         try:
-            result = self.task_func(*args, **kwargs)
+            result = self.task_func(*self._args, **self._kwargs)
         except Exception as exception:
             logging.error(
                 f"Error while running async job: {self.task_func}\n"
@@ -84,6 +383,9 @@ class RunAsync(threading.Thread):
 
             logging.write_log([str(exception), traceback_info])
 
+        self.__dispatch(result, error)
+
+    def __dispatch(self, result, error):
         def _dispatch_callback():
             try:
                 self.callback(result, error)
@@ -110,6 +412,22 @@ class RunAsync(threading.Thread):
         self._cancel_requested = True
         if self.cancel_event and hasattr(self.cancel_event, "set"):
             self.cancel_event.set()
+        if self._executor.cancel(self._job):
+            # it never ran, the callback still has to know
+            self.__dispatch(None, CancelledError())
+
+    def join(self, timeout: Optional[float] = None):
+        start = time.monotonic()
+        if self._executor.is_worker() and self._executor.run_inline(
+            self._job, timeout
+        ):
+            return
+        if timeout is not None:
+            timeout = max(0.0, timeout - (time.monotonic() - start))
+        self._job.done.wait(timeout)
+
+    def is_alive(self) -> bool:
+        return not self._job.done.is_set()
 
     @staticmethod
     def run_async(func):
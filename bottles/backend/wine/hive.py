@@ -0,0 +1,800 @@
+# hive.py
+#
+# Copyright 2025 mirkobrombin <brombin94@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import mmap
+import os
+import re
+import tempfile
+import time
+from threading import Lock
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from bottles.backend.logger import Logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from bottles.backend.wine.reg import RegItem
+
+logging = Logger()
+
+HIVE_FILES = ("system.reg", "user.reg", "userdef.reg")
+
+REG_NONE = 0
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_LINK = 6
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+REG_TYPES = {
+    "REG_NONE": REG_NONE,
+    "REG_SZ": REG_SZ,
+    "REG_EXPAND_SZ": REG_EXPAND_SZ,
+    "REG_BINARY": REG_BINARY,
+    "REG_DWORD": REG_DWORD,
+    "REG_MULTI_SZ": REG_MULTI_SZ,
+    "REG_QWORD": REG_QWORD,
+}
+
+# root keys as accepted by reg.exe, mapped to the hive file holding them
+# and the path of the root inside that file
+_ROOTS = {
+    "HKEY_LOCAL_MACHINE": ("system.reg", ""),
+    "HKLM": ("system.reg", ""),
+    "HKEY_CLASSES_ROOT": ("system.reg", "Software\\Classes"),
+    "HKCR": ("system.reg", "Software\\Classes"),
+    "HKEY_CURRENT_USER": ("user.reg", ""),
+    "HKCU": ("user.reg", ""),
+}
+_USERS_ROOTS = ("HKEY_USERS", "HKU")
+
+# 100ns ticks between 1601-01-01 (FILETIME) and 1970-01-01
+_TICKS_1601_TO_1970 = 116444736000000000
+
+# control characters wine writes as C escapes, see dump_strW in wine/server
+_ESCAPES = {7: "a", 8: "b", 9: "t", 10: "n", 11: "v", 12: "f", 13: "r", 27: "e"}
+_UNESCAPES = {v: chr(k) for k, v in _ESCAPES.items()}
+_OCTAL = "01234567"
+_HEX = "0123456789abcdefABCDEF"
+
+Payload = Union[str, int, bytes]
+
+
+def escape_string(text: str, delimiters: str = '""') -> str:
+    """
+    Escape a string the way wineserver does when saving a hive: control
+    characters become C or octal escapes, non-ASCII characters become \\x
+    escapes and backslashes and delimiters are backslash-escaped.
+    """
+    out = []
+    length = len(text)
+    for i, char in enumerate(text):
+        code = ord(char)
+        following = text[i + 1] if i + 1 < length else ""
+        if code > 127:
+            if following and ord(following) < 128 and following in _HEX:
+                out.append("\\x%04x" % code)
+            else:
+                out.append("\\x%x" % code)
+        elif code < 32:
+            if code in _ESCAPES:
+                out.append("\\" + _ESCAPES[code])
+            elif following and following in _OCTAL:
+                out.append("\\%03o" % code)
+            else:
+                out.append("\\%o" % code)
+        else:
+            if char == "\\" or char in delimiters:
+                out.append("\\")
+            out.append(char)
+    return "".join(out)
+
+
+def unescape_string(text: str) -> str:
+    """Reverse escape_string, following parse_strW in wine/server."""
+    if "\\" not in text:
+        return text
+    if "\\" not in text.replace("\\\\", ""):
+        # only escaped backslashes, as in most key paths
+        return text.replace("\\\\", "\\")
+
+    out = []
+    i = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        i += 1
+        if char != "\\" or i >= length:
+            out.append(char)
+            continue
+        char = text[i]
+        i += 1
+        if char in _UNESCAPES:
+            out.append(_UNESCAPES[char])
+        elif char == "x":
+            end = i
+            while end < length and end - i < 4 and text[end] in _HEX:
+                end += 1
+            if end == i:
+                out.append("x")
+            else:
+                out.append(chr(int(text[i:end], 16)))
+                i = end
+        elif char in _OCTAL:
+            end = i
+            while end < length and end - i < 2 and text[end] in _OCTAL:
+                end += 1
+            out.append(chr(int(text[i - 1 : end], 8)))
+            i = end
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+def find_closing(text: str, start: int, closing: str) -> int:
+    """Return the index of the first unescaped closing char after start."""
+    i = start
+    while True:
+        end = text.find(closing, i)
+        if end == -1:
+            return -1
+        backslash = text.find("\\", i, end)
+        if backslash == -1:
+            return end
+        i = backslash + 2
+
+
+def split_key(key: str) -> Tuple[str, str]:
+    """
+    Split a full registry key (as given to reg.exe) into the hive file
+    that stores it and the key path relative to the root of that file.
+    ---
+    raises: ValueError
+        If the key belongs to a root that is not stored in a hive file.
+    """
+    parts = [p for p in key.strip().strip("\\").split("\\") if p]
+    if not parts:
+        raise ValueError(f"Invalid registry key: {key}")
+
+    root = parts[0].upper()
+    if root in _ROOTS:
+        file_name, base = _ROOTS[root]
+        rest = parts[1:]
+    elif root in _USERS_ROOTS and len(parts) > 1 and parts[1] == ".Default":
+        file_name, base = "userdef.reg", ""
+        rest = parts[2:]
+    else:
+        raise ValueError(f"Unsupported registry root: {parts[0]}")
+
+    path = "\\".join(([base] if base else []) + rest)
+    return file_name, path
+
+
+def parse_type(value_type: Optional[str]) -> int:
+    """Map a reg.exe type name (REG_DWORD, dword, ...) to its number."""
+    name = (value_type or "REG_SZ").strip().upper()
+    if not name.startswith("REG_"):
+        name = f"REG_{name}"
+    if name not in REG_TYPES:
+        raise ValueError(f"Unsupported registry type: {value_type}")
+    return REG_TYPES[name]
+
+
+def encode_data(value_type: Optional[str], data: str) -> Tuple[int, Payload]:
+    """
+    Convert reg.exe style data to a typed payload: integers for dwords and
+    qwords (decimal or 0x prefixed), bytes for binary types (hex digits)
+    and strings otherwise, with \\0 separating REG_MULTI_SZ items.
+    ---
+    raises: ValueError
+        If the type is unsupported or the data does not match it.
+    """
+    reg_type = parse_type(value_type)
+    data = "" if data is None else str(data)
+
+    if reg_type in (REG_DWORD, REG_QWORD):
+        base = 16 if data[1:2].lower() == "x" else 10
+        number = int(data, base) if data else 0
+        limit = 0xFFFFFFFF if reg_type == REG_DWORD else 0xFFFFFFFFFFFFFFFF
+        if not 0 <= number <= limit:
+            raise ValueError(f"Value out of range for {value_type}: {data}")
+        return reg_type, number
+
+    if reg_type in (REG_BINARY, REG_NONE):
+        digits = data.replace(",", "").replace(" ", "")
+        if len(digits) % 2:
+            digits = f"0{digits}"
+        return reg_type, bytes.fromhex(digits)
+
+    if reg_type == REG_MULTI_SZ:
+        return reg_type, "\0".join(data.split("\\0")) + "\0"
+
+    return reg_type, data
+
+
+def _format_hex(prefix: str, data: bytes) -> str:
+    """Format binary data with wine's line wrapping, see dump_value."""
+    out = [prefix]
+    count = len(prefix)
+    last = len(data) - 1
+    for i, byte in enumerate(data):
+        out.append("%02x" % byte)
+        count += 2
+        if i < last:
+            out.append(",")
+            count += 1
+            if count > 76:
+                out.append("\\\n  ")
+                count = 2
+    return "".join(out)
+
+
+def format_value(name: str, reg_type: int, payload: Payload) -> str:
+    """Format a value line (without newline) as wineserver saves it."""
+    line = "@=" if not name else f'"{escape_string(name)}"='
+
+    if reg_type == REG_SZ:
+        return f'{line}"{escape_string(payload)}"'
+    if reg_type in (REG_EXPAND_SZ, REG_MULTI_SZ):
+        return f'{line}str({reg_type:x}):"{escape_string(payload)}"'
+    if reg_type == REG_DWORD:
+        return f"{line}dword:{payload:08x}"
+    if reg_type == REG_QWORD:
+        payload = payload.to_bytes(8, "little")
+    if reg_type == REG_BINARY:
+        return _format_hex(f"{line}hex:", payload)
+    return _format_hex(f"{line}hex({reg_type:x}):", payload)
+
+
+def decode_data(raw: str) -> Tuple[int, Payload]:
+    """
+    Decode the data part of a hive value line (everything after the '=')
+    into its type and payload.
+    """
+    raw = raw.strip()
+    if raw.startswith('"'):
+        return REG_SZ, unescape_string(raw[1 : find_closing(raw, 1, '"')])
+    if raw.startswith("str("):
+        reg_type = int(raw[4 : raw.index(")")], 16)
+        start = raw.index('"') + 1
+        return reg_type, unescape_string(raw[start : find_closing(raw, start, '"')])
+    if raw.startswith("dword:"):
+        return REG_DWORD, int(raw[6:14], 16)
+    if raw.startswith("hex"):
+        reg_type = REG_BINARY
+        if raw.startswith("hex("):
+            reg_type = int(raw[4 : raw.index(")")], 16)
+        digits = raw[raw.index(":") + 1 :]
+        for char in "\\\n\r ,":
+            digits = digits.replace(char, "")
+        payload = bytes.fromhex(digits)
+        if reg_type == REG_QWORD and len(payload) == 8:
+            return reg_type, int.from_bytes(payload, "little")
+        return reg_type, payload
+    raise ValueError(f"Unsupported registry data: {raw[:32]}")
+
+
+def _parse_name(line: str) -> Tuple[Optional[str], int]:
+    """
+    Return the unescaped value name of a value line and the index of the
+    '=' that follows it, or (None, -1) for any other line.
+    """
+    if line.startswith("@="):
+        return "", 1
+    if line.startswith('"'):
+        end = find_closing(line, 1, '"')
+        if end != -1 and line[end + 1 : end + 2] == "=":
+            return unescape_string(line[1:end]), end + 1
+    return None, -1
+
+
+def _link_target(root: str, payload: Payload, path: str) -> str:
+    """Turn the SymbolicLinkValue of a link key into a key path."""
+    target = payload.decode("utf-16-le").rstrip("\0")
+    prefix = f"\\REGISTRY{root}\\"
+    if not target.lower().startswith(prefix.lower()):
+        raise ValueError(f"Registry link leaves the hive: {path}")
+    return target[len(prefix) :]
+
+
+def _resolve_links(path: str, target_of: Callable[[str], Optional[str]]) -> str:
+    """Follow the link keys found along a key path."""
+    resolved: List[str] = []
+    hops = 0
+    for part in [p for p in path.split("\\") if p]:
+        resolved.append(part)
+        target = target_of("\\".join(resolved))
+        while target is not None:
+            hops += 1
+            if hops > 16:
+                raise ValueError(f"Too many registry links in: {path}")
+            resolved = [p for p in target.split("\\") if p]
+            target = target_of(target)
+    return "\\".join(resolved)
+
+
+class _Section:
+    """A [key] section of a hive file, kept as raw text."""
+
+    __slots__ = ("path", "name", "timestamp", "entries", "named")
+
+    def __init__(self, path: str, name: str, timestamp: str, named: bool = False):
+        self.path = path
+        self.name = name  # escaped path, as written in the file
+        self.timestamp = timestamp  # anything after the closing bracket
+        # [lowercase value name or None, raw text including newline], the
+        # names are only parsed once the section is looked into
+        self.entries: List[List] = []
+        self.named = named
+
+    def dump(self) -> str:
+        return f"[{self.name}]{self.timestamp}" + "".join(e[1] for e in self.entries)
+
+    def find(self, name: str) -> int:
+        if not self.named:
+            for entry in self.entries:
+                value, _ = _parse_name(entry[1])
+                entry[0] = None if value is None else value.lower()
+            self.named = True
+
+        name = name.lower()
+        for i, entry in enumerate(self.entries):
+            if entry[0] == name:
+                return i
+        return -1
+
+    def insert_index(self) -> int:
+        """Index after the last non-blank entry, before the separator."""
+        index = len(self.entries)
+        while index and not self.entries[index - 1][1].strip():
+            index -= 1
+        return index
+
+    def touch(self, now: float):
+        self.timestamp = f" {int(now)}\n"
+        ticks = "#time=%x\n" % (int(now * 10000000) + _TICKS_1601_TO_1970)
+        for entry in self.entries:
+            if entry[1].startswith("#time="):
+                entry[1] = ticks
+                return
+        self.entries.insert(0, [None, ticks])
+
+
+class RegistryHive:
+    """
+    Text preserving editor for a hive file (system.reg, user.reg,
+    userdef.reg) of a wine prefix. Untouched keys are written back byte
+    for byte, edited keys get wine's value format and a new timestamp.
+    The wineserver of the prefix must not be running, or it will overwrite
+    the edits with its own copy of the registry on exit.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.modified = False
+        self.header: List[str] = []
+        self.sections: List[_Section] = []
+        self.__index: Dict[str, _Section] = {}
+
+        with open(path, encoding="utf-8", errors="surrogateescape", newline="") as f:
+            st = os.fstat(f.fileno())
+            text = f.read()
+        self.__stat = (st.st_mtime_ns, st.st_size)
+        self.__parse(text)
+
+    def __parse(self, text: str):
+        lines = [line + "\n" for line in text.split("\n")]
+        lines[-1] = lines[-1][:-1]
+        if not lines[-1]:
+            lines.pop()
+
+        section: Optional[_Section] = None
+        continued = False
+        for line in lines:
+            if continued:
+                section.entries[-1][1] += line
+                continued = line.rstrip("\r\n").endswith("\\")
+                continue
+
+            if line.startswith("["):
+                end = find_closing(line, 1, "]")
+                if end != -1:
+                    name = line[1:end]
+                    section = _Section(unescape_string(name), name, line[end + 1 :])
+                    self.sections.append(section)
+                    self.__index.setdefault(section.path.lower(), section)
+                    continue
+
+            if section is None:
+                self.header.append(line)
+                continue
+
+            # only hex data is wrapped over several lines
+            section.entries.append([None, line])
+            continued = line.rstrip("\r\n").endswith("\\")
+
+        if not self.header or not self.header[0].startswith("WINE REGISTRY"):
+            raise ValueError(f"Not a wine registry file: {self.path}")
+
+    @property
+    def root(self) -> str:
+        """The root of the file, e.g. \\Machine or \\User\\S-1-5-..."""
+        for line in self.header:
+            if line.startswith(";; All keys relative to "):
+                return unescape_string(line[24:].strip())
+        return ""
+
+    def dump(self) -> str:
+        return "".join(self.header) + "".join(s.dump() for s in self.sections)
+
+    def get_section(self, path: str) -> Optional[_Section]:
+        return self.__index.get(path.lower())
+
+    def get_value(self, path: str, name: str) -> Optional[Tuple[int, Payload]]:
+        """Return the type and payload of a value, if it exists."""
+        section = self.get_section(self.resolve(path))
+        if section is None:
+            return None
+        index = section.find(name)
+        if index == -1:
+            return None
+        raw = section.entries[index][1]
+        return decode_data(raw[_parse_name(raw)[1] + 1 :])
+
+    def resolve(self, path: str) -> str:
+        """Follow registry links (e.g. CurrentControlSet) along a key path."""
+        return _resolve_links(path, self.__link_target_of)
+
+    def __link_target_of(self, path: str) -> Optional[str]:
+        section = self.get_section(path)
+        if section is None:
+            return None
+        if not any(e[1].startswith("#link") for e in section.entries):
+            return None
+        index = section.find("SymbolicLinkValue")
+        if index == -1:
+            return None
+        raw = section.entries[index][1]
+        _, payload = decode_data(raw[_parse_name(raw)[1] + 1 :])
+        return _link_target(self.root, payload, path)
+
+    def set_value(self, path: str, name: str, line: str, now: float) -> bool:
+        """
+        Set a value of a resolved key path to the given formatted line,
+        creating the key if needed. Return whether the file changed.
+        """
+        line = f"{line}\n"
+        section = self.get_section(path)
+        if section is None:
+            if self.sections:
+                # keep the blank line wine puts between sections
+                entries = self.sections[-1].entries
+                if entries and not entries[-1][1].endswith("\n"):
+                    entries[-1][1] += "\n"
+                if not entries or entries[-1][1].strip():
+                    entries.append([None, "\n"])
+            section = _Section(path, escape_string(path, "[]"), "", named=True)
+            self.sections.append(section)
+            self.__index[path.lower()] = section
+
+        index = section.find(name)
+        if index != -1:
+            if section.entries[index][1] == line:
+                return False
+            section.entries[index][1] = line
+        else:
+            index = section.insert_index()
+            if index and not section.entries[index - 1][1].endswith("\n"):
+                section.entries[index - 1][1] += "\n"
+            section.entries.insert(index, [name.lower(), line])
+
+        section.touch(now)
+        self.modified = True
+        return True
+
+    def delete_value(self, path: str, name: str, now: float) -> bool:
+        """Delete a value of a resolved key path. Return whether it existed."""
+        section = self.get_section(path)
+        index = -1 if section is None else section.find(name)
+        if index == -1:
+            return False
+        del section.entries[index]
+        section.touch(now)
+        self.modified = True
+        return True
+
+    def save(self):
+        """
+        Atomically replace the hive file, refusing to do so if it was
+        changed on disk since it was read.
+        """
+        st = os.stat(self.path)
+        if (st.st_mtime_ns, st.st_size) != self.__stat:
+            raise OSError(f"Registry file changed while editing: {self.path}")
+
+        directory = os.path.dirname(self.path)
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix=".reg-")
+        try:
+            with os.fdopen(
+                fd, "w", encoding="utf-8", errors="surrogateescape", newline=""
+            ) as f:
+                f.write(self.dump())
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(temporary, st.st_mode & 0o7777)
+            os.replace(temporary, self.path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+        st = os.stat(self.path)
+        self.__stat = (st.st_mtime_ns, st.st_size)
+        self.modified = False
+
+
+def apply_edits(prefix: str, edits: Iterable["RegItem"]) -> int:
+    """
+    Apply RegItem edits (data None deletes the value) directly to the hive
+    files of a prefix whose wineserver is not running. Every edit is
+    validated before any file is written. Return the number of edits that
+    changed something.
+    ---
+    raises: ValueError, OSError
+        If an edit cannot be expressed in the hive files or a file cannot
+        be read or written; nothing is written for ValueErrors.
+    """
+    hives: Dict[str, RegistryHive] = {}
+    planned = []
+
+    for item in edits:
+        file_name, path = split_key(item.key)
+        if file_name not in hives:
+            hives[file_name] = RegistryHive(os.path.join(prefix, file_name))
+        hive = hives[file_name]
+        path = hive.resolve(path)
+        name = item.value or ""
+
+        if item.data is None:
+            planned.append((hive, path, name, None))
+        else:
+            reg_type, payload = encode_data(item.value_type, item.data)
+            planned.append((hive, path, name, format_value(name, reg_type, payload)))
+
+    now = time.time()
+    changed = 0
+    for hive, path, name, line in planned:
+        if line is None:
+            changed += hive.delete_value(path, name, now)
+        else:
+            changed += hive.set_value(path, name, line, now)
+
+    for hive in hives.values():
+        if hive.modified:
+            hive.save()
+
+    logging.info(f"Applied {changed} registry edit(s) to the hives of {prefix}")
+    return changed
+
+
+# the header is never empty, so every [key] line follows a newline
+_SECTION_HEADER = re.compile(rb"\n\[([^\n]*)")
+
+
+class HiveIndex:
+    """
+    Read-only view of a hive file. The file is memory-mapped and only the
+    [key] header lines are decoded, into an index of section offsets, the
+    values of a key are parsed the first time they are asked for.
+    Use HiveIndex.open to share indexes until the file changes on disk.
+    """
+
+    _cache: ClassVar[Dict[str, "HiveIndex"]] = {}
+    _cache_lock: ClassVar[Lock] = Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self.__sections: Dict[str, Tuple[str, int, int]] = {}
+        self.__values: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        self.__links: Set[str] = set()
+        self.__children: Optional[Dict[str, Dict[str, str]]] = None
+        self.__map: Union[mmap.mmap, bytes] = b""
+
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_size:
+                self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.stat = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+        headers = []
+        for match in _SECTION_HEADER.finditer(self.__map):
+            line = match.group(1).decode("utf-8", "surrogateescape")
+            # the timestamp after the key never holds a bracket
+            end = line.rfind("]")
+            if end != -1:
+                # body starts after the newline ending the header line
+                headers.append((line[:end], match.start() + 1, match.end() + 1))
+        ends = [start for _, start, _ in headers[1:]] + [len(self.__map)]
+        for (name, _, start), end in zip(headers, ends):
+            key = unescape_string(name)
+            self.__sections.setdefault(key.lower(), (key, start, end))
+
+        header_end = headers[0][1] if headers else len(self.__map)
+        header = self.__map[:header_end].decode("utf-8", "surrogateescape")
+        if not header.startswith("WINE REGISTRY"):
+            raise ValueError(f"Not a wine registry file: {path}")
+        self.root = ""
+        for line in header.splitlines():
+            if line.startswith(";; All keys relative to "):
+                self.root = unescape_string(line[24:].strip())
+
+    @classmethod
+    def open(cls, path: str) -> "HiveIndex":
+        """
+        Return the index of a hive file, reusing the cached one while the
+        file keeps the same mtime, size and inode.
+        ---
+        raises: OSError, ValueError
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with cls._cache_lock:
+            index = cls._cache.get(path)
+            if index is not None and index.stat == key:
+                return index
+
+        index = cls(path)
+        with cls._cache_lock:
+            cls._cache[path] = index
+        return index
+
+    @classmethod
+    def cache_clear(cls):
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self.__sections)
+
+    def __section_values(self, path: str) -> Optional[Dict[str, Tuple[str, str]]]:
+        """Lowercase value names mapped to their name and raw data."""
+        lower = path.lower()
+        values = self.__values.get(lower)
+        if values is not None:
+            return values
+        section = self.__sections.get(lower)
+        if section is None:
+            return None
+
+        _, start, end = section
+        body = self.__map[start:end].decode("utf-8", "surrogateescape")
+        values = {}
+        line = ""
+        for part in body.split("\n"):
+            line += part
+            if line.endswith("\\"):
+                # hex data wrapped over several lines
+                line = line[:-1]
+                continue
+            if line.startswith("#link"):
+                self.__links.add(lower)
+            name, equal = _parse_name(line)
+            if name is not None:
+                values[name.lower()] = (name, line[equal + 1 :])
+            line = ""
+
+        self.__values[lower] = values
+        return values
+
+    def __link_target_of(self, path: str) -> Optional[str]:
+        values = self.__section_values(path)
+        if not values or path.lower() not in self.__links:
+            return None
+        link = values.get("symboliclinkvalue")
+        if link is None:
+            return None
+        return _link_target(self.root, decode_data(link[1])[1], path)
+
+    def resolve(self, path: str) -> str:
+        """Follow registry links (e.g. CurrentControlSet) along a key path."""
+        return _resolve_links(path, self.__link_target_of)
+
+    def has_key(self, path: str) -> bool:
+        path = self.resolve(path)
+        return path.lower() in self.__sections or bool(self.list_subkeys(path))
+
+    def get_value(self, path: str, name: str) -> Optional[Tuple[int, Payload]]:
+        """Return the type and payload of a value, if it exists."""
+        values = self.__section_values(self.resolve(path))
+        value = None if values is None else values.get((name or "").lower())
+        if value is None:
+            return None
+        return decode_data(value[1])
+
+    def get_values(self, path: str) -> Dict[str, Tuple[int, Payload]]:
+        """Return every value of a key, by name."""
+        values = self.__section_values(self.resolve(path)) or {}
+        return {name: decode_data(data) for name, data in values.values()}
+
+    def list_subkeys(self, path: str) -> List[str]:
+        """Return the names of the direct subkeys of a key."""
+        if self.__children is None:
+            children: Dict[str, Dict[str, str]] = {}
+            for full, _, _ in self.__sections.values():
+                parts = full.split("\\")
+                for depth in range(len(parts)):
+                    parent = "\\".join(parts[:depth]).lower()
+                    children.setdefault(parent, {}).setdefault(
+                        parts[depth].lower(), parts[depth]
+                    )
+            self.__children = children
+
+        path = self.resolve(path).lower()
+        return sorted(self.__children.get(path, {}).values(), key=str.lower)
+
+
+class HiveReader:
+    """
+    Read registry values of a prefix through the HiveIndex of its hive
+    files, using full key names as given to reg.exe. The hive files are
+    only as recent as the last time the wineserver saved them.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+
+    def __locate(self, key: str) -> Optional[Tuple[HiveIndex, str]]:
+        try:
+            file_name, path = split_key(key)
+            index = HiveIndex.open(os.path.join(self.prefix, file_name))
+        except (OSError, ValueError):
+            return None
+        return index, path
+
+    def get_value(self, key: str, name: str) -> Optional[Tuple[int, Payload]]:
+        located = self.__locate(key)
+        if located is None:
+            return None
+        index, path = located
+        return index.get_value(path, name)
+
+    def get_values(self, key: str) -> Dict[str, Tuple[int, Payload]]:
+        located = self.__locate(key)
+        if located is None:
+            return {}
+        index, path = located
+        return index.get_values(path)
+
+    def list_subkeys(self, key: str) -> List[str]:
+        located = self.__locate(key)
+        if located is None:
+            return []
+        index, path = located
+        return index.list_subkeys(path)
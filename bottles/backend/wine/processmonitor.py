@@ -0,0 +1,158 @@
+# processmonitor.py
+#
+# Copyright 2025 mirkobrombin <brombin94@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import itertools
+import threading
+from typing import Callable, ClassVar, Dict, List, Optional, Set, Tuple
+
+from bottles.backend.logger import Logger
+from bottles.backend.models.config import BottleConfig
+from bottles.backend.models.result import Result
+from bottles.backend.state import SignalManager, Signals
+from bottles.backend.utils.manager import ManagerUtils
+from bottles.backend.wine.winedbg import WineDbg
+
+logging = Logger()
+
+StatusHandler = Callable[[bool], None]
+Subscription = Tuple[str, int]
+
+
+class ProcessMonitor:
+    """
+    Tell the widgets of a bottle when their executable starts or exits.
+    Instead of every program row polling on its own, a single thread per
+    bottle samples the running executables (one pass over /proc, or one
+    winedbg call for sandboxed bottles) and notifies the subscribers of
+    the names whose state changed. Changes are also sent as
+    Signals.ProcessStatusChanged. The thread stops with the last
+    subscriber.
+    """
+
+    interval = 1.0
+
+    _monitors: ClassVar[Dict[str, "ProcessMonitor"]] = {}
+    _monitors_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, config: BottleConfig):
+        self.config = config
+        self.probes = 0
+        self._winedbg = WineDbg(config)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._ids = itertools.count()
+        self._subscribers: Dict[str, Dict[int, StatusHandler]] = {}
+        self._states: Dict[str, bool] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def get(cls, config: BottleConfig) -> "ProcessMonitor":
+        """The monitor of the bottle, shared by all its widgets."""
+        if config.Environment == "Steam":
+            key = config.Path
+        else:
+            key = ManagerUtils.get_bottle_path(config)
+        with cls._monitors_lock:
+            monitor = cls._monitors.get(key)
+            if monitor is None:
+                monitor = cls._monitors[key] = cls(config)
+            return monitor
+
+    @staticmethod
+    def __key(name: str) -> str:
+        return name.replace("\\", "/").rsplit("/", 1)[-1].lower()
+
+    def subscribe(self, name: str, handler: StatusHandler) -> Subscription:
+        """
+        Call handler(running) from the monitor thread when the executable
+        starts or exits, and once with its current state. Returns the
+        subscription to pass to unsubscribe.
+        """
+        key = self.__key(name)
+        with self._lock:
+            ident = next(self._ids)
+            self._subscribers.setdefault(key, {})[ident] = handler
+            state = self._states.get(key)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.__run, daemon=True)
+                self._thread.start()
+        if state is None:
+            self._wake.set()  # sample now, not at the next interval
+        else:
+            self.__notify(handler, state)
+        return key, ident
+
+    def unsubscribe(self, subscription: Subscription):
+        key, ident = subscription
+        with self._lock:
+            handlers = self._subscribers.get(key)
+            if handlers is None:
+                return
+            handlers.pop(ident, None)
+            if not handlers:
+                del self._subscribers[key]
+                self._states.pop(key, None)
+        self._wake.set()
+
+    def is_running(self, name: str) -> Optional[bool]:
+        """The last known state of a subscribed executable, None if unknown."""
+        with self._lock:
+            return self._states.get(self.__key(name))
+
+    def __sample(self) -> Optional[Set[str]]:
+        self.probes += 1
+        try:
+            return self._winedbg.get_running()
+        except Exception as e:
+            logging.debug(f"Failed to list the processes of {self.config.Name}: {e}")
+            return None
+
+    def __run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            self._wake.clear()
+            running = self.__sample()
+            changes: List[Tuple[str, bool, List[StatusHandler]]] = []
+            with self._lock:
+                if running is not None:
+                    for key, handlers in self._subscribers.items():
+                        state = key in running or f"{key}.exe" in running
+                        if self._states.get(key) != state:
+                            self._states[key] = state
+                            changes.append((key, state, list(handlers.values())))
+
+            for key, state, handlers in changes:
+                for handler in handlers:
+                    self.__notify(handler, state)
+                SignalManager.send(
+                    Signals.ProcessStatusChanged,
+                    Result(
+                        status=state, data={"bottle": self.config.Name, "name": key}
+                    ),
+                )
+
+            self._wake.wait(self.interval)
+
+    @staticmethod
+    def __notify(handler: StatusHandler, state: bool):
+        try:
+            handler(state)
+        except Exception as e:
+            logging.error(f"Error in process status handler {handler}: {e}")
@@ -2,18 +2,20 @@ import codecs
 import contextlib
 import dataclasses
 import os
-import uuid
 from datetime import datetime
 from itertools import groupby
-from typing import List, Dict, Optional
+from threading import local
+from typing import ClassVar, Iterator, List, Optional
 
 from bottles.backend.globals import Paths
 from bottles.backend.logger import Logger
 from bottles.backend.models.result import Result
 from bottles.backend.utils.generic import random_string
 from bottles.backend.utils.manager import ManagerUtils
+from bottles.backend.wine import hive
 from bottles.backend.wine.winedbg import WineDbg
 from bottles.backend.wine.wineprogram import WineProgram
+from bottles.backend.wine.wineserver import WineServer
 
 logging = Logger()
 
@@ -23,39 +25,51 @@ class RegItem:
     key: str
     value: str
     value_type: str
-    data: str
+    data: Optional[str]  # None deletes the value
+
+
+def _escape_regedit(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _unescape_regedit(text: str) -> str:
+    out = []
+    chars = iter(text)
+    for char in chars:
+        if char != "\\":
+            out.append(char)
+            continue
+        char = next(chars, "")
+        out.append({"n": "\n", "r": "\r", "0": "\0"}.get(char, char))
+    return "".join(out)
 
 
 class Reg(WineProgram):
     program = "Wine Registry CLI"
     command = "reg"
 
-    def bulk_add(self, regs: List[RegItem]):
+    _batches: ClassVar[local] = local()
+
+    def bulk_add(self, regs: List[RegItem]) -> Result:
         """Import multiple registries at once, with v5.00 reg file"""
         config = self.config
         logging.info(f"Importing {len(regs)} Key(s) to {config.Name} registry")
         winedbg = WineDbg(config)
 
-        mapping: Dict[str, List[RegItem]] = {
-            k: list(v) for k, v in groupby(regs, lambda x: x.key)
-        }
+        mapping = [(k, list(v)) for k, v in groupby(regs, lambda x: x.key)]
         reg_file_header = "Windows Registry Editor Version 5.00\n\n"
         reg_key_header = "[%s]\n"
-        reg_item_fmt = '"%s"="%s:%s"\n'
-        reg_item_def_fmt = '"%s"="%s"\n'  # default is REG_SZ(string)
 
         file_content = reg_file_header
-        for key, items in mapping.items():
+        for key, items in mapping:
             file_content += reg_key_header % key
             for item in items:
-                if item.value_type:
-                    file_content += reg_item_fmt % (
-                        item.value,
-                        item.value_type,
-                        item.data,
-                    )
-                else:
-                    file_content += reg_item_def_fmt % (item.value, item.data)
+                file_content += self.__format_import_line(item)
             file_content += "\n"
 
         tmp_reg_filepath = os.path.join(
@@ -76,79 +90,230 @@ class Reg(WineProgram):
         )
         logging.info(res.data)
 
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_reg_filepath)
+        return res
+
+    @staticmethod
+    def __format_import_line(item: RegItem) -> str:
+        """Format a RegItem as a value line of a v5.00 reg file."""
+        name = f'"{_escape_regedit(item.value)}"' if item.value else "@"
+        if item.data is None:
+            return f"{name}=-\n"
+
+        reg_type, payload = hive.encode_data(item.value_type, item.data)
+        if reg_type == hive.REG_SZ:
+            return f'{name}="{_escape_regedit(payload)}"\n'
+        if reg_type == hive.REG_DWORD:
+            return f"{name}=dword:{payload:08x}\n"
+        if reg_type == hive.REG_QWORD:
+            payload = payload.to_bytes(8, "little")
+        elif isinstance(payload, str):
+            payload = f"{payload}\0".encode("utf-16le")
+
+        prefix = "hex:" if reg_type == hive.REG_BINARY else f"hex({reg_type:x}):"
+        return f"{name}={prefix}{','.join('%02x' % b for b in payload)}\n"
+
+    @staticmethod
+    def parse_import(text: str) -> List[RegItem]:
+        """
+        Parse the content of a REGEDIT4 or v5.00 reg file into RegItems,
+        deleted values get None as data.
+        ---
+        raises: ValueError
+            If the file deletes whole keys or uses types RegItem can't hold.
+        """
+        header = text.lstrip("\ufeff \r\n").lower()
+        wide = header.startswith("windows registry editor")
+        items: List[RegItem] = []
+        key = None
+        pending = ""
+
+        for line in text.splitlines():
+            line = pending + line.strip() if pending else line.strip("\ufeff \t")
+            pending = ""
+            if not line or line.startswith(";"):
+                continue
+            if "=hex" in line and line.endswith("\\"):
+                pending = line[:-1]
+                continue
+            if line.upper() == "REGEDIT4" or line.startswith("Windows Registry"):
+                continue
+            if line.startswith("[-"):
+                raise ValueError(f"Key deletion is not supported: {line}")
+            if line.startswith("["):
+                key = line[1 : line.rindex("]")]
+                continue
+            if key is None:
+                raise ValueError(f"Value outside of a key: {line}")
+
+            if line.startswith("@="):
+                name, data = "", line[2:]
+            elif line.startswith('"'):
+                end = hive.find_closing(line, 1, '"')
+                if end == -1 or line[end + 1 : end + 2] != "=":
+                    raise ValueError(f"Invalid value line: {line}")
+                name, data = _unescape_regedit(line[1:end]), line[end + 2 :].strip()
+            else:
+                raise ValueError(f"Invalid value line: {line}")
+
+            items.append(Reg.__parse_import_data(key, name, data, wide))
+
+        return items
+
+    @staticmethod
+    def __parse_import_data(key: str, name: str, data: str, wide: bool) -> RegItem:
+        if data == "-":
+            return RegItem(key, name, "", None)
+        if data.startswith('"') and data.endswith('"') and len(data) > 1:
+            return RegItem(key, name, "REG_SZ", _unescape_regedit(data[1:-1]))
+        if data.lower().startswith("dword:"):
+            return RegItem(key, name, "REG_DWORD", f"0x{data[6:]}")
+
+        reg_type, payload = hive.decode_data(data.lower())
+        if reg_type in (hive.REG_BINARY, hive.REG_NONE):
+            value_type = "REG_BINARY" if reg_type else "REG_NONE"
+            return RegItem(key, name, value_type, payload.hex())
+        if reg_type == hive.REG_QWORD and isinstance(payload, int):
+            return RegItem(key, name, "REG_QWORD", hex(payload))
+        if reg_type == hive.REG_DWORD and len(payload) == 4:
+            number = int.from_bytes(payload, "little")
+            return RegItem(key, name, "REG_DWORD", hex(number))
+        if reg_type in (hive.REG_SZ, hive.REG_EXPAND_SZ, hive.REG_MULTI_SZ):
+            text = payload.decode("utf-16le" if wide else "latin-1").rstrip("\0")
+            if reg_type == hive.REG_MULTI_SZ:
+                return RegItem(key, name, "REG_MULTI_SZ", text.replace("\0", "\\0"))
+            value_type = "REG_SZ" if reg_type == hive.REG_SZ else "REG_EXPAND_SZ"
+            return RegItem(key, name, value_type, text)
+        raise ValueError(f"Unsupported value in reg file: {data[:32]}")
+
+    def __get_prefix(self) -> str:
+        if self.config.Environment == "Steam":
+            return self.config.Path
+        return ManagerUtils.get_bottle_path(self.config)
+
+    def __get_queue(self) -> Optional[List[RegItem]]:
+        batches = self._batches.__dict__.setdefault("batches", {})
+        return batches.get(self.__get_prefix())
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator["Reg"]:
+        """
+        Queue every add/remove call made for the bottle by the current
+        thread inside the block, from any Reg instance, and apply them
+        together when the block exits. Nested blocks are applied by the
+        outermost one.
+        """
+        batches = self._batches.__dict__.setdefault("batches", {})
+        prefix = self.__get_prefix()
+
+        if prefix in batches:
+            yield self
+            return
+
+        batches[prefix] = []
+        try:
+            yield self
+        finally:
+            regs = batches.pop(prefix)
+            self.apply(regs)
+
+    def flush(self):
+        """Apply the edits queued so far by the current batch."""
+        queue = self.__get_queue()
+        if queue:
+            regs = queue[:]
+            queue.clear()
+            self.apply(regs)
+
+    def apply(self, regs: List[RegItem]) -> Result:
+        """
+        Apply a list of edits in one go. If the wineserver of the bottle is
+        not running they are written straight to the hive files, otherwise
+        (or if that fails) they are imported with a single reg.exe call.
+        """
+        if not regs:
+            return Result(status=True)
+
+        if not WineServer(self.config).is_alive():
+            try:
+                changed = hive.apply_edits(self.__get_prefix(), regs)
+                return Result(status=True, data=changed)
+            except (OSError, ValueError) as error:
+                logging.warning(f"Falling back to reg.exe for the registry: {error}")
+
+        return self.bulk_add(regs)
+
+    def __submit(self, item: RegItem) -> Optional[Result]:
+        if item.data is not None:
+            try:
+                hive.encode_data(item.value_type, item.data)
+            except ValueError as error:
+                logging.error(f"Invalid registry value [{item.value}]: {error}")
+                return Result(status=False, message=str(error))
+
+        queue = self.__get_queue()
+        if queue is not None:
+            queue.append(item)
+            return None
+        return self.apply([item])
+
     def add(self, key: str, value: str, data: str, value_type: Optional[str] = None):
         config = self.config
         logging.info(
             f"Adding Key: [{key}] with Value: [{value}] and "
             f"Data: [{data}] in {config.Name} registry"
         )
-        winedbg = WineDbg(config)
-        args = "add '%s' /v '%s' /d '%s' /f" % (key, value, data)
-
-        if value_type is not None:
-            args = "add '%s' /v '%s' /t %s /d '%s' /f" % (key, value, value_type, data)
-
-        # avoid conflicts when executing async
-        winedbg.wait_for_process("reg.exe")
-
-        res = self.launch(args, communicate=True, minimal=True, action_name="add")
-        logging.info(res.data)
+        data = "" if data is None else data
+        return self.__submit(RegItem(key, value, value_type or "", data))
 
     def remove(self, key: str, value: str):
         """Remove a key from the registry"""
         config = self.config
         logging.info(
-            f"Removing Value: [{key}] from Key: [{value}] in " f"{config.Name} registry"
+            f"Removing Value: [{key}] from Key: [{value}] in {config.Name} registry"
         )
-        winedbg = WineDbg(config)
-        args = "delete '%s' /v %s /f" % (key, value)
-
-        # avoid conflicts when executing async
-        winedbg.wait_for_process("reg.exe")
-
-        res = self.launch(args, communicate=True, minimal=True, action_name="remove")
-        logging.info(res.data)
+        return self.__submit(RegItem(key, value, "", None))
 
     def import_bundle(self, bundle: dict) -> Result:
         """Import a bundle of keys into the registry"""
         config = self.config
         logging.info(f"Importing bundle to {config.Name} registry")
-        winedbg = WineDbg(config)
-        reg_file = ManagerUtils.get_temp_path(f"{uuid.uuid4()}.reg")
-
-        try:
-            # prepare reg file
-            with open(reg_file, "w") as f:
-                f.write("REGEDIT4\n\n")
-
-                for key in bundle:
-                    f.write(f"[{key}]\n")
-
-                    for value in bundle[key]:
-                        if value["data"] == "-":
-                            f.write(f'"{value["value"]}"=-\n')
-                        elif "key_type" in value:
-                            f.write(
-                                f'"{value["value"]}"={value["key_type"]}:{value["data"]}\n'
-                            )
-                        else:
-                            f.write(f'"{value["value"]}"="{value["data"]}"\n')
 
-                    f.write("\n")
+        regs = []
+        for key in bundle:
+            for value in bundle[key]:
+                if value["data"] == "-":
+                    regs.append(RegItem(key, value["value"], "", None))
+                elif "key_type" in value:
+                    # bundles use the reg file syntax, dwords are hexadecimal
+                    data = value["data"]
+                    if value["key_type"].lower() in ("dword", "qword"):
+                        data = f"0x{data}"
+                    regs.append(RegItem(key, value["value"], value["key_type"], data))
+                else:
+                    regs.append(RegItem(key, value["value"], "", value["data"]))
 
-            args = f"import {reg_file}"
+        valid = []
+        for reg in regs:
+            try:
+                if reg.data is not None:
+                    hive.encode_data(reg.value_type, reg.data)
+            except ValueError as error:
+                logging.warning(f"Skipping [{reg.key}] {reg.value}: {error}")
+                continue
+            valid.append(reg)
+        regs = valid
 
-            # avoid conflicts when executing async
-            winedbg.wait_for_process("reg.exe")
+        queue = self.__get_queue()
+        if queue is not None:
+            queue.extend(regs)
+            return Result(status=True)
 
-            res = self.launch(
-                args, communicate=True, minimal=True, action_name="import_bundle"
-            )
+        try:
+            res = self.apply(regs)
             logging.info(f"Import bundle result: '{res.data}'")
             return res
         except OSError as error:
             logging.warning(f"Failed to import registry bundle: {error}")
             return Result(False, message=str(error))
-        finally:
-            with contextlib.suppress(FileNotFoundError):
-                os.remove(reg_file)
@@ -68,14 +68,6 @@ class RegKeys:
             "HKEY_LOCAL_MACHINE\\System\\CurrentControlSet\\Control\\Windows": "CSDVersion",
             "HKEY_CURRENT_USER\\Software\\Wine": "Version",
         }
-        for d in del_keys:
-            _val = del_keys.get(d)
-            if isinstance(_val, list):
-                for v in _val:
-                    self.reg.remove(d, v)
-            else:
-                self.reg.remove(d, _val)
-
         if version not in ["win98", "win95"]:
             bundle = {
                 "HKEY_LOCAL_MACHINE\\Software\\Microsoft\\Windows NT\\CurrentVersion": [
@@ -148,7 +140,15 @@ class RegKeys:
                 "HKEY_LOCAL_MACHINE\\System\\CurrentControlSet\\Control\\ProductOptions"
             ] = [{"value": "ProductType", "data": win_version["ProductType"]}]
 
-        self.reg.import_bundle(bundle)
+        with self.reg.batch():
+            for d in del_keys:
+                _val = del_keys.get(d)
+                if isinstance(_val, list):
+                    for v in _val:
+                        self.reg.remove(d, v)
+                else:
+                    self.reg.remove(d, _val)
+            self.reg.import_bundle(bundle)
 
         wineboot.restart()
         wineboot.update()
@@ -218,7 +218,7 @@ class RegKeys:
                     {"value": "CursorSize", "data": "25"},
                     {"value": "CursorVisible", "data": "1"},
                     {"value": "EditionMode", "data": "0"},
-                    {"value": "FaceName", "data": "Monospace", "key_type": "dword"},
+                    {"value": "FaceName", "data": "Monospace"},
                     {"value": "FontPitchFamily", "data": "1"},
                     {"value": "FontSize", "data": "1248584"},
                     {"value": "FontWeight", "data": "400"},
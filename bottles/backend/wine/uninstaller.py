@@ -1,8 +1,13 @@
+import os
 import shlex
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from bottles.backend.logger import Logger
+from bottles.backend.models.result import Result
+from bottles.backend.utils.manager import ManagerUtils
+from bottles.backend.wine import hive
 from bottles.backend.wine.wineprogram import WineProgram
+from bottles.backend.wine.wineserver import WineServer
 
 logging = Logger()
 
@@ -10,9 +15,66 @@ logging = Logger()
 class Uninstaller(WineProgram):
     program = "Wine Uninstaller"
     command = "uninstaller"
+    uninstall_keys = (
+        "HKEY_LOCAL_MACHINE\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall",
+        "HKEY_LOCAL_MACHINE\\Software\\Wow6432Node\\Microsoft\\Windows\\CurrentVersion\\Uninstall",
+        "HKEY_CURRENT_USER\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall",
+    )
+
+    def list_entries(self) -> Optional[List[Tuple[str, str]]]:
+        """
+        Read the programs listed by `uninstaller --list` straight from the
+        hive files, as (key, display name) pairs. Returns None if the
+        wineserver is running, as the files may be outdated, or if they
+        can't be read.
+        """
+        config = self.config
+        prefix = ManagerUtils.get_bottle_path(config)
+        if config.Environment == "Steam":
+            prefix = config.Path
+
+        if not os.path.isfile(os.path.join(prefix, "system.reg")):
+            return None
+        if WineServer(config).is_alive():
+            return None
+
+        reader = hive.HiveReader(prefix)
+        entries = []
+        try:
+            for key in self.uninstall_keys:
+                for subkey in reader.list_subkeys(key):
+                    values = reader.get_values(f"{key}\\{subkey}")
+                    values = {k.lower(): v for k, v in values.items()}
+                    # same rules as the wine uninstaller
+                    if values.get("systemcomponent") == (hive.REG_DWORD, 1):
+                        continue
+                    reg_type, display_name = values.get("displayname", (None, None))
+                    if reg_type not in (hive.REG_SZ, hive.REG_EXPAND_SZ):
+                        continue
+                    removable = "uninstallstring" in values or values.get(
+                        "windowsinstaller"
+                    ) == (hive.REG_DWORD, 1)
+                    if not removable:
+                        continue
+                    entries.append((subkey, display_name))
+        except ValueError as error:
+            logging.warning(f"Could not read the uninstall entries: {error}")
+            return None
+
+        entries.sort(key=lambda entry: entry[1].lower())
+        return entries
 
     def get_uuid(self, name: Optional[str] = None):
-        res = self.launch(args="--list 2>&1", communicate=True, action_name="get_uuid")
+        entries = self.list_entries()
+        if entries is not None:
+            output = "\n".join(
+                f"{key}|||{display_name}" for key, display_name in entries
+            )
+            res = Result(status=True, data=output)
+        else:
+            res = self.launch(
+                args="--list 2>&1", communicate=True, action_name="get_uuid"
+            )
 
         if name is None or not res.ready:
             return res
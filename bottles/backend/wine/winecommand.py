@@ -420,7 +420,6 @@ class WineCommand:
 
         dll_overrides = []
         gpu = GPUUtils().get_gpu()
-        DisplayUtils.check_nvidia_device()
         ld = []
 
         # Bottle environment variables
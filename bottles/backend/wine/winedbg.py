@@ -1,9 +1,12 @@
 import re
 import time
 import subprocess
-from typing import Optional
+from threading import Event
+from typing import Optional, Set
 
 from bottles.backend.logger import Logger
+from bottles.backend.utils.manager import ManagerUtils
+from bottles.backend.utils.proc import ProcWatch
 from bottles.backend.wine.wineprogram import WineProgram
 from bottles.backend.wine.wineserver import WineServer
 from bottles.backend.wine.wineboot import WineBoot
@@ -66,18 +69,60 @@ class WineDbg(WineProgram):
 
         return processes
 
-    def wait_for_process(self, name: str, timeout: float = 0.5):
-        """Wait for a process to exit."""
+    def __get_watch(self) -> Optional[ProcWatch]:
+        """
+        Returns a ProcWatch for the prefix, or None when its processes can't
+        be seen from here (sandboxed bottles) and winedbg must be asked.
+        """
+        config = self.config
+        if config.Parameters.sandbox or not ProcWatch.is_supported():
+            return None
+        if config.Environment == "Steam":
+            return ProcWatch(config.Path)
+        return ProcWatch(ManagerUtils.get_bottle_path(config))
+
+    def get_running(self) -> Set[str]:
+        """
+        Lowercase names of the executables running on the wineprefix, from
+        /proc when possible, otherwise from a single winedbg call.
+        """
+        watch = self.__get_watch()
+        if watch is not None:
+            return watch.running()
+        return {p["name"].lower() for p in self.get_processes()}
+
+    def wait_for_process(
+        self,
+        name: str,
+        timeout: Optional[float] = None,
+        cancel: Optional[Event] = None,
+    ) -> bool:
+        """
+        Wait for a process to exit. Returns False if the timeout (in seconds)
+        expired or the cancel event was set before it did.
+        """
+        watch = self.__get_watch()
+        if watch is not None:
+            return watch.wait(name, timeout=timeout, cancel=cancel)
+
         if not self.__wineserver_status():
             return True
 
+        name = name.replace("\\", "/").rsplit("/", 1)[-1]
+        deadline = None if timeout is None else time.monotonic() + timeout
         while True:
             processes = self.get_processes()
             if len(processes) == 0:
                 break
             if name not in [p["name"] for p in processes]:
                 break
-            time.sleep(timeout)
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            if cancel is not None:
+                if cancel.wait(0.5):
+                    return False
+            else:
+                time.sleep(0.5)
         return True
 
     def kill_process(self, pid: Optional[str] = None, name: Optional[str] = None):
@@ -113,6 +158,11 @@ class WineDbg(WineProgram):
         """
         Check if a process is running on the wineprefix.
         """
+        watch = self.__get_watch()
+        if name and not pid and watch is not None:
+            # the library asks this for every entry at once
+            return len(watch.find(name, ttl=1)) > 0
+
         if not self.__wineserver_status():
             return False
 
@@ -1,6 +1,10 @@
+import fcntl
 import os
+import signal
+import struct
 import subprocess
 import time
+from typing import Optional
 
 from bottles.backend.logger import Logger
 from bottles.backend.utils.manager import ManagerUtils
@@ -11,10 +15,27 @@ from bottles.backend.wine.wineprogram import WineProgram
 logging = Logger()
 
 
+# struct flock on 64-bit Linux: l_type, l_whence, l_start, l_len, l_pid
+_FLOCK = "hhqqi4x"
+
+
 class WineServer(WineProgram):
     program = "Wine Server"
     command = "wineserver"
 
+    @staticmethod
+    def get_server_dir(prefix: str) -> Optional[str]:
+        """
+        Returns the directory used by the wineserver of the given prefix,
+        which wine derives from the device and inode of the prefix:
+        /tmp/.wine-<uid>/server-<dev>-<inode>
+        """
+        try:
+            st = os.stat(prefix)
+        except OSError:
+            return None
+        return f"/tmp/.wine-{os.getuid()}/server-{st.st_dev:x}-{st.st_ino:x}"
+
     def is_alive(self):
         config = self.config
 
@@ -22,12 +43,6 @@ class WineServer(WineProgram):
         if not config.Runner:
             return False
 
-        # Perform native check before wasting time using wine
-        res = subprocess.Popen(["pgrep", "wineserver"], stdout=subprocess.PIPE)
-        if res.stdout.read() == b"":
-            return False
-
-        # Check using wine
         bottle = ManagerUtils.get_bottle_path(config)
         runner = ManagerUtils.get_runner_path(config.Runner)
 
@@ -38,6 +53,68 @@ class WineServer(WineProgram):
         if not os.path.isdir(bottle):
             return False
 
+        alive = self.__is_alive_native(bottle)
+        if alive is not None:
+            return alive
+
+        return self.__is_alive_wine(bottle, runner)
+
+    def __is_alive_native(self, bottle: str) -> Optional[bool]:
+        """
+        Checks the wineserver of the prefix without spawning any process:
+        a running server keeps its socket in the server directory and holds
+        a lock on the lock file next to it. Falls back to looking for a
+        wineserver process working in that directory when the lock can't
+        be inspected. Returns None when none of this can be checked, e.g.
+        for sandboxed bottles whose /tmp is not the one we see.
+        """
+        if self.config.Parameters.sandbox or not os.path.isdir("/proc/self"):
+            return None
+
+        server_dir = self.get_server_dir(bottle)
+        if server_dir is None:
+            return None
+        if not os.path.exists(os.path.join(server_dir, "socket")):
+            return False
+
+        locked = self.__is_locked(os.path.join(server_dir, "lock"))
+        if locked is not None:
+            return locked
+
+        for proc in ProcUtils.query(name="wineserver", fields=("cwd", "environ")):
+            if proc.cwd == server_dir or proc.getenv("WINEPREFIX") == bottle:
+                return True
+        return False
+
+    @staticmethod
+    def __is_locked(lock_path: str) -> Optional[bool]:
+        """Whether another process holds a lock on the file (F_GETLK)."""
+        try:
+            fd = os.open(lock_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            return None
+
+        try:
+            query = struct.pack(_FLOCK, fcntl.F_WRLCK, os.SEEK_SET, 0, 0, 0)
+            l_type = struct.unpack(_FLOCK, fcntl.fcntl(fd, fcntl.F_GETLK, query))[0]
+        except (OSError, struct.error):
+            return None
+        finally:
+            os.close(fd)
+
+        return l_type != fcntl.F_UNLCK
+
+    def __is_alive_wine(self, bottle: str, runner: str) -> bool:
+        config = self.config
+
+        # Perform native check before wasting time using wine
+        res = subprocess.Popen(["pgrep", "wineserver"], stdout=subprocess.PIPE)
+        if res.stdout.read() == b"":
+            return False
+
+        # Check using wine
         if SteamUtils.is_proton(runner):
             runner = SteamUtils.get_dist_directory(runner)
 
@@ -107,8 +184,7 @@ class WineServer(WineProgram):
             SandboxManager.terminate_prefix(bottle)
             return
 
-        procs = ProcUtils.get_by_env(f"WINEPREFIX={bottle}")
-        for proc in procs:
-            proc.kill(9)
+        for proc in ProcUtils.query(env={"WINEPREFIX": bottle}, fields=("start",)):
+            proc.kill(signal.SIGKILL)
 
         self.kill(9)
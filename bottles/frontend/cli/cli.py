@@ -45,6 +45,7 @@ from gi.repository import Gio
 
 from bottles.backend.globals import Paths
 from bottles.backend.health import HealthChecker
+from bottles.backend.managers.dedup import DedupManager
 from bottles.backend.managers.manager import Manager
 from bottles.backend.managers.registry_rule import RegistryRuleManager
 from bottles.backend.models.config import BottleConfig
@@ -300,6 +301,16 @@ class CLI:
             "-i", "--input", help="Command to execute", required=True
         )
 
+        dedup_parser = subparsers.add_parser(
+            "dedup", help="Share identical files between bottles"
+        )
+        dedup_parser.add_argument("-b", "--bottle", help="Bottle name", required=True)
+        dedup_parser.add_argument(
+            "--rehydrate",
+            action="store_true",
+            help="Give the bottle private copies of its shared files",
+        )
+
         umu_parser = subparsers.add_parser("umu", help="Manage UMU games")
         umu_parser.add_argument(
             "action",
@@ -383,6 +394,9 @@ class CLI:
         elif self.args.command == "umu":
             self.manage_umu()
 
+        elif self.args.command == "dedup":
+            self.dedup_bottle()
+
         else:
             self.parser.print_help()
 
@@ -1077,6 +1091,27 @@ class CLI:
         WineServer(bottle).wait()
         sys.stdout.write(f"Stopped all processes in bottle {_bottle}\n")
 
+    def dedup_bottle(self):
+        _bottle = self.args.bottle
+        mng = Manager(g_settings=self.settings, is_cli=True)
+        mng.checks()
+
+        if _bottle not in mng.local_bottles:
+            sys.stderr.write(f"Bottle {_bottle} not found\n")
+            exit(1)
+
+        bottle = mng.local_bottles[_bottle]
+        dedup = DedupManager()
+        if self.args.rehydrate:
+            res = dedup.rehydrate(bottle)
+            message = f"Restored {res.data} files" if res.ok else res.message
+        else:
+            res = dedup.dedup(bottle)
+            message = str(res.data) if res.ok else res.message
+        sys.stdout.write(f"{message}\n")
+        if not res.ok:
+            exit(1)
+
     def run_shell(self):
         _bottle = self.args.bottle
         _input = self.args.input
@@ -139,6 +139,15 @@ class DependenciesView(Adw.Bin):
         installed = []
         failed = []
 
+        # fetch every manifest of the selection at once, not one per step
+        self.manager.dependency_manager.prefetch(
+            [
+                entry.dependency[0]
+                for entry in entries
+                if entry.dependency[0] not in self.config.Installed_Dependencies
+            ]
+        )
+
         for entry in entries:
             dependency = entry.dependency
             name = dependency[0]
@@ -23,6 +23,7 @@ from typing import Dict, List, Optional
 
 from gi.repository import Adw, Gdk, Gio, GLib, Gtk, Xdp
 
+from bottles.backend.globals import zstd_available
 from bottles.backend.managers.backup import BackupManager
 from bottles.backend.models.config import BottleConfig
 from bottles.backend.models.result import Result
@@ -98,6 +99,7 @@ class BottleView(Adw.PreferencesPage):
     btn_toggle_removed = Gtk.Template.Child()
     btn_backup_config = Gtk.Template.Child()
     btn_backup_full = Gtk.Template.Child()
+    btn_backup_incremental = Gtk.Template.Child()
     btn_duplicate = Gtk.Template.Child()
     btn_delete = Gtk.Template.Child()
     btn_flatpak_doc = Gtk.Template.Child()
@@ -195,6 +197,7 @@ class BottleView(Adw.PreferencesPage):
         self.btn_toggle_removed.connect("clicked", self.__toggle_removed)
         self.btn_backup_config.connect("clicked", self.__backup, "config")
         self.btn_backup_full.connect("clicked", self.__backup, "full")
+        self.btn_backup_incremental.connect("clicked", self.__backup, "incremental")
         self.btn_duplicate.connect("clicked", self.__duplicate)
         self.btn_flatpak_doc.connect(
             "clicked", open_doc_url, "flatpak/black-screen-or-silent-crash"
@@ -265,7 +268,7 @@ class BottleView(Adw.PreferencesPage):
                     terminal=self.config.run_in_terminal,
                     sandbox_override=sandbox_override,
                 )
-                RunAsync(executor.run, callback)
+                RunAsync(executor.run, callback, long_running=True)
 
             guard_sandbox_launch(
                 self.window, self.config, file.get_path(), proceed
@@ -707,7 +710,7 @@ class BottleView(Adw.PreferencesPage):
                         terminal=self.config.run_in_terminal,
                         sandbox_override=sandbox_override,
                     )
-                    RunAsync(executor.run, callback)
+                    RunAsync(executor.run, callback, long_running=True)
 
                 guard_sandbox_launch(self.window, self.config, exec_path, proceed)
 
@@ -781,15 +784,21 @@ class BottleView(Adw.PreferencesPage):
         """
         This function pop up the file chooser where the user
         can select the path where to export the bottle backup.
-        Use the backup_type param to export config or full.
+        Use the backup_type param to export config, full or incremental.
         """
+        extension = "tar.zst" if zstd_available else "tar.gz"
         if backup_type == "config":
             title = _("Select the location where to save the backup config")
             hint = f"backup_{self.config.Path}.yml"
             accept_label = _("Export")
+        elif backup_type == "incremental":
+            title = _("Select the location where to save the backup archive")
+            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            hint = f"backup_{self.config.Path}_{timestamp}.{extension}"
+            accept_label = _("Backup")
         else:
             title = _("Select the location where to save the backup archive")
-            hint = f"backup_{self.config.Path}.tar.gz"
+            hint = f"backup_{self.config.Path}.{extension}"
             accept_label = _("Backup")
 
         @GtkUtils.run_in_main_loop
@@ -942,22 +951,22 @@ the Bottles preferences or choose a new one to run applications."
 
     def run_winecfg(self, widget):
         program = WineCfg(self.config)
-        RunAsync(program.launch)
+        RunAsync(program.launch, long_running=True)
 
     def run_debug(self, widget):
         program = WineDbg(self.config)
-        RunAsync(program.launch_terminal)
+        RunAsync(program.launch_terminal, long_running=True)
 
     def run_browse(self, widget):
         ManagerUtils.open_filemanager(self.config)
 
     def run_explorer(self, widget):
         program = Explorer(self.config)
-        RunAsync(program.launch)
+        RunAsync(program.launch, long_running=True)
 
     def run_cmd(self, widget):
         program = CMD(self.config)
-        RunAsync(program.launch_terminal)
+        RunAsync(program.launch_terminal, long_running=True)
 
     @staticmethod
     def run_snake(widget, event):
@@ -966,19 +975,19 @@ the Bottles preferences or choose a new one to run applications."
 
     def run_taskmanager(self, widget):
         program = Taskmgr(self.config)
-        RunAsync(program.launch)
+        RunAsync(program.launch, long_running=True)
 
     def run_controlpanel(self, widget):
         program = Control(self.config)
-        RunAsync(program.launch)
+        RunAsync(program.launch, long_running=True)
 
     def run_uninstaller(self, widget):
         program = Uninstaller(self.config)
-        RunAsync(program.launch)
+        RunAsync(program.launch, long_running=True)
 
     def run_regedit(self, widget):
         program = Regedit(self.config)
-        RunAsync(program.launch)
+        RunAsync(program.launch, long_running=True)
 
     def wineboot(self, widget, status):
         @GtkUtils.run_in_main_loop
@@ -837,7 +837,11 @@ class PreferencesView(Adw.PreferencesPage):
     def __toggle_feature(self, state: bool, key: str) -> None:
         """Toggle a specific feature."""
         self.config = self.manager.update_config(
-            config=self.config, key=key, value=state, scope="Parameters"
+            config=self.config,
+            key=key,
+            value=state,
+            scope="Parameters",
+            debounce=True,
         ).data["config"]
 
     def __toggle_feature_cb(self, _widget: Gtk.Widget, state: bool, key: str) -> None:
@@ -906,6 +910,7 @@ class PreferencesView(Adw.PreferencesPage):
             key="frame_rate_limit",
             value=value,
             scope="Parameters",
+            debounce=True,
         ).data["config"]
 
     def __toggle_nvapi(self, widget=False, state=False):
@@ -748,7 +748,7 @@ class EagleView(Gtk.Box):
         def _callback(_result, _error):
             pass
 
-        RunAsync(_run, callback=_callback)
+        RunAsync(_run, callback=_callback, long_running=True)
         
         self.details.go_back_sidebar()
 
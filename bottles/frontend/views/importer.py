@@ -132,9 +132,9 @@ class ImporterView(Adw.Bin):
     def __import_full_bck(self, *_args):
         """
         This function shows a dialog to the user, from which it can choose an
-        archive backup to import into Bottles. It supports only .tar.gz files
-        as Bottles export bottles in this format. Once selected, it will
-        be imported.
+        archive backup to import into Bottles. It supports .tar.gz and
+        .tar.zst files as Bottles export bottles in these formats. Once
+        selected, it will be imported.
         """
 
         def set_path(_dialog, response):
@@ -157,11 +157,13 @@ class ImporterView(Adw.Bin):
         )
 
         filter = Gtk.FileFilter()
-        filter.set_name("GNU Gzip Archive")
+        filter.set_name("Backup Archive")
         # TODO: Investigate why `filter.add_mime_type(...)` does not show filter in all distributions.
         # Intended MIME types are:
         #   - `application/gzip`
+        #   - `application/zstd`
         filter.add_pattern("*.gz")
+        filter.add_pattern("*.zst")
 
         dialog.add_filter(filter)
         add_all_filters(dialog)
@@ -148,7 +148,7 @@ class BottlesBottleRow(Adw.ActionRow):
                 _executor = WineExecutor(
                     self.config, exec_path=run_path, sandbox_override=sandbox_override
                 )
-                RunAsync(_executor.run)
+                RunAsync(_executor.run, long_running=True)
 
             guard_sandbox_launch(self.window, self.config, path, proceed)
 
@@ -176,8 +176,13 @@ class DependencyEntry(Adw.ActionRow):
         self.install_dialog = DependencyInstallDialog(self.window, self.dependency[0])
         self.install_dialog.present()
 
+        def install(**kwargs):
+            # fetch the manifests of the whole tree at once
+            self.manager.dependency_manager.prefetch([self.dependency[0]])
+            return self.manager.dependency_manager.install(**kwargs)
+
         RunAsync(
-            task_func=self.manager.dependency_manager.install,
+            task_func=install,
             callback=self.set_install_status,
             config=self.config,
             dependency=self.dependency,
@@ -40,7 +40,7 @@ class ExecButton(Gtk.Button):
                 args=self.data.get("args"),
                 sandbox_override=sandbox_override,
             )
-            RunAsync(executor.run)
+            RunAsync(executor.run, long_running=True)
             self.parent.pop_run.popdown()  # workaround #1640
 
         guard_sandbox_launch(
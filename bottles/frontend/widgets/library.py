@@ -26,6 +26,7 @@ from bottles.backend.models.result import Result
 from bottles.backend.umu import UmuRepositoryError
 from bottles.backend.utils.threading import RunAsync
 from bottles.backend.wine.executor import WineExecutor
+from bottles.backend.wine.processmonitor import ProcessMonitor
 from bottles.backend.wine.winedbg import WineDbg
 from bottles.frontend.utils.gtk import GtkUtils
 from bottles.frontend.utils.sandbox_guard import guard_sandbox_launch
@@ -199,6 +200,11 @@ class LibraryEntry(Gtk.Box):
         self.btn_stop.connect("clicked", self.stop_process)
         self.btn_remove.connect("clicked", self.__remove_entry)
 
+        self.__process_watch = None
+        if self.source == "bottle" and self.program.get("executable"):
+            self.connect("map", self.__watch_process)
+            self.connect("unmap", self.__unwatch_process)
+
     def __get_config(self):
         bottles = self.manager.local_bottles
         bottle_name = self.entry["bottle"]["name"]
@@ -265,26 +271,20 @@ class LibraryEntry(Gtk.Box):
         self.btn_stop.set_visible(not status)
         self.btn_run.set_visible(status)
 
-    def __is_alive(self):
-        winedbg = WineDbg(self.config)
-
-        @GtkUtils.run_in_main_loop
-        def set_watcher(result=False, error=False):
-            nonlocal winedbg
-            self.__reset_buttons()
-
-            RunAsync(
-                winedbg.wait_for_process,
-                callback=self.__reset_buttons,
-                name=self.program["executable"],
-                timeout=5,
+    def __watch_process(self, *_args):
+        # entries share the monitor of their bottle, only while shown
+        if self.__process_watch is None:
+            self.__process_watch = ProcessMonitor.get(self.config).subscribe(
+                self.program["executable"], self.__on_process_status
             )
 
-        RunAsync(
-            winedbg.is_process_alive,
-            callback=set_watcher,
-            name=self.program["executable"],
-        )
+    def __unwatch_process(self, *_args):
+        if self.__process_watch is not None:
+            ProcessMonitor.get(self.config).unsubscribe(self.__process_watch)
+            self.__process_watch = None
+
+    def __on_process_status(self, running: bool):
+        self.__reset_buttons(not running)
 
     def __remove_entry(self, *args):
         self.library.remove_entry(self)
@@ -355,6 +355,7 @@ class LibraryEntry(Gtk.Box):
                 config=self.config,
                 program=program,
                 sandbox_override=sandbox_override,
+                long_running=True,
             )
             self.__reset_buttons()
 
@@ -389,7 +390,7 @@ class LibraryEntry(Gtk.Box):
                     _("The game exited with status {0}.").format(return_code)
                 )
 
-        RunAsync(run, callback=complete)
+        RunAsync(run, callback=complete, long_running=True)
         self.btn_remove.set_visible(False)
         self.btn_stop.set_visible(True)
         self.btn_stop.set_sensitive(True)
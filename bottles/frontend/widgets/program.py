@@ -31,6 +31,7 @@ from bottles.backend.models.result import Result
 from bottles.backend.utils.manager import ManagerUtils
 from bottles.backend.utils.threading import RunAsync
 from bottles.backend.wine.executor import WineExecutor
+from bottles.backend.wine.processmonitor import ProcessMonitor
 from bottles.backend.wine.uninstaller import Uninstaller
 from bottles.backend.wine.winedbg import WineDbg
 from bottles.backend.wine.wineserver import WineServer
@@ -87,6 +88,7 @@ class ProgramEntry(Adw.ActionRow):
         self.__desktop_entry_query_pending = False
         self.__program_icon_job = None
         self.__program_icon_path = None
+        self.__process_watch = None
 
         self.set_title(GLib.markup_escape_text(self.program["name"]))
 
@@ -190,7 +192,8 @@ class ProgramEntry(Adw.ActionRow):
         )
 
         if not program.get("removed") and not is_steam and check_boot:
-            self.__is_alive()
+            self.connect("map", self.__watch_process)
+            self.connect("unmap", self.__unwatch_process)
 
         # Update subtitle with playtime info
         if not is_steam:
@@ -284,22 +287,20 @@ class ProgramEntry(Adw.ActionRow):
         self.btn_run.set_sensitive(status)
         self.btn_stop.set_sensitive(not status)
 
-    def __is_alive(self):
-        winedbg = WineDbg(self.config)
-
-        @GtkUtils.run_in_main_loop
-        def set_watcher(_result=False, _error=False):
-            nonlocal winedbg
-            self.__reset_buttons()
-
-            RunAsync(
-                winedbg.wait_for_process,
-                callback=self.__reset_buttons,
-                name=self.executable,
-                timeout=5,
+    def __watch_process(self, *_args):
+        # rows share the monitor of their bottle, only while shown
+        if self.__process_watch is None:
+            self.__process_watch = ProcessMonitor.get(self.config).subscribe(
+                self.executable, self.__on_process_status
             )
 
-        RunAsync(winedbg.is_process_alive, callback=set_watcher, name=self.executable)
+    def __unwatch_process(self, *_args):
+        if self.__process_watch is not None:
+            ProcessMonitor.get(self.config).unsubscribe(self.__process_watch)
+            self.__process_watch = None
+
+    def __on_process_status(self, running: bool):
+        self.__reset_buttons(not running)
 
     def run_executable(self, _widget, with_terminal=False):
         self.pop_actions.popdown()  # workaround #1640
@@ -363,7 +364,7 @@ class ProgramEntry(Adw.ActionRow):
                     self.__offer_eagle_scan(path)
 
             self.window.show_toast(_('Launching "{0}"…').format(self.program["name"]))
-            RunAsync(_run, callback=done)
+            RunAsync(_run, callback=done, long_running=True)
             self.__reset_buttons()
 
         guard_sandbox_launch(
@@ -189,8 +189,13 @@ class InstallerDialog(Adw.Window):
 
         self.set_steps(self.manager.installer_manager.count_steps(self.installer))
 
+        def install(**kwargs):
+            # fetch the manifests of the installer and its dependencies at once
+            self.manager.installer_manager.prefetch([self.installer[0]])
+            return self.manager.installer_manager.install(**kwargs)
+
         RunAsync(
-            task_func=self.manager.installer_manager.install,
+            task_func=install,
             callback=set_status,
             config=self.config,
             installer=self.installer,
@@ -1,5 +1,6 @@
 import os
 import shutil
+import subprocess
 import tarfile
 from concurrent.futures import CancelledError
 from pathlib import Path
@@ -9,10 +10,11 @@ from types import SimpleNamespace
 import pytest
 
 from bottles.backend.globals import Paths
-from bottles.backend.managers.backup import BackupManager
+from bottles.backend.managers.backup import BackupManager, BackupManifest
 from bottles.backend.models.config import BottleConfig
 from bottles.backend.state import SignalManager, Task, TaskManager
 from bottles.backend.utils import yaml
+from bottles.backend.utils.clone import TreeCloner
 
 
 @pytest.fixture(autouse=True)
@@ -227,10 +229,10 @@ def test_duplicate_bottle_removes_partial_destination_after_failure(
     destination = tmp_path / "destination"
     (source / "drive_c").mkdir(parents=True)
 
-    def fail_copytree(*_args, **_kwargs):
+    def fail_clone(*_args, **_kwargs):
         raise shutil.Error("copy failed")
 
-    monkeypatch.setattr(shutil, "copytree", fail_copytree)
+    monkeypatch.setattr(TreeCloner, "clone", fail_clone)
 
     result = BackupManager._duplicate_bottle_directory(
         BottleConfig(Name="Source", Path="Source"),
@@ -243,6 +245,57 @@ def test_duplicate_bottle_removes_partial_destination_after_failure(
     assert not destination.exists()
 
 
+def test_duplicate_bottle_copies_only_bottle_items(tmp_path):
+    source = tmp_path / "source"
+    destination = tmp_path / "destination"
+    (source / "drive_c" / "windows").mkdir(parents=True)
+    (source / "drive_c" / "windows" / "win.ini").write_text("[windows]")
+    (source / "user.reg").write_text("WINE REGISTRY Version 2\n")
+    (source / "cache").mkdir()
+    (source / "cache" / "shader.bin").write_bytes(b"cache")
+    (source / "dosdevices").mkdir()
+    os.symlink("../drive_c", source / "dosdevices" / "c:")
+    with (source / "bottle.yml").open("w") as config_file:
+        yaml.dump({"Name": "Source", "Path": "Source"}, config_file)
+
+    result = BackupManager._duplicate_bottle_directory(
+        BottleConfig(Name="Source", Path="Source"),
+        str(source),
+        str(destination),
+        "Destination",
+    )
+
+    assert result.status
+    assert sorted(os.listdir(destination)) == ["bottle.yml", "drive_c", "user.reg"]
+    assert (destination / "drive_c/windows/win.ini").read_text() == "[windows]"
+    assert not TaskManager._TASKS
+
+
+def test_duplicate_bottle_removes_destination_when_cancelled(tmp_path, monkeypatch):
+    source = tmp_path / "source"
+    destination = tmp_path / "destination"
+    (source / "drive_c").mkdir(parents=True)
+    (source / "drive_c" / "payload.bin").write_bytes(b"x" * 1024)
+
+    def cancel_on_add(task):
+        task.request_cancel()
+        return add(task)
+
+    add = TaskManager.add
+    monkeypatch.setattr(TaskManager, "add", cancel_on_add)
+
+    result = BackupManager._duplicate_bottle_directory(
+        BottleConfig(Name="Source", Path="Source"),
+        str(source),
+        str(destination),
+        "Destination",
+    )
+
+    assert not result.status
+    assert result.message == "cancelled"
+    assert not destination.exists()
+
+
 def test_full_backup_is_atomic_when_cancelled_during_file_copy(tmp_path, monkeypatch):
     source = tmp_path / "bottle"
     source.mkdir()
@@ -382,6 +435,334 @@ def test_export_backup_reports_cancellation_and_removes_task(tmp_path, monkeypat
     assert TaskManager._TASKS == {}
 
 
+zstd_required = pytest.mark.skipif(
+    shutil.which("zstd") is None, reason="zstd is not installed"
+)
+
+
+@zstd_required
+def test_full_backup_zstd_round_trip(tmp_path):
+    source = tmp_path / "bottle"
+    (source / "drive_c").mkdir(parents=True)
+    (source / "drive_c" / "program.exe").write_bytes(b"program" * 4096)
+    (source / "user.reg").write_text("WINE REGISTRY Version 2\n")
+    destination = tmp_path / "backup.tar.zst"
+    task = Task(cancellable=True)
+
+    assert BackupManager._create_tarfile(
+        str(source),
+        str(destination),
+        task=task,
+        cancel_event=task.cancel_event,
+        compression=BackupManager.COMPRESSION_ZSTD,
+    )
+    assert destination.read_bytes()[:4] == b"\x28\xb5\x2f\xfd"
+    assert task.subtitle == "100%"
+
+    restored = tmp_path / "restored"
+    restored.mkdir()
+    import_task = Task()
+    assert BackupManager._safe_extract_tarfile(
+        str(destination), str(restored), task=import_task
+    )
+    assert (restored / "bottle/drive_c/program.exe").read_bytes() == (b"program" * 4096)
+    assert (restored / "bottle/user.reg").read_text() == "WINE REGISTRY Version 2\n"
+    assert import_task.subtitle == "100%"
+
+
+@zstd_required
+def test_full_backup_zstd_import_rejects_path_traversal(tmp_path):
+    archive = tmp_path / "evil.tar"
+    payload = tmp_path / "payload"
+    payload.write_bytes(b"evil")
+    with tarfile.open(archive, "w") as tar:
+        tar.add(payload, arcname="../escaped")
+    subprocess.run(["zstd", "-q", "--rm", str(archive)], check=True)
+    extract_path = tmp_path / "bottles"
+    extract_path.mkdir()
+
+    assert not BackupManager._safe_extract_tarfile(
+        str(tmp_path / "evil.tar.zst"), str(extract_path)
+    )
+    assert not (tmp_path / "escaped").exists()
+
+
+def test_restore_streams_files_and_keeps_holes(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "bottles.backend.managers.backup._RestoreWriter.chunk_size", 256 * 1024
+    )
+    source = tmp_path / "bottle"
+    (source / "drive_c").mkdir(parents=True)
+    disk = source / "drive_c" / "disk.img"
+    with open(disk, "wb") as file:
+        file.write(b"boot")
+        file.seek(1024 * 1024)
+        file.write(b"data")
+        file.truncate(2 * 1024 * 1024)
+    (source / "drive_c" / "readonly.txt").write_text("keep")
+    (source / "drive_c" / "readonly.txt").chmod(0o444)
+    (source / "drive_c" / "link").symlink_to("readonly.txt")
+    os.utime(source / "drive_c", (1000, 1000))
+    archive = tmp_path / "backup.tar.gz"
+    assert BackupManager._create_tarfile(str(source), str(archive))
+    restored = tmp_path / "restored"
+    restored.mkdir()
+    task = Task()
+
+    assert BackupManager._safe_extract_tarfile(str(archive), str(restored), task=task)
+
+    copy = restored / "bottle" / "drive_c" / "disk.img"
+    assert copy.read_bytes() == disk.read_bytes()
+    assert copy.stat().st_blocks * 512 < copy.stat().st_size
+    readonly = restored / "bottle" / "drive_c" / "readonly.txt"
+    assert readonly.read_text() == "keep"
+    assert readonly.stat().st_mode & 0o777 == 0o444
+    assert os.readlink(restored / "bottle" / "drive_c" / "link") == "readonly.txt"
+    assert (restored / "bottle" / "drive_c").stat().st_mtime == 1000
+    assert task.subtitle == "100%"
+
+
+@pytest.mark.parametrize(
+    "name",
+    (
+        "backup.tar.gz",
+        pytest.param("backup.tar.zst", marks=zstd_required),
+    ),
+)
+def test_restore_hardlinks_again_into_the_same_directory(tmp_path, name):
+    source = tmp_path / "bottle"
+    source.mkdir()
+    (source / "original.dll").write_bytes(b"dll")
+    os.link(source / "original.dll", source / "linked.dll")
+    archive = tmp_path / name
+    assert BackupManager._create_tarfile(
+        str(source),
+        str(archive),
+        compression=BackupManager.compression_for(name),
+    )
+    restored = tmp_path / "restored"
+    restored.mkdir()
+
+    for _i in range(2):
+        assert BackupManager._safe_extract_tarfile(str(archive), str(restored))
+
+    original = restored / "bottle" / "original.dll"
+    linked = restored / "bottle" / "linked.dll"
+    assert linked.read_bytes() == b"dll"
+    assert os.path.samefile(original, linked)
+
+
+def test_restore_rejects_members_behind_symlinks(tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    payload = tmp_path / "payload"
+    payload.write_bytes(b"evil")
+    archive = tmp_path / "evil.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        link = tarfile.TarInfo("bottle/escape")
+        link.type = tarfile.SYMTYPE
+        link.linkname = str(outside)
+        tar.addfile(link)
+        tar.add(payload, arcname="bottle/escape/payload")
+    extract_path = tmp_path / "bottles"
+    extract_path.mkdir()
+
+    assert not BackupManager._safe_extract_tarfile(str(archive), str(extract_path))
+    assert not (outside / "payload").exists()
+
+
+def test_export_backup_picks_compression_from_file_name(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "bottles.backend.managers.backup.ManagerUtils.get_bottle_path",
+        lambda _config: str(tmp_path / "bottle"),
+    )
+    used = []
+
+    def create_tarfile(*_args, compression, **_kwargs):
+        used.append(compression)
+        return True
+
+    monkeypatch.setattr(BackupManager, "_create_tarfile", create_tarfile)
+    config = SimpleNamespace(Name="Test")
+
+    for name in ("backup.tar.zst", "backup.tar.gz", "backup"):
+        assert BackupManager.export_backup(config, "full", str(tmp_path / name))
+
+    assert used == [
+        BackupManager.COMPRESSION_ZSTD,
+        BackupManager.COMPRESSION_GZIP,
+        BackupManager.COMPRESSION_GZIP,
+    ]
+
+
+@pytest.fixture
+def incremental_bottle(tmp_path, monkeypatch):
+    bottle = tmp_path / "bottles-src" / "Game"
+    (bottle / "drive_c" / "saves").mkdir(parents=True)
+    for name in ("slot1.sav", "slot2.sav", "settings.ini"):
+        (bottle / "drive_c" / "saves" / name).write_text(f"{name} v1")
+    monkeypatch.setattr(
+        "bottles.backend.managers.backup.ManagerUtils.get_bottle_path",
+        lambda _config: str(bottle),
+    )
+    monkeypatch.setattr(
+        "bottles.backend.managers.backup.Manager",
+        lambda: SimpleNamespace(update_bottles=lambda: None),
+    )
+    backups = tmp_path / "backups"
+    backups.mkdir()
+    return bottle, backups
+
+
+def archived_files(path):
+    with tarfile.open(path, "r:gz") as archive:
+        return sorted(member.name for member in archive if member.isfile())
+
+
+def test_incremental_backup_only_archives_changes(incremental_bottle, monkeypatch):
+    bottle, backups = incremental_bottle
+    config = SimpleNamespace(Name="Game")
+    saves = bottle / "drive_c" / "saves"
+    assert BackupManager.export_backup(config, "full", str(backups / "1.tar.gz"))
+
+    (saves / "slot1.sav").write_text("slot1.sav v2")
+    (saves / "slot2.sav").unlink()
+    (saves / "slot3.sav").write_text("new")
+    settings = saves / "settings.ini"
+    os.utime(settings, (1, 1))  # touched, same content
+    assert BackupManager.export_backup(config, "incremental", str(backups / "2.tar.gz"))
+
+    manifest = BackupManager._read_manifest(str(backups / "2.tar.gz"))
+    assert manifest.parent_file == "1.tar.gz"
+    assert manifest.deleted == ["drive_c/saves/slot2.sav"]
+    assert archived_files(backups / "2.tar.gz") == [
+        ".bottles-backup.json",
+        "Game/drive_c/saves/slot1.sav",
+        "Game/drive_c/saves/slot3.sav",
+    ]
+
+    restored = backups.parent / "restored"
+    restored.mkdir()
+    monkeypatch.setattr(Paths, "bottles", str(restored))
+    assert BackupManager.import_backup("full", str(backups / "2.tar.gz")).status
+
+    restored_saves = restored / "Game" / "drive_c" / "saves"
+    assert sorted(os.listdir(restored_saves)) == [
+        "settings.ini",
+        "slot1.sav",
+        "slot3.sav",
+    ]
+    assert (restored_saves / "slot1.sav").read_text() == "slot1.sav v2"
+    assert (restored_saves / "settings.ini").read_text() == "settings.ini v1"
+    assert not (restored / BackupManifest.NAME).exists()
+
+
+def test_incremental_restore_keeps_hardlinks(incremental_bottle, monkeypatch):
+    bottle, backups = incremental_bottle
+    config = SimpleNamespace(Name="Game")
+    saves = bottle / "drive_c" / "saves"
+    os.link(saves / "settings.ini", saves / "settings.bak")
+    assert BackupManager.export_backup(config, "full", str(backups / "1.tar.gz"))
+    (saves / "slot1.sav").write_text("slot1.sav v2")
+    assert BackupManager.export_backup(config, "incremental", str(backups / "2.tar.gz"))
+    restored = backups.parent / "restored"
+    restored.mkdir()
+    monkeypatch.setattr(Paths, "bottles", str(restored))
+
+    assert BackupManager.import_backup("full", str(backups / "2.tar.gz")).status
+
+    restored_saves = restored / "Game" / "drive_c" / "saves"
+    assert (restored_saves / "slot1.sav").read_text() == "slot1.sav v2"
+    assert (restored_saves / "settings.bak").read_text() == "settings.ini v1"
+    assert os.path.samefile(
+        restored_saves / "settings.ini", restored_saves / "settings.bak"
+    )
+
+
+def test_incremental_restore_keeps_file_replaced_by_symlink(
+    incremental_bottle, monkeypatch
+):
+    bottle, backups = incremental_bottle
+    config = SimpleNamespace(Name="Game")
+    saves = bottle / "drive_c" / "saves"
+    assert BackupManager.export_backup(config, "full", str(backups / "1.tar.gz"))
+    (saves / "settings.ini").unlink()
+    (saves / "settings.ini").symlink_to("slot1.sav")
+    assert BackupManager.export_backup(config, "incremental", str(backups / "2.tar.gz"))
+    assert BackupManager._read_manifest(str(backups / "2.tar.gz")).deleted == []
+    restored = backups.parent / "restored"
+    restored.mkdir()
+    monkeypatch.setattr(Paths, "bottles", str(restored))
+
+    assert BackupManager.import_backup("full", str(backups / "2.tar.gz")).status
+
+    restored_saves = restored / "Game" / "drive_c" / "saves"
+    assert os.readlink(restored_saves / "settings.ini") == "slot1.sav"
+    assert (restored_saves / "slot1.sav").read_text() == "slot1.sav v1"
+
+
+def test_deletions_remove_symlinks_not_their_targets(tmp_path):
+    bottle = tmp_path / "Game"
+    bottle.mkdir()
+    (bottle / "kept.txt").write_text("kept")
+    (bottle / "link").symlink_to("kept.txt")
+    manifest = BackupManifest("Game")
+    manifest.deleted = ["link", "../outside"]
+    (tmp_path / "outside").write_text("outside")
+
+    BackupManager._apply_deletions(manifest, str(tmp_path))
+
+    assert not os.path.lexists(bottle / "link")
+    assert (bottle / "kept.txt").read_text() == "kept"
+    assert (tmp_path / "outside").exists()
+
+
+def test_incremental_backup_without_previous_is_full(incremental_bottle):
+    bottle, backups = incremental_bottle
+
+    assert BackupManager.export_backup(
+        SimpleNamespace(Name="Game"), "incremental", str(backups / "1.tar.gz")
+    )
+
+    manifest = BackupManager._read_manifest(str(backups / "1.tar.gz"))
+    assert not manifest.incremental
+    assert len(manifest.files) == 3
+
+
+def test_incremental_restore_fails_without_parent(incremental_bottle, monkeypatch):
+    bottle, backups = incremental_bottle
+    config = SimpleNamespace(Name="Game")
+    assert BackupManager.export_backup(config, "full", str(backups / "1.tar.gz"))
+    (bottle / "drive_c" / "saves" / "slot1.sav").write_text("v2")
+    assert BackupManager.export_backup(config, "incremental", str(backups / "2.tar.gz"))
+    (backups / "1.tar.gz").unlink()
+    restored = backups.parent / "restored"
+    restored.mkdir()
+    monkeypatch.setattr(Paths, "bottles", str(restored))
+
+    result = BackupManager.import_backup("full", str(backups / "2.tar.gz"))
+
+    assert not result.status
+    assert "1.tar.gz" in result.message
+    assert not list(restored.iterdir())
+
+
+def test_backup_manifest_is_read_from_archive_without_sidecar(incremental_bottle):
+    _bottle, backups = incremental_bottle
+    archive = backups / "1.tar.gz"
+    assert BackupManager.export_backup(
+        SimpleNamespace(Name="Game"), "full", str(archive)
+    )
+    sidecar = backups / "1.tar.gz.json"
+    expected = BackupManifest.loads(sidecar.read_bytes())
+    sidecar.unlink()
+
+    manifest = BackupManager._read_manifest(str(archive))
+
+    assert manifest.id == expected.id
+    assert manifest.files == expected.files
+
+
 def test_program_backup_copies_selected_paths_and_writes_manifest(
     tmp_path, monkeypatch
 ):
@@ -0,0 +1,92 @@
+import errno
+import os
+
+import pytest
+
+from bottles.backend.managers import dedup as dedup_module
+from bottles.backend.managers.dedup import DedupManager
+from bottles.backend.models.config import BottleConfig
+
+DLL = b"MZ" + bytes(range(256)) * 512
+
+
+def fake_reflink(src_fd, dst_fd):
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    while chunk := os.read(src_fd, 65536):
+        os.write(dst_fd, chunk)
+
+
+def fake_dedupe_range(src_fd, dst_fd, length):
+    src = os.pread(src_fd, length, 0)
+    return length if src == os.pread(dst_fd, length, 0) else 0
+
+
+@pytest.fixture
+def bottles(monkeypatch, tmp_path):
+    monkeypatch.setattr(dedup_module.Paths, "bottles", str(tmp_path / "bottles"))
+    for name, extra in (("One", b""), ("Two", b""), ("Three", b"patched")):
+        system32 = tmp_path / "bottles" / name / "drive_c" / "windows" / "system32"
+        system32.mkdir(parents=True)
+        (system32 / "d3d9.dll").write_bytes(DLL + extra)
+        (system32 / "small.dll").write_bytes(b"MZ")
+    return {
+        name: BottleConfig(Name=name, Path=name, Custom_Path=False)
+        for name in ("One", "Two", "Three")
+    }
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    monkeypatch.setattr(dedup_module, "reflink", fake_reflink)
+    monkeypatch.setattr(dedup_module, "dedupe_range", fake_dedupe_range)
+
+
+def test_dedup_shares_identical_files(shared, bottles, tmp_path):
+    manager = DedupManager(store=str(tmp_path / "store"))
+
+    first = manager.dedup(bottles["One"]).data
+    second = manager.dedup(bottles["Two"]).data
+    third = manager.dedup(bottles["Three"]).data
+    again = manager.dedup(bottles["Two"]).data
+
+    assert (first.files, first.new_objects, first.deduplicated) == (1, 1, 0)
+    assert (second.new_objects, second.deduplicated) == (0, 1)
+    assert second.bytes_saved == len(DLL)
+    assert (third.new_objects, third.deduplicated) == (1, 0)
+    # unchanged files are not hashed again
+    assert (again.files, again.deduplicated, again.new_objects) == (1, 0, 0)
+    objects = list((tmp_path / "store" / "objects").rglob("*"))
+    assert len([o for o in objects if o.is_file()]) == 2
+
+
+def test_release_rehydrate_and_gc(monkeypatch, shared, bottles, tmp_path):
+    manager = DedupManager(store=str(tmp_path / "store"))
+    for config in bottles.values():
+        manager.dedup(config)
+    monkeypatch.setattr(dedup_module.time, "time", lambda: 2**40)
+
+    manager.release(bottles["Three"])
+    assert manager.gc() == len(DLL) + len(b"patched")
+
+    dll = tmp_path / "bottles" / "One" / "drive_c" / "windows" / "system32" / "d3d9.dll"
+    inode = dll.stat().st_ino
+    result = manager.rehydrate(bottles["One"])
+    assert result.ok and result.data == 1
+    assert dll.read_bytes() == DLL
+    assert dll.stat().st_ino != inode
+
+    manager.release(bottles["Two"])
+    assert manager.gc() == len(DLL)
+
+
+def test_dedup_reports_unsupported_filesystems(monkeypatch, bottles, tmp_path):
+    def unsupported(*_args):
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    monkeypatch.setattr(dedup_module, "reflink", unsupported)
+    manager = DedupManager(store=str(tmp_path / "store"))
+
+    result = manager.dedup(bottles["One"])
+
+    assert not result.ok
+    assert not (tmp_path / "store" / "refs").exists()
@@ -15,9 +15,14 @@ def test_reinstall_records_manifest_uninstaller():
         else:
             config[key] = value
 
+    def update_config_many(config, updates):
+        for key, value, *scope in updates:
+            update_config(config, key, value, *scope)
+
     dependency_manager = DependencyManager.__new__(DependencyManager)
     dependency_manager._DependencyManager__manager = SimpleNamespace(
         update_config=update_config,
+        update_config_many=update_config_many,
         versioning_manager=SimpleNamespace(create_state=lambda **_kwargs: None),
         supported_dependencies={},
     )
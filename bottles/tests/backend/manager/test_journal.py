@@ -0,0 +1,68 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from bottles.backend.managers.journal import JournalManager, JournalSeverity
+from bottles.backend.utils import yaml
+
+
+@pytest.fixture
+def journal(monkeypatch, tmp_path):
+    JournalManager.close()
+    monkeypatch.setattr(JournalManager, "path", str(tmp_path / "journal.sqlite"))
+    monkeypatch.setattr(JournalManager, "legacy_path", str(tmp_path / "journal.yml"))
+    monkeypatch.setattr(JournalManager, "_last_cleanup", 0.0)
+    yield tmp_path
+    JournalManager.close()
+
+
+def write_legacy(path, **ages):
+    events = {}
+    for event_id, age in ages.items():
+        timestamp = (datetime.now() - age).strftime("%Y-%m-%d %H:%M:%S")
+        events[event_id] = {
+            "severity": "info",
+            "message": event_id,
+            "timestamp": timestamp,
+        }
+    with open(path / "journal.yml", "w") as f:
+        yaml.dump(events, f)
+    return events
+
+
+def test_write_and_get_by_period(journal):
+    JournalManager.write(JournalSeverity.WARNING, "first")
+    JournalManager.write("unknown", "second")
+
+    events = JournalManager.get(period="today")
+
+    assert [e["message"] for e in events.values()] == ["second", "first"]
+    assert [e["severity"] for e in events.values()] == ["info", "warning"]
+    event_id = next(iter(events))
+    assert JournalManager.get_event(event_id) == events[event_id]
+    assert JournalManager.get(period="yesterday") == {}
+    assert "first" in JournalManager.get(period="all", plain=True)
+
+
+def test_migrates_yaml_journal(journal):
+    legacy = write_legacy(journal, old=timedelta(days=40), week=timedelta(days=3))
+
+    assert list(JournalManager.get(period="all")) == ["week", "old"]
+    assert list(JournalManager.get(period="week")) == ["week"]
+    assert JournalManager.first_event_date() == datetime.strptime(
+        legacy["old"]["timestamp"], "%Y-%m-%d %H:%M:%S"
+    )
+    assert not (journal / "journal.yml").exists()
+    assert (journal / "journal.yml.migrated").exists()
+
+
+def test_write_removes_old_events_in_background(journal):
+    write_legacy(journal, old=timedelta(days=40))
+
+    JournalManager.write(JournalSeverity.ERROR, "new")
+
+    deadline = time.monotonic() + 5
+    while "old" in JournalManager.get(period="all") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [e["message"] for e in JournalManager.get(period="all").values()] == ["new"]
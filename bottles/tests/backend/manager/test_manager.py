@@ -1,15 +1,21 @@
 """Core Manager tests"""
 
 import contextlib
+import hashlib
+import os
+import threading
+import time
 from pathlib import Path
 from threading import Event
 from types import SimpleNamespace
 
 import pytest
 
+from bottles.backend.managers import dedup as dedup_module
 from bottles.backend.managers import manager as manager_module
 from bottles.backend.managers import steam as steam_module
 from bottles.backend.managers.data import DataManager, UserDataKeys
+from bottles.backend.managers.dedup import DedupManager
 from bottles.backend.managers.manager import Manager
 from bottles.backend.managers.steam import SteamManager
 from bottles.backend.models.config import BottleConfig
@@ -81,6 +87,40 @@ def test_delete_sandboxed_bottle_does_not_restart_wine(
     signal_send.assert_not_called()
 
 
+def test_delete_bottle_frees_its_deduplicated_files(mocker, monkeypatch, tmp_path):
+    def reflink(src_fd, dst_fd):
+        os.lseek(src_fd, 0, os.SEEK_SET)
+        os.write(dst_fd, os.read(src_fd, 1024**2))
+
+    monkeypatch.setattr(dedup_module, "reflink", reflink)
+    monkeypatch.setattr(dedup_module, "dedupe_range", lambda *args: args[2])
+    monkeypatch.setattr(manager_module.Paths, "bottles", str(tmp_path / "bottles"))
+    monkeypatch.setattr(manager_module.Paths, "dedup", str(tmp_path / "dedup"))
+    monkeypatch.setattr(
+        manager_module.Paths, "applications", str(tmp_path / "applications")
+    )
+    mocker.patch.object(manager_module, "WineBoot")
+    mocker.patch.object(manager_module, "WineServer")
+    mocker.patch.object(manager_module, "LibraryManager")
+    configs = {}
+    for name, dll in (("One", b"shared"), ("Two", b"shared"), ("Three", b"own")):
+        system32 = tmp_path / "bottles" / name / "drive_c" / "windows" / "system32"
+        system32.mkdir(parents=True)
+        (system32 / "d3d9.dll").write_bytes(dll * 65536)
+        configs[name] = BottleConfig(Name=name, Path=name, Runner="soda-11.0-5")
+        assert DedupManager().dedup(configs[name]).ok
+    objects = tmp_path / "dedup" / "objects"
+    assert len([o for o in objects.rglob("*") if o.is_file()]) == 2
+    manager = object.__new__(Manager)
+    manager.check_bottles = mocker.Mock()
+
+    assert manager.delete_bottle(configs["Three"]) is True
+    assert manager.delete_bottle(configs["One"]) is True
+
+    remaining = [o.name for o in objects.rglob("*") if o.is_file()]
+    assert remaining == [hashlib.sha256(b"shared" * 65536).hexdigest()]
+
+
 def test_check_runners_discovers_external_steam_proton(tmp_path, monkeypatch):
     runners = tmp_path / "runners"
     (runners / "soda-11.0").mkdir(parents=True)
@@ -666,3 +706,217 @@ def test_get_programs_can_refresh_cached_results(monkeypatch):
 
     assert Manager.get_programs(manager, config) is cached
     assert Manager.get_programs(manager, config, force_update=True) == []
+
+
+def test_check_bottles_loads_bottles_concurrently_in_folder_order(
+    mocker, monkeypatch, tmp_path
+):
+    bottles_path = tmp_path / "bottles"
+    names = [f"Bottle {i:02d}" for i in range(20)]
+    for name in reversed(names):
+        bottle_path = bottles_path / name
+        bottle_path.mkdir(parents=True)
+        BottleConfig(Name=name, Path=name, Runner="soda-11.0-1").dump(
+            str(bottle_path / "bottle.yml")
+        )
+    (bottles_path / "Broken").mkdir()
+
+    manager = object.__new__(Manager)
+    manager.runners_available = ["soda-11.0-1"]
+    manager.settings = GSettingsStub()
+    manager.is_cli = True
+    manager.steam_manager = mocker.Mock(is_steam_supported=False)
+    monkeypatch.setattr(Manager, "check_bottles_workers", 4)
+    monkeypatch.setattr(manager_module.Paths, "bottles", str(bottles_path))
+
+    manager.check_bottles(silent=True)
+
+    assert list(manager.local_bottles) == names
+    assert (bottles_path / names[0] / "cache" / "dxvk_shader").is_dir()
+
+
+def _config_writer(mocker, monkeypatch, tmp_path):
+    manager = object.__new__(Manager)
+    manager.steam_manager = mocker.Mock()
+    monkeypatch.setattr(manager_module.Paths, "bottles", str(tmp_path))
+    (tmp_path / "Test").mkdir()
+    apply_rules = mocker.patch.object(manager_module.RegistryRuleManager, "apply_rules")
+    dump = mocker.spy(BottleConfig, "dump")
+    return manager, apply_rules, dump
+
+
+def test_update_config_many_writes_config_once(mocker, monkeypatch, tmp_path):
+    manager, apply_rules, dump = _config_writer(mocker, monkeypatch, tmp_path)
+    config = BottleConfig(Name="Test", Path="Test")
+
+    result = manager.update_config_many(
+        config,
+        [
+            ("DXVK", "dxvk-2.4"),
+            ("dxvk", True, "Parameters"),
+            ("vcredist2019", "NO_UNINSTALLER", "Uninstallers"),
+        ],
+    )
+
+    assert result.ok
+    assert dump.call_count == 1
+    apply_rules.assert_called_once_with(config, trigger="components")
+    persisted = BottleConfig.load(str(tmp_path / "Test" / "bottle.yml")).data
+    assert persisted.DXVK == "dxvk-2.4"
+    assert persisted.Parameters.dxvk is True
+    assert persisted.Uninstallers == {"vcredist2019": "NO_UNINSTALLER"}
+
+
+def test_batch_config_collects_update_config_calls(mocker, monkeypatch, tmp_path):
+    manager, apply_rules, dump = _config_writer(mocker, monkeypatch, tmp_path)
+    config = BottleConfig(Name="Test", Path="Test")
+
+    with manager.batch_config(config):
+        manager.update_config(config, "Windows", "win7")
+        with manager.batch_config(config):
+            manager.update_config(config, "fsr", True, scope="Parameters")
+        assert dump.call_count == 0
+
+    assert dump.call_count == 1
+    apply_rules.assert_not_called()
+
+
+def test_debounced_update_config_is_written_on_flush(mocker, monkeypatch, tmp_path):
+    manager, _apply_rules, dump = _config_writer(mocker, monkeypatch, tmp_path)
+    monkeypatch.setattr(Manager, "config_write_delay", 60)
+    config = BottleConfig(Name="Test", Path="Test")
+
+    for value in range(10):
+        manager.update_config(
+            config, "frame_rate_limit", value, scope="Parameters", debounce=True
+        )
+    assert dump.call_count == 0
+
+    manager.flush_config_writes()
+
+    assert dump.call_count == 1
+    persisted = BottleConfig.load(str(tmp_path / "Test" / "bottle.yml")).data
+    assert persisted.Parameters.frame_rate_limit == 9
+    assert Manager._deferred_timer is None
+
+
+def test_debounced_configs_with_the_same_name_are_all_written(
+    mocker, monkeypatch, tmp_path
+):
+    manager, _apply_rules, dump = _config_writer(mocker, monkeypatch, tmp_path)
+    monkeypatch.setattr(Manager, "config_write_delay", 60)
+    (tmp_path / "Other").mkdir()
+    configs = [
+        BottleConfig(Name="Test", Path="Test"),
+        BottleConfig(Name="Test", Path="Other"),
+    ]
+
+    for value, config in enumerate(configs):
+        manager.update_config(config, "Windows", f"win{value}", debounce=True)
+    manager.flush_config_writes()
+
+    assert dump.call_count == 2
+    for value, path in enumerate(["Test", "Other"]):
+        persisted = BottleConfig.load(str(tmp_path / path / "bottle.yml")).data
+        assert persisted.Windows == f"win{value}"
+
+
+def test_debounced_update_config_reacts_on_the_calling_thread(
+    mocker, monkeypatch, tmp_path
+):
+    manager, apply_rules, dump = _config_writer(mocker, monkeypatch, tmp_path)
+    monkeypatch.setattr(Manager, "config_write_delay", 60)
+    config = BottleConfig(Name="Test", Path="Test", Environment="Steam")
+    threads = []
+    apply_rules.side_effect = lambda *_args, **_kwargs: threads.append(
+        threading.current_thread()
+    )
+
+    manager.update_config(config, "DXVK", "dxvk-2.4", debounce=True)
+
+    assert threads == [threading.current_thread()]
+    manager.steam_manager.update_bottle.assert_called_once_with(config)
+    assert dump.call_count == 0
+
+    manager.flush_config_writes()
+
+    assert dump.call_count == 1
+    apply_rules.assert_called_once_with(config, trigger="components")
+    manager.steam_manager.update_bottle.assert_called_once_with(config)
+
+
+def test_checks_load_bottles_after_runners_and_report_progress():
+    manager = object.__new__(Manager)
+    finished = []
+
+    def check(name, result=True):
+        def run(*_args):
+            finished.append(name)
+            return result
+
+        return run
+
+    for name in (
+        "check_app_dirs",
+        "check_d7vk",
+        "check_dxvk",
+        "check_vkd3d",
+        "check_nvapi",
+        "check_latencyflex",
+        "check_runtimes",
+        "check_winebridge",
+        "check_runners",
+        "check_bottles",
+        "organize_dependencies",
+        "organize_installers",
+    ):
+        setattr(manager, name, check(name, result=name != "check_nvapi"))
+    progress = []
+
+    result = manager.checks(progress_callback=lambda **kwargs: progress.append(kwargs))
+
+    assert finished[0] == "check_app_dirs"
+    assert finished.index("check_bottles") > finished.index("check_runners")
+    assert result.status is False  # check_nvapi failed
+    assert set(result.data) == {n for n in finished if n.startswith("check_")}
+    assert [p for p in progress if p["completed"]][-1]["current_step"] == 12
+    assert all(p["total_steps"] == 12 for p in progress)
+    assert manager.checks_report.critical_path()[-1].name in finished
+
+
+def test_checks_organize_catalogs_after_cleaning_temp():
+    manager = object.__new__(Manager)
+    manager.settings = GSettingsStub()
+    finished = []
+
+    def check(name):
+        def run(*_args):
+            finished.append(name)
+            return True
+
+        return run
+
+    for name in (
+        "check_app_dirs",
+        "check_d7vk",
+        "check_dxvk",
+        "check_vkd3d",
+        "check_nvapi",
+        "check_latencyflex",
+        "check_runtimes",
+        "check_winebridge",
+        "check_runners",
+        "check_bottles",
+        "organize_components",
+        "organize_dependencies",
+        "organize_installers",
+    ):
+        setattr(manager, name, check(name))
+    clear_temp = check("clear_temp")
+    manager._Manager__clear_temp = lambda: time.sleep(0.05) or clear_temp()
+
+    assert manager.checks(first_run=True).status
+
+    for name in ("organize_components", "organize_dependencies", "organize_installers"):
+        assert finished.index(name) > finished.index("clear_temp")
+    assert finished.index("clear_temp") > finished.index("check_app_dirs")
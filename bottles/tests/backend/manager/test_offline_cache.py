@@ -740,7 +740,7 @@ def test_cached_dependency_installs_without_network(tmp_path, monkeypatch):
     manager = SimpleNamespace(
         component_manager=component_manager,
         supported_dependencies={},
-        update_config=lambda *_args, **_kwargs: None,
+        update_config_many=lambda *_args, **_kwargs: None,
     )
     dependency_manager = object.__new__(DependencyManager)
     dependency_manager._DependencyManager__manager = manager
@@ -0,0 +1,303 @@
+import threading
+import time
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pycurl
+import pytest
+
+from bottles.backend.globals import Paths
+from bottles.backend.managers import repository as repository_module
+from bottles.backend.managers.dependency import DependencyManager
+from bottles.backend.managers.repository import RepositoryManager
+from bottles.backend.repos import repo as repo_module
+from bottles.backend.repos.cache import CompiledCatalog
+from bottles.backend.repos.component import ComponentRepo
+from bottles.backend.repos.dependency import DependencyRepo
+
+MANIFEST = b"Name: example\nSteps: []\n"
+CATALOG = b"example:\n  Category: Misc\n"
+
+
+class Handler(BaseHTTPRequestHandler):
+    files: dict = {}
+    requests: list = []
+    delay = 0.0
+
+    def do_GET(self):
+        self.requests.append((self.path, dict(self.headers)))
+        time.sleep(self.delay)
+        if self.path not in self.files:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body, validators = self.files[self.path]
+        etag = validators.get("ETag")
+        modified = validators.get("Last-Modified")
+        if (etag and self.headers.get("If-None-Match") == etag) or (
+            modified and self.headers.get("If-Modified-Since") == modified
+        ):
+            self.send_response(304)
+            for name, value in validators.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        for name, value in validators.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    request_queue_size = 32  # the default backlog delays parallel connects
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    monkeypatch.setattr(Paths, "temp", str(tmp_path))
+    monkeypatch.setattr(Handler, "files", {})
+    monkeypatch.setattr(Handler, "requests", [])
+    monkeypatch.setattr(Handler, "delay", 0.0)
+    httpd = Server(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_repo(url, catalog=None):
+    repo = object.__new__(DependencyRepo)
+    repo.url = url
+    repo.cache_url = url
+    repo.offline = False
+    repo.catalog = catalog
+    return repo
+
+
+def conditions():
+    return [
+        {k: v for k, v in headers.items() if k.startswith("If-")}
+        for _path, headers in Handler.requests
+    ]
+
+
+def test_unchanged_manifest_is_revalidated_with_its_etag(server):
+    Handler.files["/Misc/example.yml"] = (MANIFEST, {"ETag": '"v1"'})
+    repo = make_repo(server)
+    url = f"{server}Misc/example.yml"
+
+    assert repo.get_manifest(url) == {"Name": "example", "Steps": []}
+    assert repo.get_manifest(url) == {"Name": "example", "Steps": []}
+    assert repo.get_manifest(url, plain=True) == MANIFEST.decode()
+
+    assert conditions() == [{}, {"If-None-Match": '"v1"'}, {"If-None-Match": '"v1"'}]
+
+
+def test_catalog_is_revalidated_with_last_modified(server):
+    modified = "Wed, 01 Oct 2025 10:00:00 GMT"
+    Handler.files["/index.yml"] = (CATALOG, {"Last-Modified": modified})
+    repo = make_repo(server)
+
+    catalog = repo._Repo__get_catalog(f"{server}index.yml")
+    assert repo._Repo__get_catalog(f"{server}index.yml") == catalog
+    assert catalog == {"example": {"Category": "Misc"}}
+
+    assert conditions() == [{}, {"If-Modified-Since": modified}]
+
+
+def test_changed_manifest_replaces_the_cached_copy(server):
+    Handler.files["/Misc/example.yml"] = (MANIFEST, {"ETag": '"v1"'})
+    repo = make_repo(server)
+    url = f"{server}Misc/example.yml"
+    repo.get_manifest(url)
+
+    Handler.files["/Misc/example.yml"] = (b"Name: changed\n", {"ETag": '"v2"'})
+    assert repo.get_manifest(url) == {"Name": "changed"}
+    assert repo.get_manifest(url) == {"Name": "changed"}
+
+    assert conditions()[1:] == [{"If-None-Match": '"v1"'}, {"If-None-Match": '"v2"'}]
+
+
+def test_modified_cached_copy_is_not_revalidated(server):
+    Handler.files["/Misc/example.yml"] = (MANIFEST, {"ETag": '"v1"'})
+    repo = make_repo(server)
+    url = f"{server}Misc/example.yml"
+    repo.get_manifest(url)
+
+    cache_name = sha256(url.encode()).hexdigest()
+    cache_path = repo._Repo__get_cache_path(f"{cache_name}.yml")
+    with open(cache_path, "wb") as f:
+        f.write(b"Name: tampered\n")
+
+    assert repo.get_manifest(url) == {"Name": "example", "Steps": []}
+    assert conditions() == [{}, {}]
+
+
+def test_repository_index_reuses_the_unchanged_catalog(monkeypatch, server):
+    Handler.files["/64.1.yml"] = (CATALOG, {"ETag": '"index"'})
+    monkeypatch.setenv("PERSONAL_COMPONENTS", server)
+    monkeypatch.setattr(
+        repository_module,
+        "DataManager",
+        lambda: SimpleNamespace(get=lambda _key: {}),
+    )
+    monkeypatch.setattr(repository_module.SignalManager, "connect", lambda *_a: None)
+    monkeypatch.setattr(repository_module.SignalManager, "send", lambda *_a: None)
+    monkeypatch.setattr(repository_module, "APP_VERSION", "64.1")
+    monkeypatch.setattr(
+        repository_module,
+        "RunAsync",
+        lambda task_func, **kwargs: (
+            task_func(**kwargs) or SimpleNamespace(join=lambda: None)
+        ),
+    )
+
+    def load_index():
+        manager = RepositoryManager(get_index=False)
+        repositories = manager._RepositoryManager__repositories
+        manager._RepositoryManager__repositories = {
+            "components": repositories["components"]
+        }
+        manager._RepositoryManager__get_index()
+        return manager
+
+    load_index().get_repo("components", callback_in_main_loop=False)
+
+    parsed = []
+    load = repository_module.yaml.load
+    monkeypatch.setattr(
+        repository_module.yaml, "load", lambda data: parsed.append(data) or load(data)
+    )
+    manager = load_index()
+    repository = manager._RepositoryManager__repositories["components"]
+
+    assert conditions() == [{}, {"If-None-Match": '"index"'}]
+    assert repository["catalog"] == CATALOG
+    assert parsed == []
+    repo = manager.get_repo("components", callback_in_main_loop=False)
+    assert repo.catalog == {"example": {"Category": "Misc"}}
+
+
+COMPONENTS = (
+    b"caffe-7.20:\n  Category: runners\n  Sub-category: wine\n  Channel: stable\n"
+    b"dxvk-2.3:\n  Category: dxvk\n  Channel: stable\n"
+    b"broken:\n  Category: dxvk\n"
+)
+
+
+def test_unchanged_catalog_is_loaded_without_parsing(monkeypatch, tmp_path):
+    monkeypatch.setattr(Paths, "temp", str(tmp_path))
+    repo = object.__new__(ComponentRepo)
+    repo.url = repo.cache_url = "https://example.invalid/components/"
+    repo.catalog = repo._Repo__parse_catalog(COMPONENTS)
+    classified = {"wine": ["caffe-7.20"], "dxvk": ["dxvk-2.3"]}
+    assert repo.classified == classified
+
+    def fail(*_args):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(repo_module.yaml, "load", fail)
+    monkeypatch.setattr(ComponentRepo, "classify", staticmethod(fail))
+    loaded = object.__new__(ComponentRepo)
+    loaded.url = loaded.cache_url = repo.url
+    loaded.catalog = loaded._Repo__parse_catalog(COMPONENTS)
+
+    assert loaded.catalog == repo.catalog
+    assert loaded.classified == classified
+
+
+def test_changed_or_outdated_compiled_catalog_is_rebuilt(monkeypatch, tmp_path):
+    monkeypatch.setattr(Paths, "temp", str(tmp_path))
+    repo = object.__new__(ComponentRepo)
+    repo.url = repo.cache_url = "https://example.invalid/components/"
+    repo._Repo__parse_catalog(COMPONENTS)
+    compiled = repo._Repo__get_cache_path("catalog.yml") + CompiledCatalog.suffix
+
+    changed = COMPONENTS + b"vkd3d-2.11:\n  Category: vkd3d\n  Channel: stable\n"
+    repo.catalog = repo._Repo__parse_catalog(changed)
+    assert repo.classified["vkd3d"] == ["vkd3d-2.11"]
+
+    monkeypatch.setattr(CompiledCatalog, "schema", CompiledCatalog.schema + 1)
+    with open(compiled, "r+b") as f:
+        f.write(b"\0")
+    repo.catalog = repo._Repo__parse_catalog(changed)
+    assert repo.classified["vkd3d"] == ["vkd3d-2.11"]
+    assert CompiledCatalog.load(compiled[: -len(CompiledCatalog.suffix)], changed)
+
+
+def dependency(*dependencies):
+    listed = "".join(f"  - {name}\n" for name in dependencies)
+    return f"Dependencies:\n{listed}Steps: []\n".encode() if listed else MANIFEST
+
+
+def test_manifests_are_fetched_together(server):
+    Handler.delay = 0.3
+    names = [f"dependency-{i}" for i in range(6)]
+    for name in names:
+        Handler.files[f"/Misc/{name}.yml"] = (MANIFEST, {"ETag": f'"{name}"'})
+    catalog = {name: {"Category": "Misc"} for name in [*names, "missing"]}
+    repo = make_repo(server.rstrip("/"), catalog)
+
+    start = time.monotonic()
+    manifests = repo.get_manifests([*names, "missing", "unknown"])
+    assert time.monotonic() - start < 0.3 * len(names) / 2
+
+    assert manifests == {name: {"Name": "example", "Steps": []} for name in names}
+    Handler.delay = 0.0
+    assert repo.get_manifests(names[:1]) == {names[0]: manifests[names[0]]}
+    assert conditions()[-1] == {"If-None-Match": '"dependency-0"'}
+
+    repo.offline = True
+    assert repo.get_manifests(names) == manifests
+
+
+def test_manifests_are_fetched_one_by_one_when_the_multi_handle_fails(
+    monkeypatch, server
+):
+    class BrokenMulti:
+        def __getattr__(self, _name):
+            return lambda *_args: None
+
+        def perform(self):
+            raise pycurl.error(pycurl.E_OUT_OF_MEMORY, "broken")
+
+    names = ["first", "second"]
+    for name in names:
+        Handler.files[f"/Misc/{name}.yml"] = (MANIFEST, {})
+    repo = make_repo(server.rstrip("/"), {name: {"Category": "Misc"} for name in names})
+    monkeypatch.setattr(pycurl, "CurlMulti", BrokenMulti)
+
+    manifests = repo.get_manifests(names)
+
+    assert manifests == {name: {"Name": "example", "Steps": []} for name in names}
+
+
+def test_prefetch_resolves_the_dependency_tree(server):
+    files = {"a": ("b", "c"), "b": ("c", "a"), "c": (), "unused": ()}
+    for name, dependencies in files.items():
+        Handler.files[f"/Misc/{name}.yml"] = (dependency(*dependencies), {})
+    catalog = {name: {"Category": "Misc"} for name in files}
+    manager = object.__new__(DependencyManager)
+    manager._DependencyManager__repo = make_repo(server.rstrip("/"), catalog)
+    manager._DependencyManager__manifests = {}
+
+    manifests = manager.prefetch(["a"])
+
+    assert sorted(manifests) == ["a", "b", "c"]
+    assert sorted(path for path, _headers in Handler.requests) == [
+        "/Misc/a.yml",
+        "/Misc/b.yml",
+        "/Misc/c.yml",
+    ]
+    assert manager.get_dependency("b") is manifests["b"]
+    assert manager.prefetch(["b"]) == manifests
+    assert len(Handler.requests) == 3
@@ -1,3 +1,4 @@
+import os
 from io import StringIO
 
 import pytest
@@ -67,3 +68,36 @@ def test_load_discards_legacy_component_update_preference():
 
     assert result.ok
     assert "show_component_updates" not in result.data.Parameters
+
+
+def _dump_old(config, path):
+    assert config.dump(str(path)).status is True
+    old = 1_000_000_000
+    os.utime(path, ns=(old, old))
+
+
+def test_load_reuses_parsed_config_until_file_changes(tmp_path):
+    BottleConfig.cache_clear()
+    path = tmp_path / "bottle.yml"
+    _dump_old(BottleConfig(Name="Cached"), path)
+
+    first = BottleConfig.load(str(path)).data
+    first.Name = "Changed in memory"
+    second = BottleConfig.load(str(path)).data
+
+    assert second.Name == "Cached"
+    assert BottleConfig.cache_info() == {"hits": 1, "misses": 1, "size": 1}
+
+    _dump_old(BottleConfig(Name="Dumped"), path)
+
+    assert BottleConfig.cache_info()["size"] == 0
+    assert BottleConfig.load(str(path)).data.Name == "Dumped"
+
+
+def test_load_does_not_cache_recently_modified_files(tmp_path):
+    BottleConfig.cache_clear()
+    path = tmp_path / "bottle.yml"
+    BottleConfig(Name="Fresh").dump(str(path))
+
+    assert BottleConfig.load(str(path)).data.Name == "Fresh"
+    assert BottleConfig.cache_info()["size"] == 0
@@ -1,8 +1,10 @@
 import logging
+import threading
+import time
 
 import pytest
 
-from bottles.backend.logger import Logger
+from bottles.backend.logger import AsyncLogWriter, Logger
 
 
 @pytest.fixture(autouse=True)
@@ -28,3 +30,77 @@ def test_log_level_environment(monkeypatch, value, expected):
     Logger()
 
     assert logging.getLogger().level == expected
+
+
+class Collect(logging.Handler):
+    def __init__(self, gate=None):
+        super().__init__()
+        self.gate = gate
+        self.messages = []
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def writer():
+    writer = AsyncLogWriter(maxsize=8)
+    writer.handler = Collect()
+    yield writer
+    writer.stop()
+
+
+def record(message):
+    return logging.makeLogRecord({"msg": message, "levelno": logging.INFO})
+
+
+def test_async_writer_coalesces_repeated_records(writer):
+    writer.start()
+    for _ in range(5):
+        writer.put_nowait(record("same"))
+    writer.put_nowait(record("other"))
+
+    assert writer.flush()
+    assert writer.handler.messages == [
+        "same",
+        "Last message repeated 4 more times",
+        "other",
+    ]
+
+
+def test_async_writer_drops_records_when_full(writer):
+    gate = threading.Event()
+    writer.handler = Collect(gate)
+    writer.start()
+
+    writer.put_nowait(record("busy"))
+    while not writer.queue.empty():
+        time.sleep(0.01)
+    for i in range(11):
+        writer.put_nowait(record(f"message {i}"))
+    gate.set()
+
+    assert writer.flush()
+    assert writer.handler.messages == [
+        "busy",
+        "3 log messages were dropped",
+        *(f"message {i}" for i in range(8)),
+    ]
+
+
+def test_async_writer_writes_journal_events(monkeypatch, writer):
+    written = []
+    monkeypatch.setattr(
+        "bottles.backend.logger.JournalManager.write",
+        lambda severity, message: written.append((severity, message)),
+    )
+
+    writer.journal("warning", "queued")
+    assert written == [("warning", "queued")]
+
+    writer.start()
+    writer.journal("error", "threaded")
+    assert writer.flush()
+    assert written == [("warning", "queued"), ("error", "threaded")]
@@ -0,0 +1,133 @@
+import errno
+import os
+import shutil
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from bottles.backend.utils import clone as clone_module
+from bottles.backend.utils.clone import CloneStrategy, TreeCloner
+
+
+@pytest.fixture
+def tree(tmp_path):
+    source = tmp_path / "template"
+    system32 = source / "drive_c" / "windows" / "system32"
+    system32.mkdir(parents=True)
+    (system32 / "kernel32.dll").write_bytes(b"MZ" + bytes(range(256)) * 64)
+    (system32 / "empty.dll").write_bytes(b"")
+    (source / "system.reg").write_text("WINE REGISTRY Version 2\n")
+    (source / ".hidden").write_text("skip me")
+    (source / "dosdevices").mkdir()
+    os.symlink("../drive_c", source / "dosdevices" / "c:")
+    return source
+
+
+def unsupported(*_args):
+    raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+
+def test_clone_copies_tree_and_reports(tree, tmp_path):
+    dest = tmp_path / "bottle"
+
+    report = TreeCloner(ignore=shutil.ignore_patterns(".*")).clone(str(tree), str(dest))
+
+    dll = "drive_c/windows/system32/kernel32.dll"
+    assert (dest / dll).read_bytes() == (tree / dll).read_bytes()
+    assert (dest / "drive_c/windows/system32/empty.dll").read_bytes() == b""
+    assert os.readlink(dest / "dosdevices" / "c:") == "../drive_c"
+    assert not (dest / ".hidden").exists()
+    assert (dest / dll).stat().st_mtime == (tree / dll).stat().st_mtime
+    assert report.files == 3
+    assert report.bytes == sum(
+        (tree / p).stat().st_size
+        for p in (dll, "drive_c/windows/system32/empty.dll", "system.reg")
+    )
+    assert report.strategy in (CloneStrategy.REFLINK, CloneStrategy.COPY_RANGE)
+
+
+def test_clone_falls_back_when_kernel_copies_fail(monkeypatch, tree, tmp_path):
+    monkeypatch.setattr(clone_module.fcntl, "ioctl", unsupported)
+    monkeypatch.setattr(clone_module.os, "copy_file_range", unsupported)
+    monkeypatch.setattr(clone_module.os, "sendfile", unsupported)
+
+    report = TreeCloner().clone(str(tree), str(tmp_path / "bottle"))
+
+    assert report.strategy == CloneStrategy.COPY
+    dll = "drive_c/windows/system32/kernel32.dll"
+    assert (tmp_path / "bottle" / dll).read_bytes() == (tree / dll).read_bytes()
+
+
+def test_clone_never_writes_through_existing_files(tree, tmp_path):
+    dest = tmp_path / "bottle"
+    (dest / "drive_c").mkdir(parents=True)
+    shared = tmp_path / "shared.reg"
+    shared.write_text("shared")
+    os.link(shared, dest / "system.reg")
+
+    TreeCloner().clone(str(tree), str(dest), dirs_exist_ok=True)
+
+    assert shared.read_text() == "shared"
+    assert (dest / "system.reg").read_text() == "WINE REGISTRY Version 2\n"
+
+    with pytest.raises(FileExistsError):
+        TreeCloner().clone(str(tree), str(dest))
+
+
+def test_clone_reports_progress_and_keeps_holes(monkeypatch, tree, tmp_path):
+    monkeypatch.setattr(clone_module.fcntl, "ioctl", unsupported)
+    sparse = tree / "drive_c" / "pagefile.sys"
+    with open(sparse, "wb") as f:
+        f.write(b"head")
+        f.seek(32 * 1024 * 1024)
+        f.write(b"tail")
+        f.truncate(64 * 1024 * 1024)
+    progress = []
+
+    TreeCloner(progress=lambda done, total: progress.append((done, total))).clone(
+        str(tree), str(tmp_path / "bottle")
+    )
+
+    copy = tmp_path / "bottle" / "drive_c" / "pagefile.sys"
+    assert copy.stat().st_size == sparse.stat().st_size
+    with open(copy, "rb") as f:
+        assert f.read(4) == b"head"
+        f.seek(32 * 1024 * 1024)
+        assert f.read(4) == b"tail"
+    if sparse.stat().st_blocks * 512 < sparse.stat().st_size:
+        assert copy.stat().st_blocks * 512 < copy.stat().st_size
+    done, total = progress[-1]
+    assert total == sum(p.stat().st_size for p in tree.rglob("*") if p.is_file())
+    assert done == total
+    assert [d for d, _total in progress] == sorted(d for d, _total in progress)
+
+
+def test_clone_stops_when_cancelled(tree, tmp_path):
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(CancelledError):
+        TreeCloner(cancel_event=cancel).clone(str(tree), str(tmp_path / "bottle"))
+
+
+def test_clone_finishes_short_kernel_copies(monkeypatch, tree, tmp_path):
+    monkeypatch.setattr(clone_module.fcntl, "ioctl", unsupported)
+    monkeypatch.setattr(clone_module.os, "copy_file_range", lambda *_args: 0)
+
+    report = TreeCloner().clone(str(tree), str(tmp_path / "bottle"))
+
+    dll = "drive_c/windows/system32/kernel32.dll"
+    assert (tmp_path / "bottle" / dll).read_bytes() == (tree / dll).read_bytes()
+    assert CloneStrategy.COPY in report.strategies
+
+
+def test_clone_fails_when_a_file_shrinks(monkeypatch, tree, tmp_path):
+    monkeypatch.setattr(clone_module.fcntl, "ioctl", unsupported)
+    monkeypatch.setattr(clone_module.os, "copy_file_range", lambda *_args: 0)
+    monkeypatch.setattr(clone_module.os, "pread", lambda *_args: b"")
+
+    with pytest.raises(shutil.Error) as error:
+        TreeCloner().clone(str(tree), str(tmp_path / "bottle"))
+
+    assert "kernel32.dll" in str(error.value)
@@ -0,0 +1,118 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from bottles.backend.globals import Paths
+from bottles.backend.utils.connection import ConnectionUtils
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def stalled():
+    """A server accepting connections and never answering."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen()
+    yield f"http://127.0.0.1:{sock.getsockname()[1]}/"
+    sock.close()
+
+
+@pytest.fixture
+def conn(monkeypatch, tmp_path):
+    monkeypatch.setattr(Paths, "temp", str(tmp_path))
+    monkeypatch.setattr(ConnectionUtils, "_cache", None)
+    monkeypatch.delenv("FORCE_OFFLINE", raising=False)
+    monkeypatch.setattr(
+        ConnectionUtils,
+        "_ConnectionUtils__monitor_connectivity",
+        staticmethod(lambda: None),
+    )
+    return ConnectionUtils()
+
+
+def test_probe_returns_on_the_first_answer(monkeypatch, conn, server, stalled):
+    monkeypatch.setattr(ConnectionUtils, "_check_urls", (stalled, server))
+
+    start = time.monotonic()
+    assert conn.check_connection() is True
+    assert time.monotonic() - start < 3
+
+
+def test_probe_stops_when_networking_is_stopped(monkeypatch, conn, stalled):
+    monkeypatch.setattr(ConnectionUtils, "_check_urls", (stalled,))
+    threading.Timer(0.3, lambda: setattr(conn, "do_check_connection", False)).start()
+
+    start = time.monotonic()
+    assert conn.check_connection() is False
+    assert time.monotonic() - start < 3
+    assert ConnectionUtils._cache is None
+
+
+def test_result_is_cached_across_instances(monkeypatch, conn, server, tmp_path):
+    monkeypatch.setattr(ConnectionUtils, "_check_urls", (server,))
+    assert conn.check_connection() is True
+    assert (tmp_path / "connection.json").exists()
+
+    def probe(_self):
+        raise AssertionError("the cached result must be used")
+
+    # a new process only has the file
+    monkeypatch.setattr(ConnectionUtils, "_cache", None)
+    monkeypatch.setattr(ConnectionUtils, "_ConnectionUtils__probe", probe)
+    assert ConnectionUtils().check_connection() is True
+
+
+def test_offline_results_expire_sooner(monkeypatch, conn):
+    probes = []
+
+    def probe(_self):
+        probes.append(True)
+        return False
+
+    monkeypatch.setattr(ConnectionUtils, "_ConnectionUtils__probe", probe)
+    assert conn.check_connection() is False
+    assert conn.check_connection() is False
+    assert len(probes) == 1
+
+    monkeypatch.setattr(ConnectionUtils, "cache_ttl", {True: 120, False: 0})
+    assert conn.check_connection() is False
+    assert len(probes) == 2
+
+    ConnectionUtils.clear_cache()
+    assert conn.check_connection(force=True) is False
+    assert len(probes) == 3
+
+
+def test_network_monitor_answers_without_probing(monkeypatch, conn):
+    def probe(_self):
+        raise AssertionError("the network monitor knows")
+
+    monkeypatch.setattr(ConnectionUtils, "_ConnectionUtils__probe", probe)
+    monkeypatch.setattr(
+        ConnectionUtils,
+        "_ConnectionUtils__monitor_connectivity",
+        staticmethod(lambda: True),
+    )
+    assert conn.check_connection() is True
+    assert conn.status is True
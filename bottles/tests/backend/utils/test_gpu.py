@@ -1,8 +1,30 @@
+import pytest
+
 from bottles.backend.utils import gpu as gpu_module
-from bottles.backend.utils.gpu import GPUUtils
+from bottles.backend.utils.gpu import GPUUtils, GPUVendors
 from bottles.backend.utils.vulkan import VulkanUtils
 
 
+@pytest.fixture(autouse=True)
+def fresh_gpu_probe(monkeypatch, tmp_path):
+    # without a readable sysfs the probe falls back to lspci, which the
+    # tests below fake
+    monkeypatch.setattr(GPUUtils, "sysfs_pci_devices", str(tmp_path / "missing"))
+    GPUUtils.refresh()
+    yield
+    GPUUtils.refresh()
+
+
+def make_pci_device(root, address, pci_class, vendor, boot_vga=None):
+    device = root / address
+    device.mkdir(parents=True)
+    (device / "class").write_text(f"0x{pci_class:06x}\n")
+    (device / "vendor").write_text(f"0x{vendor:04x}\n")
+    (device / "device").write_text("0x1234\n")
+    if boot_vga is not None:
+        (device / "boot_vga").write_text(f"{int(boot_vga)}\n")
+
+
 def test_vulkan_detects_nouveau_icds(monkeypatch, tmp_path):
     vulkan_dir = tmp_path / "vulkan"
     icd_dir = vulkan_dir / "icd.d"
@@ -96,3 +118,69 @@ def test_nvidia_gpu_falls_back_to_available_nvk_icd(monkeypatch):
 
     assert nvidia["envs"] == {"DRI_PRIME": "1"}
     assert nvidia["icd"] == "/nouveau_icd.x86_64.json"
+
+
+def test_gpu_topology_is_read_from_sysfs(monkeypatch, tmp_path):
+    root = tmp_path / "devices"
+    make_pci_device(root, "0000:00:02.0", 0x030000, 0x8086, boot_vga=True)
+    make_pci_device(root, "0000:01:00.0", 0x030200, 0x10DE, boot_vga=False)
+    make_pci_device(root, "0000:01:00.1", 0x040300, 0x10DE)
+    make_pci_device(root, "0000:02:00.0", 0x020000, 0x1002)
+    monkeypatch.setattr(GPUUtils, "sysfs_pci_devices", str(root))
+    GPUUtils.refresh()
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("lspci should not be needed")
+
+    monkeypatch.setattr(gpu_module.subprocess, "Popen", fail)
+    monkeypatch.setattr(GPUUtils, "is_nouveau", lambda _self: False)
+    monkeypatch.setattr(gpu_module, "get_nvidia_dll_path", lambda: None)
+
+    devices = GPUUtils.get_display_devices()
+    gpu = GPUUtils().get_gpu()
+
+    assert [d.address for d in devices] == ["0000:00:02.0", "0000:01:00.0"]
+    assert devices[0].boot_vga is True
+    assert list(gpu["vendors"]) == ["nvidia", "intel"]
+    assert gpu["prime"]["discrete"]["vendor"] == "nvidia"
+    assert gpu["prime"]["integrated"]["vendor"] == "intel"
+    assert GPUUtils.is_gpu(GPUVendors.NVIDIA)
+    assert not GPUUtils.is_gpu(GPUVendors.AMD)
+
+
+def test_gpu_probe_is_cached_until_refresh(monkeypatch, tmp_path):
+    root = tmp_path / "devices"
+    make_pci_device(root, "0000:00:02.0", 0x030000, 0x8086, boot_vga=True)
+    monkeypatch.setattr(GPUUtils, "sysfs_pci_devices", str(root))
+    monkeypatch.setattr(GPUUtils, "is_nouveau", lambda _self: False)
+    GPUUtils.refresh()
+
+    first = GPUUtils().get_gpu()
+    first["vendors"].clear()
+    make_pci_device(root, "0000:01:00.0", 0x030000, 0x1002, boot_vga=False)
+
+    assert list(GPUUtils().get_gpu()["vendors"]) == ["intel"]
+
+    GPUUtils.refresh()
+
+    assert list(GPUUtils().get_gpu()["vendors"]) == ["amd", "intel"]
+
+
+def test_boot_gpu_is_the_integrated_one(monkeypatch, tmp_path):
+    root = tmp_path / "devices"
+    make_pci_device(root, "0000:03:00.0", 0x030000, 0x8086, boot_vga=False)
+    make_pci_device(root, "0000:0c:00.0", 0x030000, 0x1002, boot_vga=True)
+    monkeypatch.setattr(GPUUtils, "sysfs_pci_devices", str(root))
+    monkeypatch.setattr(GPUUtils, "is_nouveau", lambda _self: False)
+    GPUUtils.refresh()
+
+    gpu = GPUUtils().get_gpu()
+
+    assert GPUUtils.get_boot_vendor() == "amd"
+    assert gpu["prime"]["integrated"]["vendor"] == "amd"
+    assert gpu["prime"]["discrete"]["vendor"] == "intel"
+    # NVIDIA has no integrated GPUs
+    assert GPUUtils.assume_discrete(["nvidia", "intel"], "nvidia") == {
+        "integrated": "intel",
+        "discrete": "nvidia",
+    }
@@ -0,0 +1,90 @@
+import os
+import struct
+
+from bottles.backend.utils.lnk import LnkIndex, LnkUtils
+
+
+def make_lnk(path, target):
+    """Writes a minimal shortcut that LnkUtils.read_target understands."""
+    local_base_path = b"\x00" + target.encode("utf-16-le")
+    link_info = struct.pack("IIIII", len(local_base_path) + 22, 0x1C, 1, 0, 20)
+    header = bytearray(0x4E)
+    header[0x14:0x18] = struct.pack("I", 0x01)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(bytes(header) + link_info + local_base_path + b"\x00\x00")
+
+
+def make_prefix(tmp_path):
+    drive_c = tmp_path / "drive_c"
+    make_lnk(drive_c / "users/steamuser/Desktop/Game.lnk", "C:\\Games\\game.exe")
+    make_lnk(
+        drive_c / "ProgramData/Microsoft/Windows/Start Menu/Programs/Tool/Tool.lnk",
+        "C:\\Tools\\tool.exe",
+    )
+    make_lnk(
+        drive_c / "users/steamuser/Start Menu/Programs/.hidden/Hidden.lnk",
+        "C:\\Hidden\\hidden.exe",
+    )
+    return drive_c
+
+
+def test_read_target_parses_local_base_path(tmp_path):
+    shortcut = tmp_path / "Game.lnk"
+    make_lnk(shortcut, "C:\\Games\\game.exe")
+
+    assert LnkUtils.read_target(str(shortcut)) == "C:\\Games\\game.exe"
+
+
+def test_index_discovers_shortcuts(tmp_path):
+    make_prefix(tmp_path)
+
+    targets = [target for _, target in LnkIndex(str(tmp_path)).get_targets()]
+
+    assert targets == ["C:\\Games\\game.exe", "C:\\Tools\\tool.exe"]
+    assert (tmp_path / "cache" / LnkIndex.file_name).is_file()
+
+
+def test_index_reuses_unchanged_shortcuts(tmp_path):
+    make_prefix(tmp_path)
+    LnkIndex(str(tmp_path)).get_targets()
+
+    index = LnkIndex(str(tmp_path))
+    targets = index.get_targets()
+
+    assert len(targets) == 2
+    assert index.parsed == 0
+    assert index.scanned is False
+
+
+def test_index_parses_only_changed_shortcuts(tmp_path):
+    drive_c = make_prefix(tmp_path)
+    LnkIndex(str(tmp_path)).get_targets()
+
+    shortcut = drive_c / "users/steamuser/Desktop/Game.lnk"
+    make_lnk(shortcut, "C:\\Games\\Renamed\\game.exe")
+    os.utime(shortcut, ns=(1, 1))
+
+    index = LnkIndex(str(tmp_path))
+    targets = [target for _, target in index.get_targets()]
+
+    assert targets == ["C:\\Games\\Renamed\\game.exe", "C:\\Tools\\tool.exe"]
+    assert index.parsed == 1
+
+
+def test_index_notices_new_and_removed_shortcuts(tmp_path):
+    drive_c = make_prefix(tmp_path)
+    LnkIndex(str(tmp_path)).get_targets()
+
+    (drive_c / "users/steamuser/Desktop/Game.lnk").unlink()
+    make_lnk(
+        drive_c
+        / "users/steamuser/AppData/Roaming/Microsoft/Windows/Start Menu/Programs/New.lnk",
+        "C:\\New\\new.exe",
+    )
+
+    index = LnkIndex(str(tmp_path))
+    targets = [target for _, target in index.get_targets()]
+
+    assert targets == ["C:\\Tools\\tool.exe", "C:\\New\\new.exe"]
+    assert index.scanned is True
+    assert index.parsed == 1
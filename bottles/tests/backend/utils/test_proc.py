@@ -0,0 +1,126 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from bottles.backend.utils.proc import ProcUtils, ProcWatch
+
+pytestmark = pytest.mark.skipif(not ProcWatch.is_supported(), reason="needs /proc")
+
+
+def spawn(prefix, exe: str, seconds: float) -> subprocess.Popen:
+    """Start a process whose cmdline looks like a wine-started executable."""
+    return subprocess.Popen(
+        [exe, "-c", f"import time; time.sleep({seconds})"],
+        executable=sys.executable,
+        env=dict(os.environ, WINEPREFIX=str(prefix)),
+    )
+
+
+@pytest.fixture
+def processes():
+    started = []
+    yield started
+    for proc in started:
+        proc.kill()
+        proc.wait()
+
+
+def test_find_matches_exe_and_prefix(tmp_path, processes):
+    other = tmp_path / "other"
+    processes.append(spawn(tmp_path, "C:\\Program Files\\Game\\Game.exe", 30))
+    processes.append(spawn(other, "C:\\windows\\system32\\reg.exe", 30))
+    time.sleep(0.2)
+
+    watch = ProcWatch(f"{tmp_path}/")
+
+    assert [int(p.pid) for p in watch.find("game.exe")] == [processes[0].pid]
+    assert [int(p.pid) for p in watch.find("C:\\Games\\GAME")] == [processes[0].pid]
+    assert watch.find("reg.exe") == []
+    assert len(ProcWatch(str(other)).find("reg")) == 1
+
+
+def test_wait_returns_when_the_process_exits(tmp_path, processes):
+    processes.append(spawn(tmp_path, "C:\\windows\\system32\\reg.exe", 0.3))
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    assert ProcWatch(str(tmp_path)).wait("reg.exe", timeout=10)
+    assert time.monotonic() - start < 2
+
+
+def test_wait_times_out_and_cancels(tmp_path, processes):
+    processes.append(spawn(tmp_path, "C:\\windows\\system32\\reg.exe", 30))
+    time.sleep(0.2)
+    watch = ProcWatch(str(tmp_path))
+
+    assert not watch.wait("reg.exe", timeout=0.2)
+
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    start = time.monotonic()
+    assert not watch.wait("reg.exe", cancel=cancel)
+    assert time.monotonic() - start < 2
+
+
+def test_query_matches_all_predicates(tmp_path, processes):
+    processes.append(spawn(tmp_path, "C:\\windows\\system32\\reg.exe", 30))
+    processes.append(spawn(tmp_path / "other", "C:\\windows\\system32\\reg.exe", 30))
+    time.sleep(0.2)
+
+    procs = ProcUtils.query(
+        cmdline="reg.exe",
+        env={"WINEPREFIX": str(tmp_path)},
+        fields=("name", "environ"),
+    )
+
+    assert [p.pid for p in procs] == [processes[0].pid]
+    assert procs[0].getenv("WINEPREFIX") == str(tmp_path)
+    assert procs[0].start is not None
+    assert procs[0].cwd is None
+    with pytest.raises(ValueError):
+        ProcUtils.query(fields=("threads",))
+
+
+def test_snapshot_is_cached_for_its_ttl(tmp_path, processes):
+    ProcUtils.cache_clear()
+    first = ProcUtils.snapshot(("cmdline",), ttl=60)
+    processes.append(spawn(tmp_path, "C:\\windows\\system32\\reg.exe", 30))
+    time.sleep(0.2)
+
+    assert ProcUtils.snapshot(("cmdline",), ttl=60) is first
+    mine = {p.pid for p in processes}
+    cached = ProcUtils.query(cmdline="reg.exe", ttl=60)
+    live = ProcUtils.query(cmdline="reg.exe")
+    assert mine.isdisjoint(p.pid for p in cached)
+    assert mine.issubset(p.pid for p in live)
+    ProcUtils.cache_clear()
+
+
+def test_kill_skips_reused_pids(tmp_path, processes):
+    processes.append(spawn(tmp_path, "C:\\windows\\system32\\reg.exe", 30))
+    time.sleep(0.2)
+    (proc,) = ProcUtils.query(env={"WINEPREFIX": str(tmp_path)}, fields=("start",))
+
+    proc.start += 1
+    assert not proc.kill()
+    assert processes[0].poll() is None
+
+    proc.start -= 1
+    assert proc.kill(signal.SIGKILL)
+    assert processes[0].wait(timeout=5) == -signal.SIGKILL
+    assert not proc.kill()
+
+
+def test_running_lists_the_executables_of_the_prefix(tmp_path, processes):
+    other = tmp_path / "other"
+    processes.append(spawn(tmp_path, "C:\\Program Files\\Game\\Game.exe", 30))
+    processes.append(spawn(other, "C:\\windows\\system32\\reg.exe", 30))
+    time.sleep(0.2)
+
+    assert ProcWatch(str(tmp_path)).running() == {"game.exe"}
+    assert ProcWatch(str(other)).running() == {"reg.exe"}
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from bottles.backend.utils.taskgraph import TaskGraph
+
+
+def test_steps_run_after_their_dependencies_and_concurrently():
+    both_running = threading.Barrier(2, timeout=5)
+    order = []
+
+    def step(name, barrier=None):
+        def run():
+            if barrier is not None:
+                barrier.wait()
+            order.append(name)
+            return name
+
+        return run
+
+    graph = TaskGraph(workers=4)
+    graph.add("dirs", step("dirs"))
+    graph.add("dxvk", step("dxvk", both_running), ["dirs"])
+    graph.add("runners", step("runners", both_running), ["dirs"])
+    graph.add("bottles", step("bottles"), ["runners"])
+    report = graph.run()
+
+    assert order[0] == "dirs"
+    assert order.index("bottles") > order.index("runners")
+    assert report.steps["bottles"].result == "bottles"
+    assert report.steps["bottles"].started >= report.steps["runners"].finished
+
+
+def test_critical_path_follows_the_slowest_dependency():
+    graph = TaskGraph(workers=4)
+    graph.add("dirs", lambda: None)
+    graph.add("fast", lambda: None, ["dirs"])
+    graph.add("slow", lambda: time.sleep(0.2), ["dirs"])
+    graph.add("bottles", lambda: None, ["fast", "slow"])
+    graph.add("other", lambda: None)
+    report = graph.run()
+
+    assert [step.name for step in report.critical_path()] == [
+        "dirs",
+        "slow",
+        "bottles",
+    ]
+    lines = str(report).splitlines()[1:]
+    assert [line.split()[1] for line in lines] == ["dirs", "slow", "bottles"]
+
+
+def test_callbacks_count_started_and_done_steps():
+    events = []
+    graph = TaskGraph(workers=1)
+    graph.add("a", lambda: None, description="First")
+    graph.add("b", lambda: None, ["a"])
+    graph.run(
+        on_start=lambda step, count: events.append(("start", step.description, count)),
+        on_done=lambda step, count: events.append(("done", step.name, count)),
+    )
+
+    assert events == [
+        ("start", "First", 1),
+        ("done", "a", 1),
+        ("start", "b", 2),
+        ("done", "b", 2),
+    ]
+
+
+def test_failing_step_stops_the_graph():
+    ran = []
+
+    def fail():
+        raise RuntimeError("broken")
+
+    graph = TaskGraph(workers=2)
+    graph.add("fail", fail)
+    graph.add("after", lambda: ran.append("after"), ["fail"])
+
+    with pytest.raises(RuntimeError, match="broken"):
+        graph.run()
+    assert ran == []
+
+
+def test_steps_only_come_after_known_steps():
+    graph = TaskGraph()
+    graph.add("a", lambda: None)
+
+    with pytest.raises(ValueError):
+        graph.add("b", lambda: None, ["missing"])
+    with pytest.raises(ValueError):
+        graph.add("a", lambda: None)
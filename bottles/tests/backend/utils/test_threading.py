@@ -0,0 +1,149 @@
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from bottles.backend.utils.threading import AsyncExecutor, Priority, RunAsync
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = AsyncExecutor(workers=1)
+    monkeypatch.setattr(AsyncExecutor, "_instance", executor)
+    return executor
+
+
+def run(func, **kwargs):
+    results = []
+    job = RunAsync(
+        func,
+        callback=lambda result, error: results.append((result, error)),
+        callback_in_main_loop=False,
+        **kwargs,
+    )
+    return job, results
+
+
+def block_worker():
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+
+    job, _results = run(blocker)
+    assert started.wait(5)
+    return job, release
+
+
+def test_jobs_run_by_priority_then_in_order(executor):
+    blocker, release = block_worker()
+    order = []
+    jobs = [
+        run(lambda: order.append("low"), priority=Priority.LOW)[0],
+        run(lambda: order.append("normal 1"))[0],
+        run(lambda: order.append("high"), priority=Priority.HIGH)[0],
+        run(lambda: order.append("normal 2"))[0],
+    ]
+    assert executor.metrics()["queued"] == 4
+
+    release.set()
+    for job in [blocker, *jobs]:
+        job.join(5)
+
+    assert order == ["high", "normal 1", "normal 2", "low"]
+    metrics = executor.metrics()
+    assert metrics["completed"] == 5
+    assert metrics["max_queued"] == 4
+    assert metrics["queued"] == 0
+
+
+def test_jobs_with_the_same_key_run_one_at_a_time(monkeypatch):
+    monkeypatch.setattr(AsyncExecutor, "_instance", AsyncExecutor(workers=4))
+    lock = threading.Lock()
+    running = []
+    overlaps = []
+    order = []
+
+    def job(index):
+        with lock:
+            running.append(index)
+            overlaps.append(len(running))
+        threading.Event().wait(0.01)
+        with lock:
+            running.remove(index)
+            order.append(index)
+
+    jobs = [run(job, index=i, serial_key="bottle")[0] for i in range(5)]
+    for item in jobs:
+        item.join(5)
+
+    assert max(overlaps) == 1
+    assert order == list(range(5))
+
+
+def test_cancelled_job_never_runs_and_reports_it(executor):
+    blocker, release = block_worker()
+    ran = []
+    job, results = run(lambda: ran.append(True))
+
+    job.cancel()
+    release.set()
+    blocker.join(5)
+    job.join(5)
+
+    assert not ran
+    assert isinstance(results[0][1], CancelledError)
+    assert executor.metrics()["cancelled"] == 1
+
+
+def test_worker_joining_a_queued_job_runs_it_inline(executor):
+    def outer():
+        inner, _results = run(lambda: "inner")
+        inner.join(5)
+        return not inner.is_alive()
+
+    job, results = run(outer)
+    job.join(5)
+
+    assert results == [(True, None)]
+
+
+def test_long_running_jobs_do_not_take_a_worker(executor):
+    blocker, release = block_worker()
+    job, results = run(lambda: "done", long_running=True)
+
+    job.join(5)
+    release.set()
+    blocker.join(5)
+
+    assert results == [("done", None)]
+    assert executor.metrics()["completed"] == 1
+
+
+def test_worker_joining_a_job_behind_its_key_runs_the_key_inline(executor):
+    order = []
+
+    def outer():
+        first = run(lambda: order.append("first"), serial_key="bottle")[0]
+        second = run(lambda: order.append("second"), serial_key="bottle")[0]
+        second.join(5)
+        return not first.is_alive() and not second.is_alive()
+
+    job, results = run(outer)
+    job.join(5)
+
+    assert results == [(True, None)]
+    assert order == ["first", "second"]
+
+
+def test_worker_cannot_join_a_later_job_of_its_own_key(executor):
+    def outer():
+        inner = run(lambda: None, serial_key="bottle")[0]
+        inner.join(5)
+
+    job, results = run(outer, serial_key="bottle")
+    job.join(5)
+
+    assert isinstance(results[0][1], RuntimeError)
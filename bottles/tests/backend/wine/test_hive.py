@@ -0,0 +1,107 @@
+import os
+
+from bottles.backend.wine import hive
+
+LINK = hive.format_value(
+    "SymbolicLinkValue",
+    hive.REG_LINK,
+    "\\REGISTRY\\Machine\\System\\ControlSet001".encode("utf-16-le"),
+)
+
+SYSTEM_REG = (
+    "WINE REGISTRY Version 2\n"
+    ";; All keys relative to \\\\Machine\n"
+    "\n"
+    "#arch=win64\n"
+    "\n"
+    "[Software\\\\Microsoft\\\\Windows NT\\\\CurrentVersion] 1700000000\n"
+    "#time=1da1b1c1d1e1f10\n"
+    '"CurrentBuild"="19043"\n'
+    '"CurrentMajorVersionNumber"=dword:0000000a\n'
+    '"RegisteredOwner"="J\\x00fcrgen"\n'
+    "\n"
+    "[Software\\\\Wine\\\\Drives] 1700000000\n"
+    '"c:"="hd"\n'
+    '@="default"\n'
+    "\n"
+    "[System\\\\ControlSet001\\\\Control\\\\Windows] 1700000000\n"
+    '"Blob"=hex:00,01,02,03,04,05,06,07,08,09,0a,0b,0c,0d,0e,0f,10,11,12,13,14,15,\\\n'
+    "  16,17,18\n"
+    '"Path"=str(2):"%SystemRoot%\\\\system32"\n'
+    "\n"
+    "[System\\\\CurrentControlSet] 1700000000\n"
+    "#link\n"
+    f"{LINK}\n"
+)
+
+
+def write_hive(tmp_path, text=SYSTEM_REG):
+    path = tmp_path / "system.reg"
+    path.write_text(text)
+    return str(path)
+
+
+def test_index_reads_values(tmp_path):
+    index = hive.HiveIndex(write_hive(tmp_path))
+
+    assert len(index) == 4
+    assert index.root == "\\Machine"
+    key = "software\\microsoft\\windows nt\\currentversion"
+    assert index.get_value(key, "CurrentBuild") == (hive.REG_SZ, "19043")
+    assert index.get_value(key, "currentmajorversionnumber") == (hive.REG_DWORD, 10)
+    assert index.get_value(key, "RegisteredOwner") == (hive.REG_SZ, "Jürgen")
+    assert index.get_value(key, "Missing") is None
+    assert index.get_value("Software\\Missing", "CurrentBuild") is None
+    assert index.get_value("Software\\Wine\\Drives", "") == (hive.REG_SZ, "default")
+
+
+def test_index_follows_links(tmp_path):
+    index = hive.HiveIndex(write_hive(tmp_path))
+    key = "System\\CurrentControlSet\\Control\\Windows"
+
+    assert index.get_value(key, "Blob") == (hive.REG_BINARY, bytes(range(25)))
+    assert index.get_values(key)["Path"] == (
+        hive.REG_EXPAND_SZ,
+        "%SystemRoot%\\system32",
+    )
+    assert index.list_subkeys("System\\CurrentControlSet") == ["Control"]
+
+
+def test_index_lists_implicit_subkeys(tmp_path):
+    index = hive.HiveIndex(write_hive(tmp_path))
+
+    assert index.list_subkeys("") == ["Software", "System"]
+    assert index.list_subkeys("SOFTWARE") == ["Microsoft", "Wine"]
+    assert index.has_key("Software\\Microsoft")
+    assert not index.has_key("Software\\Valve")
+
+
+def test_open_reuses_index_until_file_changes(tmp_path):
+    hive.HiveIndex.cache_clear()
+    path = write_hive(tmp_path)
+
+    first = hive.HiveIndex.open(path)
+    assert hive.HiveIndex.open(path) is first
+
+    replacement = tmp_path / "system.reg.new"
+    replacement.write_text(SYSTEM_REG.replace('"19043"', '"22000"'))
+    os.replace(replacement, path)
+
+    second = hive.HiveIndex.open(path)
+    assert second is not first
+    assert second.get_value(
+        "Software\\Microsoft\\Windows NT\\CurrentVersion", "CurrentBuild"
+    ) == (hive.REG_SZ, "22000")
+
+
+def test_reader_maps_root_keys(tmp_path):
+    write_hive(tmp_path)
+    reader = hive.HiveReader(str(tmp_path))
+
+    assert reader.get_value("HKEY_LOCAL_MACHINE\\Software\\Wine\\Drives", "c:") == (
+        hive.REG_SZ,
+        "hd",
+    )
+    assert reader.list_subkeys("HKLM\\Software") == ["Microsoft", "Wine"]
+    assert reader.get_value("HKEY_CURRENT_USER\\Software\\Wine", "Version") is None
+    assert reader.list_subkeys("HKEY_CURRENT_CONFIG\\Software") == []
@@ -0,0 +1,64 @@
+import queue
+
+import pytest
+
+from bottles.backend.models.config import BottleConfig
+from bottles.backend.wine.processmonitor import ProcessMonitor
+from bottles.backend.wine.winedbg import WineDbg
+
+
+@pytest.fixture
+def running(monkeypatch):
+    """The executables WineDbg.get_running reports."""
+    names = set()
+    monkeypatch.setattr(WineDbg, "get_running", lambda _self: set(names))
+    monkeypatch.setattr(ProcessMonitor, "interval", 60)
+    return names
+
+
+@pytest.fixture
+def monitor(tmp_path, running):
+    return ProcessMonitor(BottleConfig(Name="Test", Path=str(tmp_path)))
+
+
+def watch(monitor, name):
+    events = queue.Queue()
+    return monitor.subscribe(name, events.put), events
+
+
+def test_subscribers_share_one_probe_and_see_changes(monitor, running):
+    running.add("game.exe")
+    game, game_events = watch(monitor, "C:\\Games\\Game.exe")
+    game_2, game_2_events = watch(monitor, "game.exe")
+    tool, tool_events = watch(monitor, "tool")
+    assert game_events.get(timeout=5) is True
+    assert game_2_events.get(timeout=5) is True
+    assert tool_events.get(timeout=5) is False
+
+    running.clear()
+    running.add("tool.exe")
+    monitor._wake.set()
+
+    assert game_events.get(timeout=5) is False
+    assert game_2_events.get(timeout=5) is False
+    assert tool_events.get(timeout=5) is True
+    # at most one probe per subscription and one for the change
+    assert monitor.probes <= 4
+    assert monitor.is_running("TOOL") is True
+
+    thread = monitor._thread
+    for subscription in (game, game_2, tool):
+        monitor.unsubscribe(subscription)
+    thread.join(5)
+    assert monitor._thread is None
+
+
+def test_late_subscribers_get_the_known_state(monitor, running):
+    running.add("game.exe")
+    first, first_events = watch(monitor, "game.exe")
+    assert first_events.get(timeout=5) is True
+
+    _late, late_events = watch(monitor, "game.exe")
+    monitor.unsubscribe(first)
+
+    assert late_events.get_nowait() is True
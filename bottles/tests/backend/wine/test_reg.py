@@ -0,0 +1,267 @@
+import pytest
+
+from bottles.backend.models.config import BottleConfig
+from bottles.backend.models.result import Result
+from bottles.backend.wine import hive
+from bottles.backend.wine.reg import Reg, RegItem
+from bottles.backend.wine.wineserver import WineServer
+
+LINK = hive.format_value(
+    "SymbolicLinkValue",
+    hive.REG_LINK,
+    "\\REGISTRY\\Machine\\System\\ControlSet001".encode("utf-16-le"),
+)
+
+SYSTEM_REG = (
+    "WINE REGISTRY Version 2\n"
+    ";; All keys relative to \\\\Machine\n"
+    "\n"
+    "#arch=win64\n"
+    "\n"
+    "[Software\\\\Microsoft\\\\Windows NT\\\\CurrentVersion] 1700000000\n"
+    "#time=1da1b1c1d1e1f10\n"
+    '"CurrentBuild"="19043"\n'
+    '"ProductName"="Microsoft Windows 10"\n'
+    '"RegisteredOwner"="J\\x00fcrgen"\n'
+    "\n"
+    "[System\\\\ControlSet001\\\\Control\\\\Windows] 1700000000\n"
+    "#time=1da1b1c1d1e1f10\n"
+    '"CSDVersion"=dword:00000000\n'
+    '"Blob"=hex:00,01,02,03,04,05,06,07,08,09,0a,0b,0c,0d,0e,0f,10,11,12,13,14,15,\\\n'
+    "  16,17,18\n"
+    "\n"
+    "[System\\\\CurrentControlSet] 1700000000\n"
+    "#time=1da1b1c1d1e1f10\n"
+    "#link\n"
+    f"{LINK}\n"
+)
+
+USER_REG = (
+    "WINE REGISTRY Version 2\n"
+    ";; All keys relative to \\\\User\\\\S-1-5-21-0-0-0-1000\n"
+    "\n"
+    "#arch=win64\n"
+    "\n"
+    "[Software\\\\Wine\\\\DllOverrides] 1700000000\n"
+    "#time=1da1b1c1d1e1f10\n"
+    '"winemenubuilder.exe"=""\n'
+)
+
+
+@pytest.fixture
+def prefix(tmp_path):
+    (tmp_path / "system.reg").write_text(SYSTEM_REG)
+    (tmp_path / "user.reg").write_text(USER_REG)
+    return tmp_path
+
+
+@pytest.fixture
+def config(monkeypatch, prefix, tmp_path):
+    monkeypatch.setattr(
+        "bottles.backend.wine.reg.ManagerUtils.get_bottle_path",
+        lambda _config: str(prefix),
+    )
+    monkeypatch.setattr("bottles.backend.wine.reg.Paths.temp", str(tmp_path))
+    monkeypatch.setattr(
+        "bottles.backend.wine.reg.WineDbg.wait_for_process", lambda *_args: True
+    )
+    return BottleConfig(Name="Registry", Runner="sys-wine-11.0")
+
+
+def test_escape_round_trip():
+    text = 'C:\\Users\\J\u00fcrgen\n"quoted"\x01' + "\u4e2d1"
+
+    escaped = hive.escape_string(text)
+
+    assert escaped == 'C:\\\\Users\\\\J\\xfcrgen\\n\\"quoted\\"\\1\\x4e2d1'
+    assert hive.unescape_string(escaped) == text
+
+
+def test_apply_edits_keeps_untouched_keys(prefix):
+    edits = [
+        RegItem(
+            "HKEY_LOCAL_MACHINE\\Software\\Microsoft\\Windows NT\\CurrentVersion",
+            "CurrentBuild",
+            "",
+            "22000",
+        )
+    ]
+
+    assert hive.apply_edits(str(prefix), edits) == 1
+
+    text = (prefix / "system.reg").read_text()
+    assert '"CurrentBuild"="22000"\n"ProductName"' in text
+    assert '"RegisteredOwner"="J\\x00fcrgen"' in text
+    assert (
+        "[Software\\\\Microsoft\\\\Windows NT\\\\CurrentVersion] 1700000000" not in text
+    )
+    assert text.endswith(SYSTEM_REG[SYSTEM_REG.index("\n[System") :])
+    assert (prefix / "user.reg").read_text() == USER_REG
+
+
+def test_apply_edits_follows_links_and_formats_values(prefix):
+    edits = [
+        RegItem(
+            "HKLM\\System\\CurrentControlSet\\Control\\Windows",
+            "CSDVersion",
+            "REG_DWORD",
+            "0x100",
+        ),
+        RegItem("HKCU\\Software\\Wine\\DllOverrides", "d3d9", "", "native,builtin"),
+        RegItem("HKCU\\Software\\Wine\\DllOverrides", "winemenubuilder.exe", "", None),
+        RegItem("HKCU\\Software\\Wine\\X11 Driver", "Decorated", "", "N"),
+    ]
+
+    assert hive.apply_edits(str(prefix), edits) == 4
+
+    system = hive.RegistryHive(str(prefix / "system.reg"))
+    user = hive.RegistryHive(str(prefix / "user.reg"))
+    assert system.get_section("System\\CurrentControlSet\\Control\\Windows") is None
+    assert system.get_value(
+        "System\\ControlSet001\\Control\\Windows", "CSDVersion"
+    ) == (
+        hive.REG_DWORD,
+        0x100,
+    )
+    assert system.get_value("System\\ControlSet001\\Control\\Windows", "Blob") == (
+        hive.REG_BINARY,
+        bytes(range(25)),
+    )
+    assert user.get_value("Software\\Wine\\DllOverrides", "d3d9") == (
+        hive.REG_SZ,
+        "native,builtin",
+    )
+    assert user.get_value("Software\\Wine\\DllOverrides", "winemenubuilder.exe") is None
+    assert user.get_value("Software\\Wine\\X11 Driver", "decorated") == (
+        hive.REG_SZ,
+        "N",
+    )
+    assert "\n\n[Software\\\\Wine\\\\X11 Driver] " in user.dump()
+
+
+def test_apply_edits_writes_nothing_for_invalid_edits(prefix):
+    edits = [
+        RegItem("HKCU\\Software\\Wine\\DllOverrides", "d3d9", "", "native"),
+        RegItem("HKEY_CURRENT_CONFIG\\Software", "Value", "", "data"),
+    ]
+
+    with pytest.raises(ValueError):
+        hive.apply_edits(str(prefix), edits)
+
+    assert (prefix / "user.reg").read_text() == USER_REG
+
+
+def test_apply_writes_hives_when_wineserver_is_stopped(monkeypatch, config, prefix):
+    monkeypatch.setattr(WineServer, "is_alive", lambda _self: False)
+    launched = []
+    monkeypatch.setattr(
+        Reg, "launch", lambda _self, *args, **kwargs: launched.append(args)
+    )
+
+    reg = Reg(config)
+    with reg.batch():
+        reg.add("HKEY_CURRENT_USER\\Software\\Wine\\DllOverrides", "d3d9", "native")
+        Reg(config).remove(
+            "HKEY_CURRENT_USER\\Software\\Wine\\DllOverrides", "winemenubuilder.exe"
+        )
+        assert "d3d9" not in (prefix / "user.reg").read_text()
+
+    user = hive.RegistryHive(str(prefix / "user.reg"))
+    assert user.get_value("Software\\Wine\\DllOverrides", "d3d9") == (
+        hive.REG_SZ,
+        "native",
+    )
+    assert user.get_value("Software\\Wine\\DllOverrides", "winemenubuilder.exe") is None
+    assert launched == []
+
+
+def test_apply_imports_once_when_wineserver_is_running(monkeypatch, config, prefix):
+    monkeypatch.setattr(WineServer, "is_alive", lambda _self: True)
+    imported = []
+
+    def launch(_self, args, **_kwargs):
+        with open(args[1], "rb") as f:
+            imported.append(f.read().decode("utf-16"))
+        return Result(True)
+
+    monkeypatch.setattr(Reg, "launch", launch)
+
+    reg = Reg(config)
+    with reg.batch():
+        reg.import_bundle(
+            {
+                "HKEY_LOCAL_MACHINE\\System\\CurrentControlSet\\Control\\Windows": [
+                    {"value": "CSDVersion", "data": "100", "key_type": "dword"}
+                ]
+            }
+        )
+        reg.add("HKCU\\Software\\Wine", "Path", "C:\\windows")
+        reg.remove("HKCU\\Software\\Wine", "Version")
+
+    assert imported == [
+        "Windows Registry Editor Version 5.00\n\n"
+        "[HKEY_LOCAL_MACHINE\\System\\CurrentControlSet\\Control\\Windows]\n"
+        '"CSDVersion"=dword:00000100\n\n'
+        "[HKCU\\Software\\Wine]\n"
+        '"Path"="C:\\\\windows"\n'
+        '"Version"=-\n\n'
+    ]
+    assert (prefix / "user.reg").read_text() == USER_REG
+
+
+def test_import_bundle_skips_invalid_items(monkeypatch, config, prefix):
+    monkeypatch.setattr(WineServer, "is_alive", lambda _self: False)
+
+    result = Reg(config).import_bundle(
+        {
+            "HKEY_CURRENT_USER\\Console": [
+                {"value": "CursorSize", "data": "25"},
+                {"value": "FaceName", "data": "Monospace", "key_type": "dword"},
+                {"value": "FontWeight", "data": "190", "key_type": "dword"},
+            ]
+        }
+    )
+
+    assert result.status
+    user = hive.RegistryHive(str(prefix / "user.reg"))
+    assert user.get_value("Console", "CursorSize") == (hive.REG_SZ, "25")
+    assert user.get_value("Console", "FaceName") is None
+    assert user.get_value("Console", "FontWeight") == (hive.REG_DWORD, 0x190)
+
+
+def test_parse_import_reads_reg_files():
+    text = (
+        "Windows Registry Editor Version 5.00\n\n"
+        "[HKEY_CURRENT_USER\\Software\\Wine\\DllOverrides]\n"
+        '"d3d9"="native,builtin"\n'
+        '"ddraw"=-\n\n'
+        "[HKEY_CURRENT_USER\\Software\\Wine\\Direct3D]\n"
+        '"VideoMemorySize"=dword:00001000\n'
+        '"Path"=hex(2):43,00,3a,00,5c,00,\\\n'
+        "  00,00\n"
+    )
+
+    assert Reg.parse_import(text) == [
+        RegItem(
+            "HKEY_CURRENT_USER\\Software\\Wine\\DllOverrides",
+            "d3d9",
+            "REG_SZ",
+            "native,builtin",
+        ),
+        RegItem("HKEY_CURRENT_USER\\Software\\Wine\\DllOverrides", "ddraw", "", None),
+        RegItem(
+            "HKEY_CURRENT_USER\\Software\\Wine\\Direct3D",
+            "VideoMemorySize",
+            "REG_DWORD",
+            "0x00001000",
+        ),
+        RegItem(
+            "HKEY_CURRENT_USER\\Software\\Wine\\Direct3D",
+            "Path",
+            "REG_EXPAND_SZ",
+            "C:\\",
+        ),
+    ]
+
+    with pytest.raises(ValueError):
+        Reg.parse_import("REGEDIT4\n\n[-HKEY_CURRENT_USER\\Software\\Wine]\n")
@@ -1,3 +1,4 @@
+from bottles.backend.models.config import BottleConfig
 from bottles.backend.models.result import Result
 from bottles.backend.wine.uninstaller import Uninstaller
 
@@ -18,6 +19,7 @@ def test_get_uuid_filters_uninstaller_output(monkeypatch):
         return Result(True, output)
 
     monkeypatch.setattr(Uninstaller, "launch", launch)
+    monkeypatch.setattr(Uninstaller, "list_entries", lambda _self: None)
     uninstaller = Uninstaller.__new__(Uninstaller)
 
     result = uninstaller.get_uuid("wine mono")
@@ -39,6 +41,7 @@ def test_get_uuid_keeps_full_list(monkeypatch):
         "launch",
         lambda _self, **_kwargs: Result(True, output),
     )
+    monkeypatch.setattr(Uninstaller, "list_entries", lambda _self: None)
     uninstaller = Uninstaller.__new__(Uninstaller)
 
     assert uninstaller.get_uuid().data == output
@@ -63,3 +66,33 @@ def test_from_uuid_waits_and_quotes_identifier(monkeypatch):
             "action_name": "from_uuid",
         }
     ]
+
+
+def test_get_uuid_reads_uninstall_entries_from_hives(monkeypatch, tmp_path):
+    uninstall = "Software\\\\Microsoft\\\\Windows\\\\CurrentVersion\\\\Uninstall"
+    (tmp_path / "system.reg").write_text(
+        "WINE REGISTRY Version 2\n"
+        ";; All keys relative to \\\\Machine\n\n"
+        f"[{uninstall}\\\\{{MONO-RUNTIME}}] 1700000000\n"
+        '"DisplayName"="Wine Mono Runtime"\n'
+        '"UninstallString"="msiexec /x{MONO-RUNTIME}"\n\n'
+        f"[{uninstall}\\\\{{MONO-COMPONENT}}] 1700000000\n"
+        '"DisplayName"="Wine Mono Component"\n'
+        '"SystemComponent"=dword:00000001\n'
+        '"UninstallString"="msiexec /x{MONO-COMPONENT}"\n\n'
+        f"[{uninstall}\\\\{{MONO-SUPPORT}}] 1700000000\n"
+        '"DisplayName"="Wine Mono Windows Support"\n'
+        '"WindowsInstaller"=dword:00000001\n'
+    )
+    monkeypatch.setattr(
+        "bottles.backend.wine.uninstaller.ManagerUtils.get_bottle_path",
+        lambda _config: str(tmp_path),
+    )
+    monkeypatch.setattr(
+        "bottles.backend.wine.uninstaller.WineServer.is_alive", lambda _self: False
+    )
+    monkeypatch.setattr(Uninstaller, "launch", lambda *_args, **_kwargs: 1 / 0)
+
+    uninstaller = Uninstaller(BottleConfig(Name="Mono"))
+
+    assert uninstaller.get_uuid("wine mono").data == "{MONO-SUPPORT}\n{MONO-RUNTIME}"
@@ -1,8 +1,15 @@
+import os
 import subprocess
+import sys
+
+import pytest
 
 from bottles.backend.models.config import BottleConfig
 from bottles.backend.wine.wineserver import WineServer
 
+# the tests below replace subprocess.Popen to make sure wine is not used
+_Popen = subprocess.Popen
+
 
 def test_is_alive_skips_missing_bottle_directory(monkeypatch, mocker, tmp_path):
     bottle_path = tmp_path / "missing"
@@ -23,7 +30,7 @@ def test_is_alive_skips_missing_bottle_directory(monkeypatch, mocker, tmp_path):
     )
 
     assert WineServer(config).is_alive() is False
-    popen.assert_called_once_with(["pgrep", "wineserver"], stdout=subprocess.PIPE)
+    popen.assert_not_called()
 
 
 def test_is_alive_handles_bottle_removed_during_check(monkeypatch, mocker, tmp_path):
@@ -44,5 +51,74 @@ def test_is_alive_handles_bottle_removed_during_check(monkeypatch, mocker, tmp_p
         "bottles.backend.wine.wineserver.ManagerUtils.get_runner_path",
         lambda _runner: "/usr/bin",
     )
+    monkeypatch.setattr(WineServer, "_WineServer__is_alive_native", lambda *_args: None)
+
+    assert WineServer(config).is_alive() is False
+
+
+@pytest.fixture
+def server_dir(monkeypatch, mocker, tmp_path):
+    bottle_path = tmp_path / "bottle"
+    bottle_path.mkdir()
+    server_dir = tmp_path / "server"
+    server_dir.mkdir()
+    monkeypatch.setattr(
+        "bottles.backend.wine.wineserver.ManagerUtils.get_bottle_path",
+        lambda _config: str(bottle_path),
+    )
+    monkeypatch.setattr(
+        "bottles.backend.wine.wineserver.ManagerUtils.get_runner_path",
+        lambda _runner: "/usr/bin",
+    )
+    monkeypatch.setattr(
+        WineServer, "get_server_dir", staticmethod(lambda _prefix: str(server_dir))
+    )
+    mocker.patch(
+        "bottles.backend.wine.wineserver.subprocess.Popen",
+        side_effect=AssertionError("no process should be spawned"),
+    )
+    return server_dir
+
+
+def test_server_dir_matches_wine_layout(tmp_path):
+    st = tmp_path.stat()
+
+    assert WineServer.get_server_dir(str(tmp_path)) == (
+        f"/tmp/.wine-{os.getuid()}/server-{st.st_dev:x}-{st.st_ino:x}"
+    )
+
+
+def test_is_alive_without_server_socket(server_dir):
+    config = BottleConfig(Name="Stopped", Runner="sys-wine-11.0")
 
     assert WineServer(config).is_alive() is False
+
+
+def test_is_alive_with_stale_server_socket(server_dir):
+    (server_dir / "socket").touch()
+    (server_dir / "lock").touch()
+    config = BottleConfig(Name="Crashed", Runner="sys-wine-11.0")
+
+    assert WineServer(config).is_alive() is False
+
+
+def test_is_alive_when_server_holds_the_lock(server_dir):
+    (server_dir / "socket").touch()
+    lock = server_dir / "lock"
+    lock.touch()
+    code = (
+        "import fcntl, sys, time\n"
+        "f = open(sys.argv[1], 'w')\n"
+        "fcntl.lockf(f, fcntl.LOCK_EX)\n"
+        "print('locked', flush=True)\n"
+        "time.sleep(30)\n"
+    )
+    server = _Popen([sys.executable, "-c", code, str(lock)], stdout=subprocess.PIPE)
+    try:
+        assert server.stdout.readline().strip() == b"locked"
+        config = BottleConfig(Name="Running", Runner="sys-wine-11.0")
+
+        assert WineServer(config).is_alive() is True
+    finally:
+        server.kill()
+        server.wait()
@@ -0,0 +1,5 @@
+"""Micro-benchmarks for hot backend paths.
+
+They are not collected by pytest, run them as modules from the repository
+root, e.g. `python -m bottles.tests.benchmarks.bench_lnk_index`.
+"""
@@ -0,0 +1,91 @@
+"""Repository catalog loading, YAML parse versus the compiled catalog."""
+
+import glob
+import os
+import tempfile
+
+from bottles.backend.globals import Paths
+from bottles.backend.repos.component import ComponentRepo
+from bottles.backend.repos.dependency import DependencyRepo
+from bottles.backend.repos.installer import InstallerRepo
+from bottles.tests.benchmarks.helpers import measure, parse_args
+
+REPOSITORIES = {
+    "components": ComponentRepo,
+    "dependencies": DependencyRepo,
+    "installers": InstallerRepo,
+}
+
+
+def make_catalog(name: str, entries: int) -> bytes:
+    """Entries shaped like the ones of the repository."""
+    lines = []
+    for i in range(entries):
+        if name == "components":
+            lines.append(
+                f"caffe-{i}.0:\n  Category: runners\n  Sub-category: wine\n"
+                f"  Channel: stable\n"
+            )
+        elif name == "dependencies":
+            lines.append(
+                f"dependency-{i}:\n  Description: Dependency number {i}\n"
+                f"  Category: Essentials\n  Arch: win64_win32\n"
+            )
+        else:
+            lines.append(
+                f"program-{i}:\n  Name: Program {i}\n  Description: A program\n"
+                f"  Grade: Gold\n  Category: Software\n  Icon: icon-{i}.svg\n"
+            )
+    return "".join(lines).encode()
+
+
+def find_catalogs(entries: int) -> dict:
+    """The catalogs cached by Bottles, made up where there's none."""
+    catalogs = {}
+    for name in REPOSITORIES:
+        pattern = os.path.join(Paths.temp, "repositories", name, "*", "catalog.yml")
+        cached = sorted(glob.glob(pattern), key=os.path.getmtime)
+        if cached:
+            with open(cached[-1], "rb") as f:
+                catalogs[name] = f.read()
+        else:
+            catalogs[name] = make_catalog(name, entries)
+    return catalogs
+
+
+def load(cls, data: bytes) -> float:
+    def parse():
+        repo = object.__new__(cls)
+        repo.url = repo.cache_url = "https://example.invalid/"
+        repo.catalog = repo._Repo__parse_catalog(data)
+        return repo.classified
+
+    return measure(parse)[0]
+
+
+def main():
+    args = parse_args(__doc__, rounds=20, entries=500)
+
+    catalogs = find_catalogs(args.entries)
+    with tempfile.TemporaryDirectory() as directory:
+        Paths.temp = directory
+        for name, cls in REPOSITORIES.items():
+            data = catalogs[name]
+            pattern = os.path.join(directory, "repositories", name, "*", "*.marshal")
+            parsed = compiled = 0.0
+            for _i in range(args.rounds):
+                for path in glob.glob(pattern):
+                    os.remove(path)
+                parsed += load(cls, data)  # parses and compiles
+                compiled += load(cls, data)
+            size = os.path.getsize(glob.glob(pattern)[0])
+            print(
+                f"{name:12} {len(data) / 1024:5.0f} KiB, "
+                f"yaml: {parsed / args.rounds * 1000:6.1f} ms, "
+                f"compiled: {compiled / args.rounds * 1000:5.1f} ms "
+                f"({size / 1024:.0f} KiB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
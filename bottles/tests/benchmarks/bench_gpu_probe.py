@@ -0,0 +1,36 @@
+"""GPU probe cost paid by every WineCommand.get_env call."""
+
+from bottles.backend.utils.display import DisplayUtils
+from bottles.backend.utils.gpu import GPUUtils
+from bottles.tests.benchmarks.helpers import measure, parse_args
+
+
+def probe():
+    # what WineCommand.get_env used to run for each command
+    GPUUtils().get_gpu()
+    DisplayUtils.check_nvidia_device()
+
+
+def probe_again():
+    GPUUtils.refresh()
+    probe()
+
+
+def main():
+    args = parse_args(__doc__, rounds=20)
+
+    sysfs = GPUUtils.sysfs_pci_devices
+    GPUUtils.sysfs_pci_devices = "/nonexistent"
+    lspci, _ = measure(probe_again, args.rounds)
+    GPUUtils.sysfs_pci_devices = sysfs
+
+    uncached, _ = measure(probe_again, args.rounds)
+    cached, _ = measure(probe, args.rounds)
+
+    print(f"lspci, uncached: {lspci * 1000:.3f} ms per command")
+    print(f"sysfs, uncached: {uncached * 1000:.3f} ms per command")
+    print(f"sysfs, cached:   {cached * 1000:.3f} ms per command")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Cold vs. warm program discovery over a synthetic prefix."""
+
+import tempfile
+from pathlib import Path
+
+from bottles.backend.utils.lnk import LnkIndex
+from bottles.tests.backend.utils.test_lnk import make_lnk
+from bottles.tests.benchmarks.helpers import measure, parse_args
+
+
+def make_prefix(root: Path, shortcuts: int):
+    programs = root / "drive_c/users/steamuser/Start Menu/Programs"
+    for i in range(shortcuts):
+        make_lnk(
+            programs / f"Vendor {i % 50}" / f"Game {i}.lnk",
+            f"C:\\Games\\Game {i}\\game{i}.exe",
+        )
+
+
+def discover(root: Path) -> LnkIndex:
+    index = LnkIndex(str(root))
+    index.get_targets()
+    return index
+
+
+def main():
+    args = parse_args(__doc__, rounds=5, shortcuts=5000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_prefix(root, args.shortcuts)
+
+        cold, index = measure(lambda: discover(root))
+        print(f"cold: {cold * 1000:.1f} ms ({index.parsed} shortcuts parsed)")
+
+        warm, index = measure(lambda: discover(root), args.rounds)
+        print(f"warm: {warm * 1000:.1f} ms ({index.parsed} shortcuts parsed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Applying 200 registry keys natively versus with wine reg.exe.
+
+The native writer edits a copy of the hive files. The reg.exe timings need
+wine and an existing prefix (--prefix), they are skipped otherwise.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+from bottles.backend.wine import hive
+from bottles.backend.wine.reg import Reg, RegItem
+from bottles.tests.benchmarks.helpers import measure, parse_args
+
+KEY = "HKEY_CURRENT_USER\\Software\\Bottles\\Benchmark"
+
+
+def make_edits(count: int) -> list:
+    return [
+        RegItem(f"{KEY}\\{i // 20}", f"Value{i}", "REG_DWORD", str(i))
+        for i in range(count)
+    ]
+
+
+def make_prefix(directory: str, keys: int):
+    """Write synthetic hives of about the size of a fresh prefix."""
+    for name in ("system.reg", "user.reg"):
+        with open(os.path.join(directory, name), "w") as f:
+            f.write("WINE REGISTRY Version 2\n;; All keys relative to \\\\Machine\n")
+            f.write("\n#arch=win64\n")
+            for i in range(keys):
+                f.write(f"\n[Software\\\\Vendor\\\\Product{i}] 1700000000\n")
+                f.write("#time=1da1b1c1d1e1f10\n")
+                f.write(f'"InstallPath"="C:\\\\Program Files\\\\Product{i}"\n')
+                f.write(f'"Version"=dword:{i:08x}\n')
+
+
+def native(prefix: str, edits: list) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("system.reg", "user.reg"):
+            shutil.copy(os.path.join(prefix, name), directory)
+        return measure(lambda: hive.apply_edits(directory, edits))[0]
+
+
+def wine(prefix: str, args: list) -> None:
+    env = dict(os.environ, WINEPREFIX=prefix, WINEDEBUG="-all")
+    subprocess.run(["wine", "reg", *args], env=env, capture_output=True)
+
+
+def reg_exe_each(prefix: str, edits: list) -> float:
+    def add_each():
+        for item in edits:
+            args = ["add", item.key, "/v", item.value, "/t", item.value_type]
+            wine(prefix, args + ["/d", item.data, "/f"])
+
+    return measure(add_each)[0]
+
+
+def reg_exe_bulk(prefix: str, edits: list) -> float:
+    lines = ["Windows Registry Editor Version 5.00", ""]
+    for item in edits:
+        lines += [f"[{item.key}]", f'"{item.value}"=dword:{int(item.data):08x}', ""]
+    with tempfile.NamedTemporaryFile("w", suffix=".reg", delete=False) as f:
+        f.write("\n".join(lines))
+    elapsed, _ = measure(lambda: wine(prefix, ["import", f.name]))
+    os.remove(f.name)
+    return elapsed
+
+
+def main():
+    args = parse_args(__doc__, keys=200, prefix=None, hive_keys=20000)
+    edits = make_edits(args.keys)
+
+    with tempfile.TemporaryDirectory() as directory:
+        prefix = args.prefix
+        if prefix is None:
+            make_prefix(directory, args.hive_keys)
+            prefix = directory
+        print(f"native hive writer: {native(prefix, edits) * 1000:.1f} ms")
+
+    # the parser is what RegistryRuleManager uses on rule text
+    text = "REGEDIT4\n\n" + "".join(
+        f'[{e.key}]\n"{e.value}"=dword:{int(e.data):08x}\n\n' for e in edits
+    )
+    parsing, _ = measure(lambda: Reg.parse_import(text))
+    print(f"reg file parsing:   {parsing * 1000:.1f} ms")
+
+    if args.prefix is None or shutil.which("wine") is None:
+        print("reg.exe:            skipped, needs wine and --prefix")
+        return
+
+    print(f"reg.exe, bulk:      {reg_exe_bulk(args.prefix, edits) * 1000:.1f} ms")
+    print(f"reg.exe, each:      {reg_exe_each(args.prefix, edits) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
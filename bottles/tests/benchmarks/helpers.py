@@ -0,0 +1,34 @@
+"""Command line and timing helpers shared by the benchmarks."""
+
+import argparse
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+def parse_args(
+    doc: Optional[str], rounds: Optional[int] = None, **options: Any
+) -> argparse.Namespace:
+    """
+    Parse the options of a benchmark, each given as name=default; the type
+    of the default is the type of the option, str for None. --rounds is
+    added when rounds is given.
+    """
+    parser = argparse.ArgumentParser(description=doc)
+    if rounds is not None:
+        options = {"rounds": rounds, **options}
+    for name, default in options.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            type=str if default is None else type(default),
+            default=default,
+        )
+    return parser.parse_args()
+
+
+def measure(func: Callable[[], Any], rounds: int = 1) -> Tuple[float, Any]:
+    """Mean seconds a call of func takes over rounds calls, and its result."""
+    result = None
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    return (time.perf_counter() - start) / rounds, result
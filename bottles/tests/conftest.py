@@ -5,3 +5,6 @@ def _add_repo_root_to_syspath() -> None:
     if repo_root not in sys.path:
         sys.path.insert(0, repo_root)
 _add_repo_root_to_syspath()
+
+# keep log output inside the test that produced it
+os.environ.setdefault("LOG_ASYNC", "0")
@@ -46,6 +46,10 @@ def _entry(name):
     return SimpleNamespace(dependency=(name, {}))
 
 
+def prefetch(_names):
+    return {}
+
+
 class WidgetStub:
     def __init__(self, visible=False, active=True):
         self.visible = visible
@@ -80,7 +84,9 @@ class WidgetStub:
 
 def test_batch_skips_dependency_installed_as_a_prerequisite():
     config = BottleConfig(Name="Test")
+    config.Installed_Dependencies = ["installed"]
     calls = []
+    prefetched = []
 
     def install(config, dependency, **_kwargs):
         calls.append(dependency[0])
@@ -90,17 +96,25 @@ def test_batch_skips_dependency_installed_as_a_prerequisite():
     view = SimpleNamespace(
         config=config,
         manager=SimpleNamespace(
-            dependency_manager=SimpleNamespace(install=install),
+            dependency_manager=SimpleNamespace(
+                install=install, prefetch=prefetched.append
+            ),
         ),
     )
 
     result = DependenciesView._DependenciesView__install_dependencies(
-        view, [_entry("first"), _entry("second")], DialogStub()
+        view,
+        [_entry("installed"), _entry("first"), _entry("second")],
+        DialogStub(),
     )
 
     assert result.ok
-    assert result.data == {"installed": ["first", "second"], "failed": []}
+    assert result.data == {
+        "installed": ["installed", "first", "second"],
+        "failed": [],
+    }
     assert calls == ["first"]
+    assert prefetched == [["first", "second"]]
 
 
 def test_batch_continues_after_a_dependency_fails():
@@ -118,7 +132,7 @@ def test_batch_continues_after_a_dependency_fails():
     view = SimpleNamespace(
         config=config,
         manager=SimpleNamespace(
-            dependency_manager=SimpleNamespace(install=install),
+            dependency_manager=SimpleNamespace(install=install, prefetch=prefetch),
         ),
     )
 
@@ -146,7 +160,7 @@ def test_batch_continues_after_an_installation_raises():
     view = SimpleNamespace(
         config=config,
         manager=SimpleNamespace(
-            dependency_manager=SimpleNamespace(install=install),
+            dependency_manager=SimpleNamespace(install=install, prefetch=prefetch),
         ),
     )
 
@@ -178,7 +192,7 @@ def test_batch_refreshes_automatic_versioning(monkeypatch):
     view = SimpleNamespace(
         config=config,
         manager=SimpleNamespace(
-            dependency_manager=SimpleNamespace(install=install),
+            dependency_manager=SimpleNamespace(install=install, prefetch=prefetch),
         ),
         window=SimpleNamespace(
             page_details=SimpleNamespace(